@@ -1,10 +1,15 @@
 import dataclasses
+import hashlib
 import json
+import os
+import pickle
 import random
 import re
+import time
 import warnings
-from copy import copy
+from copy import deepcopy
 from pathlib import Path
+from types import MappingProxyType
 
 import pandas as pd
 from eth_keys import keys
@@ -17,6 +22,115 @@ import enums
 from logger import logging, TelegramHandler
 
 
+WALLETS_INDEX_PATH = Path(__file__).parent / 'wallets_index.json'
+
+ACCOUNTS_SNAPSHOT_PATH = Path(__file__).parent / 'accounts_snapshot.pickle'
+
+ACCOUNTS_SNAPSHOT_VERSION = 2
+
+ACCOUNTS_SNAPSHOT_DEPENDENCIES = [
+    Path(__file__),
+    Path(constants.__file__),
+    Path(enums.__file__),
+    Path(create_accounts.__file__)
+]
+
+# Account fields that are never written to the snapshot, they are read from
+# the accounts file again when the snapshot is loaded
+ACCOUNTS_SNAPSHOT_SECRET_FIELDS = [
+    'private_key',
+    'evm_private_key',
+    'proxy',
+    'mobile_proxy_changelink',
+    'okx_api_key',
+    'okx_secret_key',
+    'okx_passphrase'
+]
+
+
+KNOWN_SETTINGS = {
+    'token_list_values': [
+        'swap_tokens', 'pool_tokens', 'exclude_tokens', 'transfer_tokens'
+    ],
+    'token_values': [
+        'start_token', 'end_token'
+    ],
+    'integer_values': ['swaps'],
+    'boolean_values': ['wait_for_receive', 'mandatory', 'repeat', 'chain_swaps'],
+    'string_values': ['destination_address'],
+    'network_values': ['to_network', 'from_network'],
+    'float_values': [
+        'min_percentage', 'max_percentage',
+        'min_supply_percentage', 'max_supply_percentage',
+        'min_borrow_percentage', 'max_borrow_percentage',
+        'min_withdraw_percentage', 'max_withdraw_percentage',
+        'slippage', 'max_price', 'min_amount', 'max_amount', 'sleep_time',
+        'min_sleep_time', 'max_sleep_time', 'min_amount_usd',
+        'max_amount_usd', 'min_withdraw_sleep_time',
+        'max_withdraw_sleep_time', 'min_deposit_amount'
+    ]
+}
+
+SETTINGS_PATTERNS = {
+    'token_list_values': r'(?:\w+(?: \w+)*)?',
+    'token_values': r'[A-Za-z]+',
+    'integer_values': r'\d+',
+    'boolean_values': r'(?:yes|no)',
+    'string_values': r'[\w\d]+',
+    'network_values': r'[A-Za-z]+',
+    'float_values': r'\d+(?:\.\d+)?'
+}
+
+SETTINGS_TYPES = {
+    name: type_name
+    for type_name, names in KNOWN_SETTINGS.items()
+    for name in names
+}
+
+SETTINGS_VALUE_REGEXES = {
+    type_name: re.compile(pattern, re.IGNORECASE)
+    for type_name, pattern in SETTINGS_PATTERNS.items()
+}
+
+SETTING_NAME_REGEX = re.compile(r'(?P<name>\w+):\s+')
+
+UNKNOWN_VALUE_REGEX = re.compile(r'[^,]*?(?=,\s+|\Z)')
+
+SETTINGS_SEPARATOR_REGEX = re.compile(r',\s+(?=\S)|\Z')
+
+SETTINGS_CACHE = {}
+
+ACCOUNTS_FILE_EXTENSIONS = ['.parquet', '.jsonl', '.csv', '.xlsx']
+
+TASKS_FILE_EXTENSIONS = ['.parquet', '.jsonl', '.csv']
+
+ACCOUNTS_CHUNK_SIZE = 1000
+
+ACCOUNTS_DTYPES = {
+    'private_key': str,
+    'address': str,
+    'min_sleep_time': 'float64',
+    'max_sleep_time': 'float64',
+    'max_retries': 'float64',
+    'max_eth_gwei': 'float64',
+    'max_starknet_gwei': 'float64',
+    'proxy': str,
+    'mobile_proxy_changelink': str,
+    'metamask_private_key': str,
+    'starknet_okx_deposit_address': str,
+    'evm_okx_deposit_address': str,
+    'okx_api_key': str,
+    'okx_secret_key': str,
+    'okx_passphrase': str
+}
+
+TASKS_DTYPES = {
+    'module_name': str,
+    'function_name': str,
+    'settings': str
+}
+
+
 def shorten_private_key(private_key: str) -> str:
     if len(private_key) <= 16:
         return private_key
@@ -28,6 +142,7 @@ class Task:
     module_name: enums.ModuleNames
     function_name: enums.FunctionNames | None
     module_kwargs: dict
+    task_id: int | None = dataclasses.field(default=None, compare=False)
 
     @property
     def hash_string(self):
@@ -36,8 +151,110 @@ class Task:
 
 @dataclasses.dataclass
 class TasksBlock:
-    tasks: list[Task]
+    tasks: list['int | TasksBlock']
     mandatory: bool = False
+    settings: dict = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass
+class TasksPlan:
+    tasks: list[Task]
+    blocks: list[int | TasksBlock]
+
+    def is_mandatory(self, item: int | TasksBlock) -> bool:
+        if isinstance(item, TasksBlock):
+            return item.mandatory
+        return self.tasks[item].module_kwargs.get('mandatory', False)
+
+    def expand_block(self, tasks_block: TasksBlock) -> list[int]:
+        items = [
+            self.expand_block(item) if isinstance(item, TasksBlock) else [item]
+            for item in tasks_block.tasks
+        ]
+        mandatory_indexes = []
+        not_mandatory_indexes = []
+        for index, item in enumerate(tasks_block.tasks):
+            if self.is_mandatory(item):
+                mandatory_indexes.append(index)
+            else:
+                not_mandatory_indexes.append(index)
+
+        min_amount = int(tasks_block.settings.get('min_amount', 0))
+        max_amount = int(tasks_block.settings.get('max_amount', len(items)))
+
+        amount = random.randint(min_amount, max_amount)
+
+        if tasks_block.settings.get('repeat', False):
+            selected_indexes = random.choices(range(len(items)), k=amount)
+
+            selected = set(selected_indexes)
+            not_selected_mandatory_indexes = [index for index in mandatory_indexes if index not in selected]
+
+            if not_selected_mandatory_indexes:
+                replace_amount = len(not_selected_mandatory_indexes)
+                kept_indexes = []
+                for index in selected_indexes:
+                    if replace_amount and not self.is_mandatory(tasks_block.tasks[index]):
+                        replace_amount -= 1
+                    else:
+                        kept_indexes.append(index)
+
+                selected_indexes = kept_indexes + not_selected_mandatory_indexes
+        else:
+            amount = max(amount - len(mandatory_indexes), 0)
+            selected_indexes = mandatory_indexes + random.sample(
+                not_mandatory_indexes,
+                min(amount, len(not_mandatory_indexes))
+            )
+
+        random.shuffle(selected_indexes)
+
+        return [task_id for index in selected_indexes for task_id in items[index]]
+
+    def expand(self) -> list[Task]:
+        task_ids = []
+
+        for item in self.blocks:
+            if isinstance(item, TasksBlock):
+                task_ids.extend(self.expand_block(item))
+            else:
+                task_ids.append(item)
+
+        return self.build(task_ids)
+
+    def build(self, task_ids: list[int]) -> list[Task]:
+        tasks = []
+
+        for task_id in task_ids:
+            task = deepcopy(self.tasks[task_id])
+            task.task_id = task_id
+            tasks.append(task)
+
+        return tasks
+
+    def get_identity(self, task: Task) -> str:
+        """
+        Identifies the task across runs. Taken from the plan, because modules
+        change the kwargs of the running task.
+        """
+        return f'{task.task_id}:{self.tasks[task.task_id].hash_string}'
+
+    def restore(self, identities: list[str]) -> list[Task] | None:
+        """
+        Rebuilds the tasks saved with get_identity, None if the tasks have
+        changed since then.
+        """
+        task_ids = [int(identity.split(':', 1)[0]) for identity in identities]
+
+        if any(task_id >= len(self.tasks) for task_id in task_ids):
+            return None
+
+        tasks = self.build(task_ids)
+
+        if [self.get_identity(task) for task in tasks] != identities:
+            return None
+
+        return tasks
 
 
 @dataclasses.dataclass
@@ -46,7 +263,7 @@ class BotAccount:
     address: str
     wallet_name: enums.WalletNames
     cairo_version: int
-    tasks: list[Task]
+    tasks_plan: TasksPlan
     proxy: str
     mobile_proxy_changelink: str
     starknet_deposit_address: str
@@ -61,6 +278,17 @@ class BotAccount:
     max_retries: int = 0
     max_eth_gwei: float = float('inf')
     max_starknet_gwei: float = float('inf')
+    _tasks: list[Task] | None = dataclasses.field(default=None, init=False, repr=False)
+
+    @property
+    def tasks(self) -> list[Task]:
+        if self._tasks is None:
+            self._tasks = self.tasks_plan.expand()
+        return self._tasks
+
+    @tasks.setter
+    def tasks(self, tasks: list[Task]):
+        self._tasks = tasks
 
     @property
     def hash(self):
@@ -71,215 +299,369 @@ class BotAccount:
         return shorten_private_key(self.private_key)
 
 
-def extend_block(tasks_block: TasksBlock) -> list:
-    tasks = []
-    for task in tasks_block.tasks:
-        if isinstance(task, TasksBlock):
-            tasks.extend(extend_block(task))
-        else:
-            tasks.append(task)
-    return tasks
+def private_key_hash(private_key: str) -> str:
+    return hashlib.sha256(hex(int(private_key, 16)).encode()).hexdigest()
 
 
-def handle_random_tasks(tasks: list[Task]) -> list[Task]:
-    new_tasks = []
-    stack = []
-    params_stack = []
+def load_wallets_index() -> dict:
+    if not WALLETS_INDEX_PATH.exists():
+        return {}
 
-    index = 0
+    try:
+        with open(WALLETS_INDEX_PATH) as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f'[Account Loader] Failed to read {WALLETS_INDEX_PATH.name}, wallets will be detected again: {e}')
+        return {}
 
-    for index, task in enumerate(tasks):
-        if task.module_name == enums.ModuleNames.Random:
-            stack.append([])
-            params_stack.append(task.module_kwargs)
-        elif task.module_name == enums.ModuleNames.EndRandom:
-            if not stack:
-                logging.error(f'[Account Loader] An EndRandom module found that is not preceded by a Random module on line {index + 1}')
-                return False
 
-            random_list = stack.pop()
-            params = params_stack.pop()
+def save_wallets_index(wallets_index: dict):
+    try:
+        with open(WALLETS_INDEX_PATH, 'w') as file:
+            json.dump(wallets_index, file, indent=4)
+    except OSError as e:
+        logging.warning(f'[Account Loader] Failed to save {WALLETS_INDEX_PATH.name}: {e}')
 
-            min_amount = params.get('min_amount', 0)
-            max_amount = params.get('max_amount', len(random_list))
 
-            amount = random.randint(min_amount, max_amount)
+def detect_wallet_names(
+    wallets: list[tuple[str, str]]
+) -> dict[tuple[str, str], enums.WalletNames | None]:
+    wallets_index = load_wallets_index()
+    wallet_names = {}
+    missed_wallets = []
 
-            repeat = params.get('repeat', False)
+    for private_key, address in wallets:
+        index_entry = wallets_index.get(private_key_hash(private_key))
+        if index_entry and int(index_entry['address'], 16) == int(address, 16):
+            wallet_names[private_key, address] = enums.WalletNames.from_string(index_entry['wallet_name'])
+        else:
+            missed_wallets.append((private_key, address))
 
-            if not repeat:
-                max_amount = min(max_amount, len(random_list))
-                min_amount = min(min_amount, max_amount)
+    if not missed_wallets:
+        return wallet_names
 
-            random_tasks = []
+    logging.info(f'[Account Loader] Detecting wallet types for {len(missed_wallets)} accounts')
 
-            if repeat:
-                random_tasks = random.choices(random_list, k=amount)
+    chunk_size = create_accounts.CHUNK_SIZE
 
-                mandatory_tasks = [task for task in random_list if (isinstance(task, Task) and task.module_kwargs.get('mandatory', False)) or (isinstance(task, TasksBlock) and task.mandatory)]
-                not_mandatory_tasks = [task for task in random_list if not (isinstance(task, Task) and task.module_kwargs.get('mandatory', False)) or (isinstance(task, TasksBlock) and task.mandatory)]
+    if len(missed_wallets) > chunk_size:
+        chunks = (
+            (missed_wallets[offset:offset + chunk_size],)
+            for offset in range(0, len(missed_wallets), chunk_size)
+        )
+        detected_wallets = [
+            detected_wallet
+            for detected_chunk in create_accounts.run_in_pool(create_accounts.detect_wallets, chunks)
+            for detected_wallet in detected_chunk
+        ]
+    else:
+        detected_wallets = create_accounts.detect_wallets(missed_wallets)
+
+    for (private_key, address), (wallet_name, public_key) in zip(missed_wallets, detected_wallets):
+        wallet_names[private_key, address] = wallet_name
+        if wallet_name is not None:
+            wallets_index[private_key_hash(private_key)] = {
+                'wallet_name': str(wallet_name),
+                'public_key': hex(public_key),
+                'address': hex(int(address, 16))
+            }
 
-                not_added_tasks = [task for task in mandatory_tasks if task not in random_tasks]
-                added_not_manadatory_tasks = [task for task in random_tasks if task in not_mandatory_tasks]
+    save_wallets_index(wallets_index)
 
-                if not_added_tasks:
-                    for mandatory_task, not_mandatory_task in zip(not_added_tasks, added_not_manadatory_tasks):
-                        random_tasks.remove(not_mandatory_task)
+    return wallet_names
 
-                    random_tasks.extend(not_added_tasks)
-            else:
-                for sub_task in copy(random_list):
-                    if isinstance(sub_task, TasksBlock):
-                        mandatory = sub_task.mandatory
-                    else:
-                        mandatory = sub_task.module_kwargs.get('mandatory', False)
-                    if mandatory:
-                        random_tasks.append(sub_task)
 
-                amount -= len(random_tasks)
+def compile_tasks_plan(tasks: list[Task]) -> TasksPlan | bool:
+    blocks = []
+    stack = []
 
-                if amount > 0:
-                    not_added_tasks = [task for task in random_list if task not in random_tasks]
-                    if not_added_tasks:
-                        random_tasks.extend(random.sample(not_added_tasks, min(amount, len(not_added_tasks))))
+    index = 0
 
-            random.shuffle(random_tasks)
+    for index, task in enumerate(tasks):
+        if task.module_name == enums.ModuleNames.Random:
+            stack.append(TasksBlock(
+                tasks=[],
+                mandatory=task.module_kwargs.get('mandatory', False),
+                settings=task.module_kwargs
+            ))
+        elif task.module_name == enums.ModuleNames.EndRandom:
+            if not stack:
+                logging.error(f'[Account Loader] An EndRandom module found that is not preceded by a Random module on line {index + 1}')
+                return False
 
-            tasks_block = TasksBlock(random_tasks, params.get('mandatory', False))
+            tasks_block = stack.pop()
 
             if stack:
-                stack[-1].append(tasks_block)
+                stack[-1].tasks.append(tasks_block)
             else:
-                new_tasks.append(tasks_block)
+                blocks.append(tasks_block)
+        elif stack:
+            stack[-1].tasks.append(index)
         else:
-            if stack:
-                stack[-1].append(task)
-            else:
-                new_tasks.append(task)
+            blocks.append(index)
 
     if stack:
         logging.error(f'[Account Loader] Found not closed random task on line {index + 1}')
         return False
 
-    tasks = []
-
-    for task in new_tasks:
-        if isinstance(task, TasksBlock):
-            tasks.extend(extend_block(task))
-        else:
-            tasks.append(task)
-
-    return tasks
+    return TasksPlan(tasks=tasks, blocks=blocks)
 
 
 def parse_settings(settings_string) -> dict | list:
-    known_settings = {
-        'token_list_values': [
-            'swap_tokens', 'pool_tokens', 'exclude_tokens'
-        ],
-        'token_values': [
-            'start_token', 'end_token'
-        ],
-        'integer_values': ['swaps'],
-        'boolean_values': ['wait_for_receive', 'mandatory', 'repeat'],
-        'string_values': ['destination_address'],
-        'network_values': ['to_network', 'from_network'],
-        'float_values': [
-            'min_percentage', 'max_percentage',
-            'min_supply_percentage', 'max_supply_percentage',
-            'min_borrow_percentage', 'max_borrow_percentage',
-            'min_withdraw_percentage', 'max_withdraw_percentage',
-            'slippage', 'max_price', 'min_amount', 'max_amount', 'sleep_time',
-            'min_sleep_time', 'max_sleep_time', 'min_amount_usd',
-            'max_amount_usd', 'min_withdraw_sleep_time',
-            'max_withdraw_sleep_time', 'min_deposit_amount'
-        ]
-    }
-
     if not settings_string:
         return {}
 
-    patterns = {
-        'token_list_values': fr'(?:\w+(?: \w+)*)?',
-        'token_values': r'[A-Za-z]+',
-        'integer_values': r'\d+',
-        'boolean_values': r'(?:yes|no)',
-        'string_values': r'[\w\d]+',
-        'network_values': r'[A-Za-z]+',
-        'float_values': r'\d+(?:\.\d+)?'
-    }
-
-    refined_patterns = []
-    for type_name, names in known_settings.items():
-        for name in names:
-            refined_patterns.append(fr'{name}:\s+{patterns[type_name]}')
-
-    segment_combined_pattern = '|'.join(refined_patterns)
-    full_pattern = fr'^(?:{segment_combined_pattern})(?:,\s+(?:{segment_combined_pattern}))*$'
-    regex_error = False
-
-    if not re.match(full_pattern, settings_string, re.IGNORECASE):
-        regex_error = True
-
-    settings_list = settings_string.split(',')
+    if settings_string not in SETTINGS_CACHE:
+        settings_dict = tokenize_settings(settings_string)
+
+        if settings_dict is False:
+            return False
+
+        SETTINGS_CACHE[settings_string] = MappingProxyType(settings_dict)
+
+    return dict(SETTINGS_CACHE[settings_string])
+
+
+def tokenize_settings(settings_string: str) -> dict | bool:
     settings_dict = {}
     unknown_settings = []
+    position = 0
 
-    for setting in settings_list:
-        try:
-            name, value = setting.split(':')
-        except ValueError:
-            logging.error(f'[Account Loader] Invalid settings string: {settings_string}')
+    while True:
+        name_match = SETTING_NAME_REGEX.match(settings_string, position)
+        if name_match is None:
+            logging.error(f'[Account Loader] Invalid settings string: {settings_string} (expected setting name at position {position + 1})')
             return False
-        name = name.strip().lower()
-        value = value.strip()
 
-        if any(name in values for values in known_settings.values()):
+        name = name_match.group('name').lower()
+        position = name_match.end()
+
+        if name not in SETTINGS_TYPES:
+            unknown_settings.append(name)
+            value_regex = UNKNOWN_VALUE_REGEX
+        else:
+            value_regex = SETTINGS_VALUE_REGEXES[SETTINGS_TYPES[name]]
+
+        value_match = value_regex.match(settings_string, position)
+        separator_match = SETTINGS_SEPARATOR_REGEX.match(settings_string, value_match.end()) if value_match else None
+
+        if separator_match is None:
+            logging.error(f'[Account Loader] Invalid settings string: {settings_string} (invalid value for {name} setting at position {position + 1})')
+            return False
+
+        if name in SETTINGS_TYPES:
+            value = value_match.group()
+            type_name = SETTINGS_TYPES[name]
             try:
-                if name in known_settings['token_list_values']:
-                    values = value.split(' ')
-                    converted_values = {enums.TokenNames.from_string(value) for value in values}
-                    settings_dict[name] = converted_values
-                elif name in known_settings['token_values']:
+                if type_name == 'token_list_values':
+                    settings_dict[name] = frozenset(enums.TokenNames.from_string(value) for value in value.split(' '))
+                elif type_name == 'token_values':
                     settings_dict[name] = enums.TokenNames.from_string(value)
-                elif name in known_settings['boolean_values']:
+                elif type_name == 'boolean_values':
                     settings_dict[name] = True if value.lower() == 'yes' else False
-                elif name in known_settings['integer_values']:
+                elif type_name == 'integer_values':
                     settings_dict[name] = int(value)
-                elif name in known_settings['string_values']:
+                elif type_name == 'string_values':
                     settings_dict[name] = value
-                elif name in known_settings['network_values']:
-                    network_name = enums.NetworkNames.from_string(value)
-                    if network_name is None:
-                        logging.error(f'[Account Loader] Unknown network name {value} in {name} setting')
-                        return False
-                    settings_dict[name] = network_name
+                elif type_name == 'network_values':
+                    settings_dict[name] = enums.NetworkNames.from_string(value)
                 else:
-                    settings_dict[name] = float(value.replace(',', '.'))
+                    settings_dict[name] = float(value)
             except ValueError as ve:
-                logging.error(f'[Account Loader] Invalid value {value} for {name} setting')
+                logging.error(f'[Account Loader] Invalid value {value} for {name} setting at position {position + 1}')
                 logging.error(f'[Account Loader] {str(ve).capitalize()}')
                 return False
-        else:
-            unknown_settings.append(name)
+
+        position = separator_match.end()
+
+        if position == len(settings_string):
+            break
 
     if unknown_settings:
         logging.error(f'[Account Loader] Unknown settings: {", ".join(unknown_settings)}')
         return False
-    elif regex_error:
-        logging.error(f'[Account Loader] Invalid settings string: {settings_string}')
-        return False
 
     return settings_dict
 
 
-def read_accounts() -> list[BotAccount]:
-    warnings.filterwarnings(
-        'ignore',
-        category=UserWarning,
-        module='openpyxl'
+def read_table_chunks(
+    table_path: Path,
+    dtypes: dict,
+    chunk_size: int = ACCOUNTS_CHUNK_SIZE
+):
+    suffix = table_path.suffix.lower()
+
+    if suffix == '.csv':
+        chunks = pd.read_csv(table_path, dtype=dtypes, chunksize=chunk_size)
+    elif suffix == '.jsonl':
+        chunks = pd.read_json(table_path, lines=True, dtype=False, convert_dates=False, chunksize=chunk_size)
+    elif suffix == '.parquet':
+        import pyarrow.parquet as pq
+
+        chunks = (
+            batch.to_pandas()
+            for batch in pq.ParquetFile(table_path).iter_batches(batch_size=chunk_size)
+        )
+    else:
+        raise ValueError(f'Unsupported file format: {table_path.name}')
+
+    offset = 0
+
+    for chunk in chunks:
+        if suffix != '.csv':
+            for column, dtype in dtypes.items():
+                if column not in chunk.columns:
+                    continue
+                if dtype is str:
+                    chunk[column] = chunk[column].map(lambda value: None if pd.isna(value) else str(value))
+                else:
+                    chunk[column] = chunk[column].astype(dtype)
+
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+
+        yield chunk
+
+
+def parse_tasks(
+    tasks_df: pd.DataFrame,
+    tasks_sheet_name: str
+) -> list[Task] | bool:
+    unknown_tasks_columns = set(tasks_df.columns) - {'module_name', 'function_name', 'settings'}
+    if unknown_tasks_columns:
+        logging.error(f'[Account Loader] Unknown columns in "{tasks_sheet_name}" sheet: {", ".join(unknown_tasks_columns)}')
+        return False
+
+    tasks_columns = list(tasks_df.columns)
+    required_tasks_columns = ['module_name', 'function_name', 'settings']
+    missing_columns = set(required_tasks_columns) - set(tasks_columns)
+    if missing_columns:
+        logging.error(f'[Account Loader] Missing columns in "{tasks_sheet_name}" sheet: {", ".join(missing_columns)}')
+        return False
+    elif set(required_tasks_columns) == set(tasks_columns) and tasks_columns != required_tasks_columns:
+        logging.error(f'[Account Loader] Invalid order of columns in "{tasks_sheet_name}" sheet')
+        return False
+    elif list(tasks_df.columns) != required_tasks_columns:
+        logging.error(f'[Account Loader] Invalid columns in "{tasks_sheet_name}" sheet')
+        return False
+
+    tasks_df.module_name = tasks_df.module_name.str.strip()
+    tasks_df.function_name = tasks_df.function_name.str.strip()
+    tasks_df.settings = tasks_df.settings.str.strip()
+
+    tasks_df.dropna(subset=['module_name'], inplace=True)
+    tasks_df.function_name = tasks_df.function_name.fillna(0).replace(0, None)
+    tasks_df.settings = tasks_df.settings.fillna('')
+    tasks = []
+    for index, task_row in tasks_df.iterrows():
+        settings_line = task_row.settings
+        parse_result = parse_settings(settings_line)
+        if parse_result is False:
+            logging.error(f'[Account Loader] Failed to parse settings in "{tasks_sheet_name}" sheet, "{task_row.module_name}" module, "{settings_line}" line')
+            return False
+        try:
+            module_name = enums.ModuleNames.from_string(task_row.module_name)
+        except ValueError:
+            logging.error(f'[Account Loader] Unknown module name "{task_row.module_name}" in "{tasks_sheet_name}" sheet')
+            return False
+        function_name = None
+        if task_row.function_name is not None:
+            try:
+                function_name = enums.FunctionNames.from_string(task_row.function_name)
+            except ValueError:
+                logging.error(f'[Account Loader] Unknown function name "{task_row.function_name}" in "{tasks_sheet_name}" sheet, "{task_row.module_name}" module')
+                return False
+            if function_name not in constants.MODULE_FUNCTIONS[module_name]:
+                logging.error(f'[Account Loader] Function "{function_name}" is not available in "{task_row.module_name}" module ("{tasks_sheet_name}" sheet)')
+                return False
+        elif constants.MODULE_FUNCTIONS[module_name]:
+            logging.error(f'[Account Loader] Function name must be specified for "{task_row.module_name}" module in "{tasks_sheet_name}" sheet')
+            return False
+        tasks.append(Task(
+            module_name=module_name,
+            function_name=function_name,
+            module_kwargs=parse_result
+        ))
+
+    return tasks
+
+
+def read_tasks_sheet(
+    accounts_file: pd.ExcelFile,
+    tasks_sheet_name: str
+) -> list[Task] | bool:
+    tasks_df = accounts_file.parse(
+        sheet_name=tasks_sheet_name,
+        dtype=TASKS_DTYPES
     )
 
+    return parse_tasks(tasks_df, tasks_sheet_name)
+
+
+def read_tasks_file(tasks_path: Path) -> list[Task] | bool:
+    chunks = list(read_table_chunks(tasks_path, TASKS_DTYPES))
+
+    if chunks:
+        tasks_df = pd.concat(chunks)
+    else:
+        tasks_df = pd.DataFrame(columns=list(TASKS_DTYPES))
+
+    return parse_tasks(tasks_df, tasks_path.name)
+
+
+def find_accounts_file() -> Path | None:
+    for extension in ACCOUNTS_FILE_EXTENSIONS:
+        accounts_path = Path(__file__).parent / f'accounts{extension}'
+        if accounts_path.exists():
+            return accounts_path
+
+    return None
+
+
+def prepare_accounts_chunk(
+    accounts_df: pd.DataFrame,
+    accounts_sheet_name: str,
+    default_account_values: dict
+) -> pd.DataFrame | bool:
+    accounts_df = accounts_df.apply(lambda x: x.str.strip() if x.dtype == object else x)
+    unknown_account_columns = set(accounts_df.columns) - set(ACCOUNTS_DTYPES.keys())
+
+    if unknown_account_columns:
+        logging.error(f'[Account Loader] Unknown account columns in "{accounts_sheet_name}" sheet: {", ".join(unknown_account_columns)}')
+        return False
+
+    accounts_df.dropna(subset=['private_key', 'address'], inplace=True, how='all')
+    for column in accounts_df.columns:
+        if column in default_account_values:
+            accounts_df[column] = accounts_df[column].fillna(
+                default_account_values[column]
+            )
+        else:
+            accounts_df[column] = accounts_df[column].fillna(-31294912).replace(-31294912, None)
+
+    return accounts_df
+
+
+def parse_proxy(proxy: str | None) -> dict[str, str] | None | bool:
+    if not proxy:
+        return None
+
+    if re.match(r'(socks5|http)://', proxy):
+        return {
+            'http': proxy,
+            'https': proxy
+        }
+    elif '/' not in proxy:
+        return {
+            'http': f'http://{proxy}',
+            'https': f'http://{proxy}'
+        }
+
+    logging.error(f'[Account Loader] Invalid proxy "{proxy}"')
+    return False
+
+
+def setup_telegram_logging() -> bool:
     telegram_path = Path(__file__).parent / 'telegram.json'
     if telegram_path.exists():
         with open(telegram_path) as f:
@@ -310,267 +692,422 @@ def read_accounts() -> list[BotAccount]:
                 logging.error(f'[Account Loader] Missing token in {telegram_path.name}')
                 return False
 
-    logging.info('[Account Loader] Loading accounts')
+    return True
 
-    accounts = []
+
+def iter_account_groups(accounts_path: Path):
+    """
+    Yields accounts as soon as their rows are validated, accounts between
+    Random and EndRandom rows are yielded together as a not shuffled list.
+    False is yielded once on the first error, after which the generator stops.
+    """
+    warnings.filterwarnings(
+        'ignore',
+        category=UserWarning,
+        module='openpyxl'
+    )
 
     default_account_values = {}
     for field in dataclasses.fields(BotAccount):
         if field.default != dataclasses.MISSING:
             default_account_values[field.name] = field.default
 
-    acounts_file_path = Path(__file__).parent / 'accounts.xlsx'
+    accounts_file = None
+    sheets_tasks_plans = {}
+
+    if accounts_path.suffix.lower() == '.xlsx':
+        accounts_file = pd.ExcelFile(accounts_path)
+        sheets = {sheet.strip().lower(): sheet for sheet in accounts_file.sheet_names}
+        accounts_sheet_name = 'accounts'
+        tasks_sources = {
+            sheet_key: sheet
+            for sheet_key, sheet in sheets.items()
+            if sheet_key.startswith('tasks')
+        }
+        accounts_chunks = [accounts_file.parse(
+            sheet_name=sheets.get('accounts', 'accounts'),
+            dtype=ACCOUNTS_DTYPES
+        )]
+    else:
+        accounts_sheet_name = accounts_path.name
+        tasks_sources = {}
+        for extension in reversed(TASKS_FILE_EXTENSIONS):
+            for tasks_path in accounts_path.parent.glob(f'tasks*{extension}'):
+                tasks_sources[tasks_path.stem.strip().lower()] = tasks_path
+        accounts_chunks = read_table_chunks(accounts_path, ACCOUNTS_DTYPES)
+
+    random_accounts = None
+    random_row_index = 0
+
+    try:
+        for accounts_df in accounts_chunks:
+            accounts_df = prepare_accounts_chunk(accounts_df, accounts_sheet_name, default_account_values)
+
+            if accounts_df is False:
+                yield False
+                return
+
+            wallet_names = detect_wallet_names([
+                (row.private_key, row.address)
+                for row in accounts_df.itertuples()
+                if row.private_key and row.address
+                and re.match(r'^(0x)?[a-fA-F0-9]+$', row.private_key)
+                and re.match(r'^(0x)?[a-fA-F0-9]+$', row.address)
+            ])
+
+            for row in accounts_df.itertuples():
+                cairo_version = 0
+
+                if not row.private_key:
+                    logging.error(f'[Account Loader] Missing private key on row {row.Index + 1} of "{accounts_sheet_name}" sheet')
+                    yield False
+                    return
+
+                if row.private_key.lower() == 'random':
+                    if random_accounts is not None:
+                        logging.error(f'[Account Loader] Found not closed random account on row {random_row_index + 1} of "{accounts_sheet_name}" sheet')
+                        yield False
+                        return
+                    random_accounts = []
+                    random_row_index = row.Index
+                    continue
+                elif row.private_key.lower() == 'endrandom':
+                    if random_accounts is None:
+                        logging.error(f'[Account Loader] An EndRandom account found that is not preceded by a Random account on row {row.Index + 1} of "{accounts_sheet_name}" sheet')
+                        yield False
+                        return
+                    yield random_accounts
+                    random_accounts = None
+                    continue
+
+                if not row.address:
+                    logging.error(f'[Account Loader] Missing address on row {row.Index + 1} of "{accounts_sheet_name}" sheet')
+                    yield False
+                    return
+                elif not re.match(r'^(0x)?[a-fA-F0-9]+$', row.private_key):
+                    short_private_key = shorten_private_key(row.private_key)
+                    logging.error(f'[Account Loader] Invalid private key "{short_private_key}" on row {row.Index + 1} of "{accounts_sheet_name}" sheet')
+                    yield False
+                    return
+                elif not re.match(r'^(0x)?[a-fA-F0-9]+$', row.address):
+                    logging.error(f'[Account Loader] Invalid address "{row.address}" on row {row.Index + 1} of "{accounts_sheet_name}" sheet')
+                    yield False
+                    return
+
+                wallet_name = wallet_names.get((row.private_key, row.address))
+
+                if wallet_name is None:
+                    logging.error(f'[Account Loader] Invalid address "{row.address}" for private key "{shorten_private_key(row.private_key)}" on row {row.Index + 1} of "{accounts_sheet_name}" sheet')
+                    yield False
+                    return
+
+                if wallet_name == enums.WalletNames.ArgentX:
+                    cairo_version = 1
+
+                tasks_source = tasks_sources.get(f'tasks_{row.Index + 1}', tasks_sources.get('tasks'))
+
+                if tasks_source is None:
+                    logging.error(f'[Account Loader] Missing tasks list for account on row {row.Index + 1} of "{accounts_sheet_name}" sheet')
+                    yield False
+                    return
+
+                if tasks_source not in sheets_tasks_plans:
+                    if accounts_file is not None:
+                        tasks = read_tasks_sheet(accounts_file, tasks_source)
+                        tasks_sheet_name = tasks_source
+                    else:
+                        tasks = read_tasks_file(tasks_source)
+                        tasks_sheet_name = tasks_source.name
 
-    if not acounts_file_path.exists():
-        logging.error(f'[Account Loader] File "{acounts_file_path.name}" does not exist')
-        return False
+                    if tasks is False:
+                        yield False
+                        return
 
-    accounts_file = pd.ExcelFile(acounts_file_path)
-    sheets = [sheet.lower() for sheet in accounts_file.sheet_names]
-    del accounts_file
-
-    dtypes = {
-        'private_key': str,
-        'address': str,
-        'min_sleep_time': 'float64',
-        'max_sleep_time': 'float64',
-        'max_retries': 'float64',
-        'max_eth_gwei': 'float64',
-        'max_starknet_gwei': 'float64',
-        'proxy': str,
-        'mobile_proxy_changelink': str,
-        'metamask_private_key': str,
-        'starknet_okx_deposit_address': str,
-        'evm_okx_deposit_address': str,
-        'okx_api_key': str,
-        'okx_secret_key': str,
-        'okx_passphrase': str
-    }
-
-    accounts_df = pd.read_excel(
-        acounts_file_path,
-        sheet_name='accounts',
-        dtype=dtypes
-    )
-    accounts_df = accounts_df.apply(lambda x: x.str.strip() if x.dtype == object else x)
-    unknown_account_columns = set(accounts_df.columns) - set(dtypes.keys())
+                    sheets_tasks_plans[tasks_source] = compile_tasks_plan(tasks)
 
-    if unknown_account_columns:
-        logging.error(f'[Account Loader] Unknown account columns in "accounts" sheet: {", ".join(unknown_account_columns)}')
-        return False
+                    if sheets_tasks_plans[tasks_source] is False:
+                        logging.error(f'[Account Loader] Failed to handle random tasks in "{tasks_sheet_name}" sheet')
+                        yield False
+                        return
 
-    accounts_df.dropna(subset=['private_key', 'address'], inplace=True, how='all')
-    for column in accounts_df.columns:
-        if column in default_account_values:
-            accounts_df[column] = accounts_df[column].fillna(
-                default_account_values[column]
-            )
-        else:
-            accounts_df[column] = accounts_df[column].fillna(-31294912).replace(-31294912, None)
+                tasks_plan = sheets_tasks_plans[tasks_source]
 
-    for row in accounts_df.itertuples():
-        cairo_version = 0
-        wallet_name = enums.WalletNames.Braavos
+                proxy = parse_proxy(row.proxy)
 
-        if not row.private_key:
-            logging.error(f'[Account Loader] Missing private key on row {row.Index + 1} of "accounts" sheet')
-            return False
-        if row.private_key.lower() not in {'random', 'endrandom'}:
-            if not row.address:
-                logging.error(f'[Account Loader] Missing address on row {row.Index + 1} of "accounts" sheet')
-                return False
-            elif not re.match(r'^(0x)?[a-fA-F0-9]+$', row.private_key):
-                short_private_key = shorten_private_key(row.private_key)
-                logging.error(f'[Account Loader] Invalid private key "{short_private_key}" on row {row.Index + 1} of "accounts" sheet')
-                return False
-            elif not re.match(r'^(0x)?[a-fA-F0-9]+$', row.address):
-                logging.error(f'[Account Loader] Invalid address "{row.address}" on row {row.Index + 1} of "accounts" sheet')
-                return False
+                if proxy is False:
+                    yield False
+                    return
 
-            for test_wallet_name in enums.WalletNames:
-                _, address = create_accounts.wallet_from_private_key(
-                    row.private_key,
-                    test_wallet_name
-                )
+                if row.metamask_private_key:
+                    try:
+                        metamask_address = keys.PrivateKey(HexBytes(row.metamask_private_key)).public_key.to_checksum_address()
+                    except Exception as e:
+                        logging.error(f'[Account Loader] Failed to load metamask private key: {e}')
+                        yield False
+                        return
+                else:
+                    metamask_address = None
 
-                if int(row.address, 16) == int(address, 16):
-                    wallet_name = test_wallet_name
-                    break
-            else:
-                logging.error(f'[Account Loader] Invalid address "{row.address}" for private key "{shorten_private_key(row.private_key)}" on row {row.Index + 1} of "accounts" sheet')
-                return False
+                try:
+                    account = BotAccount(
+                        private_key=row.private_key,
+                        address=row.address,
+                        wallet_name=wallet_name,
+                        cairo_version=cairo_version,
+                        tasks_plan=tasks_plan,
+                        min_sleep_time=row.min_sleep_time,
+                        max_sleep_time=row.max_sleep_time,
+                        max_retries=int(row.max_retries),
+                        max_eth_gwei=row.max_eth_gwei,
+                        max_starknet_gwei=row.max_starknet_gwei,
+                        evm_private_key=row.metamask_private_key,
+                        evm_address=metamask_address,
+                        proxy=proxy,
+                        mobile_proxy_changelink=row.mobile_proxy_changelink,
+                        starknet_deposit_address=row.starknet_okx_deposit_address,
+                        evm_deposit_address=row.evm_okx_deposit_address,
+                        okx_api_key=row.okx_api_key,
+                        okx_secret_key=row.okx_secret_key,
+                        okx_passphrase=row.okx_passphrase,
+                    )
+                except AttributeError as e:
+                    res = re.search("has no attribute '(?P<attribute>.+)'", str(e))
+                    if res:
+                        attribute = res.group('attribute')
+                        logging.error(f'[Account Loader] Missing {attribute} column in "{accounts_sheet_name}" sheet')
+                    else:
+                        logging.error(f'[Account Loader] Failed to load account: {e}')
+                    yield False
+                    return
+                okx_keys = [account.okx_api_key, account.okx_secret_key, account.okx_passphrase]
+                if any(okx_keys) and not all(okx_keys):
+                    logging.error(f'[Account Loader] All or none of OKX keys must be specified for "{account.short_private_key}"')
+                    yield False
+                    return
+
+                if random_accounts is not None:
+                    random_accounts.append(account)
+                else:
+                    yield account
 
-            if wallet_name == enums.WalletNames.ArgentX:
-                cairo_version = 1
+        if random_accounts is not None:
+            logging.error(f'[Account Loader] Found not closed random account on row {random_row_index + 1} of "{accounts_sheet_name}" sheet')
+            yield False
+            return
+    finally:
+        if accounts_file is not None:
+            accounts_file.close()
 
-        tasks_sheet_name = f'tasks_{row.Index + 1}'
 
-        for sheet_name in sheets:
-            if sheet_name.strip() == tasks_sheet_name:
-                tasks_sheet_name = sheet_name
-                break
-        else:
-            tasks_sheet_name = 'tasks'
-
-        tasks_df = pd.read_excel(
-            acounts_file_path,
-            sheet_name=tasks_sheet_name,
-            dtype={
-                'module_name': str,
-                'function_name': str,
-                'settings': str
-            }
-        )
+def accounts_sources_hash(accounts_path: Path) -> str:
+    source_paths = [accounts_path]
 
-        unknown_tasks_columns = set(tasks_df.columns) - {'module_name', 'function_name', 'settings'}
-        if unknown_tasks_columns:
-            logging.error(f'[Account Loader] Unknown columns in "{tasks_sheet_name}" sheet: {", ".join(unknown_tasks_columns)}')
-            return False
+    if accounts_path.suffix.lower() != '.xlsx':
+        source_paths.extend(sorted(
+            tasks_path
+            for extension in TASKS_FILE_EXTENSIONS
+            for tasks_path in accounts_path.parent.glob(f'tasks*{extension}')
+        ))
 
-        tasks_columns = list(tasks_df.columns)
-        required_tasks_columns = ['module_name', 'function_name', 'settings']
-        missing_columns = set(required_tasks_columns) - set(tasks_columns)
-        if missing_columns:
-            logging.error(f'[Account Loader] Missing columns in "{tasks_sheet_name}" sheet: {", ".join(missing_columns)}')
-            return False
-        elif set(required_tasks_columns) == set(tasks_columns) and tasks_columns != required_tasks_columns:
-            logging.error(f'[Account Loader] Invalid order of columns in "{tasks_sheet_name}" sheet')
-            return False
-        elif list(tasks_df.columns) != required_tasks_columns:
-            logging.error(f'[Account Loader] Invalid columns in "{tasks_sheet_name}" sheet')
-            return False
+    source_paths.extend(ACCOUNTS_SNAPSHOT_DEPENDENCIES)
 
-        tasks_df.module_name = tasks_df.module_name.str.strip()
-        tasks_df.function_name = tasks_df.function_name.str.strip()
-        tasks_df.settings = tasks_df.settings.str.strip()
+    sources_hash = hashlib.sha256(str(ACCOUNTS_SNAPSHOT_VERSION).encode())
 
-        tasks_df.dropna(subset=['module_name'], inplace=True)
-        tasks_df.function_name = tasks_df.function_name.fillna(0).replace(0, None)
-        tasks_df.settings = tasks_df.settings.fillna('')
-        tasks = []
-        for index, task_row in tasks_df.iterrows():
-            settings_line = task_row.settings
-            parse_result = parse_settings(settings_line)
-            if parse_result is False:
-                logging.error(f'[Account Loader] Failed to parse settings in "{tasks_sheet_name}" sheet, "{task_row.module_name}" module, "{settings_line}" line')
-                return False
-            try:
-                module_name = enums.ModuleNames.from_string(task_row.module_name)
-            except ValueError:
-                logging.error(f'[Account Loader] Unknown module name "{task_row.module_name}" in "{tasks_sheet_name}" sheet')
-                return False
-            function_name = None
-            if task_row.function_name is not None:
-                try:
-                    function_name = enums.FunctionNames.from_string(task_row.function_name)
-                except ValueError:
-                    logging.error(f'[Account Loader] Unknown function name "{task_row.function_name}" in "{tasks_sheet_name}" sheet, "{task_row.module_name}" module')
-                    return False
-                if function_name not in constants.MODULE_FUNCTIONS[module_name]:
-                    logging.error(f'[Account Loader] Function "{function_name}" is not available in "{task_row.module_name}" module ("{tasks_sheet_name}" sheet)')
-                    return False
-            elif constants.MODULE_FUNCTIONS[module_name]:
-                logging.error(f'[Account Loader] Function name must be specified for "{task_row.module_name}" module in "{tasks_sheet_name}" sheet')
-                return False
-            tasks.append(Task(
-                module_name=module_name,
-                function_name=function_name,
-                module_kwargs=parse_result
-            ))
+    for source_path in source_paths:
+        sources_hash.update(source_path.name.encode())
+        with open(source_path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                sources_hash.update(block)
+
+    return sources_hash.hexdigest()
+
+
+def load_accounts_snapshot(sources_hash: str) -> list | None:
+    if not ACCOUNTS_SNAPSHOT_PATH.exists():
+        return None
+
+    try:
+        with open(ACCOUNTS_SNAPSHOT_PATH, 'rb') as file:
+            snapshot = pickle.load(file)
+    except Exception as e:
+        logging.warning(f'[Account Loader] Failed to load {ACCOUNTS_SNAPSHOT_PATH.name}, rebuilding it: {e}')
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get('hash') != sources_hash:
+        return None
 
-        tasks = handle_random_tasks(tasks)
+    return snapshot['account_groups']
 
-        if tasks is False:
-            logging.error(f'[Account Loader] Failed to handle random tasks in "{tasks_sheet_name}" sheet')
+
+def strip_account_secrets(account_group):
+    accounts = account_group if isinstance(account_group, list) else [account_group]
+
+    for account in accounts:
+        for field_name in ACCOUNTS_SNAPSHOT_SECRET_FIELDS:
+            setattr(account, field_name, None)
+
+    return account_group
+
+
+def iter_account_secrets(accounts_path: Path):
+    """
+    Yields the secret fields of the accounts file rows in the order the
+    accounts were loaded, skipping the Random and EndRandom rows.
+    """
+    if accounts_path.suffix.lower() == '.xlsx':
+        with pd.ExcelFile(accounts_path) as accounts_file:
+            sheets = {sheet.strip().lower(): sheet for sheet in accounts_file.sheet_names}
+            accounts_chunks = [accounts_file.parse(
+                sheet_name=sheets.get('accounts', 'accounts'),
+                dtype=ACCOUNTS_DTYPES
+            )]
+        accounts_sheet_name = 'accounts'
+    else:
+        accounts_chunks = read_table_chunks(accounts_path, ACCOUNTS_DTYPES)
+        accounts_sheet_name = accounts_path.name
+
+    for accounts_df in accounts_chunks:
+        accounts_df = prepare_accounts_chunk(accounts_df, accounts_sheet_name, {})
+
+        if accounts_df is False:
+            yield False
+            return
+
+        for row in accounts_df.itertuples():
+            if row.private_key and row.private_key.lower() in {'random', 'endrandom'}:
+                continue
+
+            proxy = parse_proxy(row.proxy)
+
+            if proxy is False:
+                yield False
+                return
+
+            yield row.address, {
+                'private_key': row.private_key,
+                'evm_private_key': row.metamask_private_key,
+                'proxy': proxy,
+                'mobile_proxy_changelink': row.mobile_proxy_changelink,
+                'okx_api_key': row.okx_api_key,
+                'okx_secret_key': row.okx_secret_key,
+                'okx_passphrase': row.okx_passphrase
+            }
+
+
+def restore_account_secrets(
+    account_group,
+    account_secrets
+) -> bool:
+    accounts = account_group if isinstance(account_group, list) else [account_group]
+
+    for account in accounts:
+        secrets_row = next(account_secrets, None)
+
+        if secrets_row is False:
+            return False
+        elif secrets_row is None or secrets_row[0] != account.address:
+            logging.error(f'[Account Loader] {ACCOUNTS_SNAPSHOT_PATH.name} does not match the accounts file, run with --rebuild-accounts')
             return False
 
-        if row.proxy:
-            if re.match(r'(socks5|http)://', row.proxy):
-                proxy = {
-                    'http': row.proxy,
-                    'https': row.proxy
-                }
-            elif '/' not in row.proxy:
-                proxy = {
-                    'http': f'http://{row.proxy}',
-                    'https': f'http://{row.proxy}'
-                }
-            else:
-                logging.error(f'[Account Loader] Invalid proxy "{row.proxy}"')
-                return False
-        else:
-            proxy = None
+        for field_name, value in secrets_row[1].items():
+            setattr(account, field_name, value)
 
-        if row.metamask_private_key:
-            try:
-                metamask_address = keys.PrivateKey(HexBytes(row.metamask_private_key)).public_key.to_checksum_address()
-            except Exception as e:
-                logging.error(f'[Account Loader] Failed to load metamask private key: {e}')
-                return False
-        else:
-            metamask_address = None
+    return True
 
-        try:
-            account = BotAccount(
-                private_key=row.private_key,
-                address=row.address,
-                wallet_name=wallet_name,
-                cairo_version=cairo_version,
-                tasks=tasks,
-                min_sleep_time=row.min_sleep_time,
-                max_sleep_time=row.max_sleep_time,
-                max_retries=int(row.max_retries),
-                max_eth_gwei=row.max_eth_gwei,
-                max_starknet_gwei=row.max_starknet_gwei,
-                evm_private_key=row.metamask_private_key,
-                evm_address=metamask_address,
-                proxy=proxy,
-                mobile_proxy_changelink=row.mobile_proxy_changelink,
-                starknet_deposit_address=row.starknet_okx_deposit_address,
-                evm_deposit_address=row.evm_okx_deposit_address,
-                okx_api_key=row.okx_api_key,
-                okx_secret_key=row.okx_secret_key,
-                okx_passphrase=row.okx_passphrase,
+
+def save_accounts_snapshot(
+    sources_hash: str,
+    account_groups: list
+):
+    temp_path = ACCOUNTS_SNAPSHOT_PATH.with_suffix('.tmp')
+
+    try:
+        with open(temp_path, 'wb') as file:
+            pickle.dump(
+                {
+                    'hash': sources_hash,
+                    'account_groups': account_groups
+                },
+                file,
+                protocol=pickle.HIGHEST_PROTOCOL
             )
-        except AttributeError as e:
-            res = re.search("has no attribute '(?P<attribute>.+)'", str(e))
-            if res:
-                attribute = res.group('attribute')
-                logging.error(f'[Account Loader] Missing {attribute} column in "accounts" sheet')
-            else:
-                logging.error(f'[Account Loader] Failed to load account: {e}')
+        os.replace(temp_path, ACCOUNTS_SNAPSHOT_PATH)
+    except Exception as e:
+        logging.warning(f'[Account Loader] Failed to save {ACCOUNTS_SNAPSHOT_PATH.name}: {e}')
+
+
+def iter_accounts(rebuild: bool = False):
+    """
+    Yields accounts as soon as they are loaded, so the first accounts can run
+    while the rest of the file is still being read. Accounts between Random
+    and EndRandom rows are yielded shuffled once the whole group is read.
+    False is yielded once on the first error, after which the generator stops.
+    The snapshot is written after the last account has been read.
+    """
+    if not setup_telegram_logging():
+        yield False
+        return
+
+    accounts_path = find_accounts_file()
+
+    if accounts_path is None:
+        logging.error('[Account Loader] File "accounts.xlsx" does not exist')
+        yield False
+        return
+
+    sources_hash = accounts_sources_hash(accounts_path)
+    account_groups = None if rebuild else load_accounts_snapshot(sources_hash)
+    loaded_groups = None
+
+    if account_groups is not None:
+        logging.info(f'[Account Loader] Loading accounts from {ACCOUNTS_SNAPSHOT_PATH.name}, "{accounts_path.name}" is not changed')
+        account_secrets = iter_account_secrets(accounts_path)
+    else:
+        logging.info(f'[Account Loader] Loading accounts from "{accounts_path.name}"')
+        account_groups = iter_account_groups(accounts_path)
+        loaded_groups = []
+
+    # Yielded accounts are changed while they run, the snapshot keeps copies
+    # of them as they were loaded without their keys. The memo keeps shared
+    # task plans shared.
+    snapshot_memo = {}
+    accounts_count = 0
+
+    for account_group in account_groups:
+        if account_group is False:
+            yield False
             return
-        okx_keys = [account.okx_api_key, account.okx_secret_key, account.okx_passphrase]
-        if any(okx_keys) and not all(okx_keys):
-            logging.error(f'[Account Loader] All or none of OKX keys must be specified for "{account.short_private_key}"')
+
+        if loaded_groups is not None:
+            loaded_groups.append(strip_account_secrets(deepcopy(account_group, snapshot_memo)))
+        elif not restore_account_secrets(account_group, account_secrets):
+            yield False
             return
-        accounts.append(account)
 
+        if isinstance(account_group, list):
+            random.shuffle(account_group)
+            accounts_count += len(account_group)
+            yield from account_group
+        else:
+            accounts_count += 1
+            yield account_group
 
-    random_indexes = []
+    if loaded_groups is not None:
+        save_accounts_snapshot(sources_hash, loaded_groups)
+
+    logging.info(f'[Account Loader] Loaded all {accounts_count} accounts')
 
-    for index, account in enumerate(accounts):
-        if account.private_key.lower() == 'random':
-            if random_indexes and len(random_indexes[-1]) == 1:
-                logging.error(f'[Account Loader] Found not closed random account on line {random_indexes[-1][0] + 2}')
-                return False
-            random_indexes.append([index])
-        elif account.private_key.lower() == 'endrandom':
-            if not random_indexes or len(random_indexes[-1]) == 2:
-                logging.error(f'[Account Loader] An EndRandom account found that is not preceded by a Random account on line {index + 3}')
-                return False
-            random_indexes[-1].append(index)
 
-    if random_indexes:
-        if len(random_indexes[-1]) != 2:
-            logging.error(f'[Account Loader] Found not closed random account on line {random_indexes[-1][0] + 1}')
+def read_accounts(rebuild: bool = False) -> list[BotAccount]:
+    load_start_time = time.time()
+
+    accounts = []
+
+    for account in iter_accounts(rebuild):
+        if account is False:
             return False
+        accounts.append(account)
 
-        for start_index, end_index in reversed(random_indexes):
-            difference = end_index - start_index - 1
-            if difference:
-                accounts[start_index:end_index + 1] = random.sample(accounts[start_index + 1:end_index], difference)
-            else:
-                accounts[start_index:end_index + 1] = []
+    logging.info(f'[Account Loader] Loaded {len(accounts)} accounts in {round(time.time() - load_start_time, 2)} seconds')
 
     return accounts
@@ -231,12 +231,32 @@ DEFAULT_PRICES = {
     enums.TokenNames.WBTC: 37300
 }
 
+ORACLE_ADDRESSES = {
+    enums.NetworkNames.Starknet: '0x0346c57f094d641ad94e43468628d8e9c574dcb2803ec372576ccc60a40be2c4',
+    enums.NetworkNames.StarknetTestnet: '0x446812bac98c08190dee8967180f4e3cdcd1db9373ca269904acb17f67f7093'
+}
+
+ORACLE_PAIR_IDS = {
+    enums.TokenNames.ETH: 19514442401534788,
+    enums.TokenNames.WBTC: 6287680677296296772,
+    enums.TokenNames.USDC: 6148332971638477636,
+    enums.TokenNames.USDT: 6148333044652921668,
+    enums.TokenNames.DAI: 19212080998863684
+}
+
 CRITICAL_RESULTS = {
     enums.TransactionStatus.INSUFFICIENT_BALANCE,
     enums.TransactionStatus.FAILED,
     enums.TransactionStatus.ADDRESS_NOT_ALLOWLISTED
 }
 
+FUNDING_FUNCTIONS = {
+    enums.ModuleNames.OKX: {enums.FunctionNames.WITHDRAW_FROM_OKX},
+    enums.ModuleNames.Orbiter: {enums.FunctionNames.DEPOSIT_TO_STARKNET},
+    enums.ModuleNames.StarkGate: {enums.FunctionNames.DEPOSIT_TO_STARKNET},
+    enums.ModuleNames.LayerSwap: {enums.FunctionNames.DEPOSIT_TO_STARKNET}
+}
+
 SWAP_PAIRS = {
     enums.ModuleNames.Avnu: {
         enums.NetworkNames.Starknet: {
@@ -313,6 +333,15 @@ SWAP_PAIRS = {
     }
 }
 
+SWAP_PAIRS[enums.ModuleNames.BestSwap] = {
+    network_name: {
+        tuple(sorted(pair, key=str))
+        for module_pairs in SWAP_PAIRS.values()
+        for pair in module_pairs.get(network_name, set())
+    }
+    for network_name in (enums.NetworkNames.Starknet, enums.NetworkNames.StarknetTestnet)
+}
+
 POOLS = {
     enums.ModuleNames.JediSwap: {
         enums.NetworkNames.Starknet: {
@@ -342,6 +371,7 @@ POOLS = {
 
 MAINNET_MODULE_NETWORKS = {
     enums.ModuleNames.Avnu: enums.NetworkNames.Starknet,
+    enums.ModuleNames.BestSwap: enums.NetworkNames.Starknet,
     enums.ModuleNames.Deploy: enums.NetworkNames.Starknet,
     enums.ModuleNames.Dmail: enums.NetworkNames.Starknet,
     enums.ModuleNames.Fibrous: enums.NetworkNames.Starknet,
@@ -373,6 +403,7 @@ MAINNET_MODULE_NETWORKS = {
 
 TESTNET_MODULE_NETWORKS = {
     enums.ModuleNames.Avnu: enums.NetworkNames.StarknetTestnet,
+    enums.ModuleNames.BestSwap: enums.NetworkNames.StarknetTestnet,
     enums.ModuleNames.Deploy: enums.NetworkNames.StarknetTestnet,
     enums.ModuleNames.Dmail: None,
     enums.ModuleNames.Fibrous: None,
@@ -400,6 +431,7 @@ TESTNET_MODULE_NETWORKS = {
 
 MODULE_FUNCTIONS = {
     enums.ModuleNames.Avnu: {},
+    enums.ModuleNames.BestSwap: {},
     enums.ModuleNames.Deploy: {},
     enums.ModuleNames.Dmail: {},
     enums.ModuleNames.Fibrous: {},
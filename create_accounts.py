@@ -1,5 +1,8 @@
+import concurrent.futures
 import hashlib
-from collections import OrderedDict
+import json
+import os
+from collections import OrderedDict, deque
 from pathlib import Path
 
 import pandas as pd
@@ -12,7 +15,7 @@ import enums
 import utils
 from starknet_py.cairo.data_types import FeltType, ArrayType
 from starknet_py.constants import EC_ORDER
-from starknet_py.hash.address import compute_address
+from starknet_py.hash.address import compute_address, compute_addresses
 from starknet_py.net.signer.stark_curve_signer import KeyPair
 from starknet_py.serialization import serializer_for_type
 from starknet_py.serialization.data_serializers.payload_serializer import PayloadSerializer
@@ -38,6 +41,14 @@ ACCOUNT_CLASS_HASHES = {
     enums.WalletNames.Braavos: 0x05dec330eebf36c8672b60db4a718d44762d3ae6d1333e553197acb47ee5a062
 }
 
+WALLETS_COLUMNS = ['wallet_name', 'mnemonic', 'private_key', 'address']
+
+OUTPUT_FORMATS = {'.csv', '.xlsx', '.parquet'}
+
+CHUNK_SIZE = 100
+
+EXPORT_CHUNK_SIZE = 10000
+
 
 def generate_mnemonic() -> str:
     ETHAccount.enable_unaudited_hdwallet_features()
@@ -121,33 +132,78 @@ def get_constructor_calldata(
         )
 
 
-def wallet_from_private_key(
-    private_key: str,
+def address_from_key_pair(
+    key_pair: KeyPair,
     wallet_name: enums.WalletNames
-) -> tuple[KeyPair, str]:
-    key_pair = KeyPair.from_private_key(private_key)
-
+) -> int:
     constructor_calldata = get_constructor_calldata(
         wallet_name=wallet_name,
         key_pair=key_pair
     )
 
-    address = hex(
-        compute_address(
-            salt=key_pair.public_key,
-            class_hash=PROXY_CLASS_HASHES[wallet_name],
-            constructor_calldata=constructor_calldata,
-            deployer_address=0
-        )
+    return compute_address(
+        salt=key_pair.public_key,
+        class_hash=PROXY_CLASS_HASHES[wallet_name],
+        constructor_calldata=constructor_calldata,
+        deployer_address=0
     )
 
+
+def wallet_from_private_key(
+    private_key: str,
+    wallet_name: enums.WalletNames
+) -> tuple[KeyPair, str]:
+    key_pair = KeyPair.from_private_key(private_key)
+
+    address = hex(address_from_key_pair(key_pair, wallet_name))
+
     return key_pair, address
 
 
-def wallet_from_mnemonic(
+def detect_wallets(
+    wallets: list[tuple[str, str]]
+) -> list[tuple[enums.WalletNames | None, int]]:
+    detected_wallets = []
+
+    for private_key, address in wallets:
+        key_pair = KeyPair.from_private_key(private_key)
+
+        for wallet_name in enums.WalletNames:
+            if address_from_key_pair(key_pair, wallet_name) == int(address, 16):
+                detected_wallets.append((wallet_name, key_pair.public_key))
+                break
+        else:
+            detected_wallets.append((None, key_pair.public_key))
+
+    return detected_wallets
+
+
+def wallets_from_private_keys(
+    private_keys: list[str],
+    wallet_name: enums.WalletNames
+) -> list[tuple[KeyPair, str]]:
+    key_pairs = [KeyPair.from_private_key(private_key) for private_key in private_keys]
+
+    addresses = compute_addresses(
+        salts=[key_pair.public_key for key_pair in key_pairs],
+        class_hash=PROXY_CLASS_HASHES[wallet_name],
+        constructor_calldatas=[
+            get_constructor_calldata(
+                wallet_name=wallet_name,
+                key_pair=key_pair
+            )
+            for key_pair in key_pairs
+        ],
+        deployer_address=0
+    )
+
+    return [(key_pair, hex(address)) for key_pair, address in zip(key_pairs, addresses)]
+
+
+def private_key_from_mnemonic(
     mnemonic: str,
     wallet_name: enums.WalletNames
-) -> tuple[KeyPair, str]:
+) -> str:
     if wallet_name == enums.WalletNames.Braavos:
         seed = Bip39SeedGenerator(mnemonic).Generate().hex()
     else:
@@ -167,59 +223,249 @@ def wallet_from_mnemonic(
     hdwallet.from_index(0)
     hdwallet.from_index(0)
 
-    ground_key = eip_2645(bytearray.fromhex(hdwallet.private_key()))
-
-    return wallet_from_private_key(ground_key, wallet_name)
+    return eip_2645(bytearray.fromhex(hdwallet.private_key()))
 
 
-def main():
-    wallet_name = input('Input wallet name ([B]raavos or [A]rgentX): ')
+def wallet_from_mnemonic(
+    mnemonic: str,
+    wallet_name: enums.WalletNames
+) -> tuple[KeyPair, str]:
+    ground_key = private_key_from_mnemonic(mnemonic, wallet_name)
 
-    if wallet_name.lower() in {'b', 'braavos'}:
-        wallet_name = enums.WalletNames.Braavos
-    elif wallet_name.lower() in {'a', 'argentx'}:
-        wallet_name = enums.WalletNames.ArgentX
-    else:
-        print('Wrong wallet name')
-        return
+    return wallet_from_private_key(ground_key, wallet_name)
 
-    amount = int(input('Input amount of wallets to generate: '))
 
-    if amount <= 0:
-        print('Wrong amount')
-        return
+def generate_wallets(
+    wallet_name: enums.WalletNames,
+    amount: int
+) -> list[list[str]]:
+    mnemonics = [generate_mnemonic() for _ in range(amount)]
+    private_keys = [private_key_from_mnemonic(mnemonic, wallet_name) for mnemonic in mnemonics]
 
     wallets = []
 
-    for i in tqdm.trange(amount):
-        mnemonic = generate_mnemonic()
-        key_pair, address = wallet_from_mnemonic(mnemonic, wallet_name)
+    for mnemonic, (key_pair, address) in zip(mnemonics, wallets_from_private_keys(private_keys, wallet_name)):
         address = utils.extend_hex(address, 64)
 
         wallets.append([str(wallet_name), mnemonic, hex(key_pair.private_key), address])
 
-    filepath = Path(__file__).parent / 'wallets.xlsx'
+    return wallets
+
+
+def count_csv_rows(filepath: Path) -> int:
+    if not filepath.exists():
+        return 0
+
+    with open(filepath, encoding='utf-8') as file:
+        return max(sum(1 for _ in file) - 1, 0)
 
-    open_mode = 'w'
 
-    wallets_df = pd.DataFrame(wallets, columns=['wallet_name', 'mnemonic', 'private_key', 'address'])
+def append_csv_rows(
+    filepath: Path,
+    rows: list[list],
+    columns: list[str]
+):
+    write_header = not filepath.exists() or filepath.stat().st_size == 0
 
-    if filepath.exists():
-        overwrite = input(f'File {filepath.name} already exists. Do you want to overwrite it? If not, wallets will be appended to it [y/n]: ')
-        if overwrite.lower() == 'n':
-            open_mode = 'a'
-            existed_wallets_df = pd.read_excel(filepath, header=0)
-            wallets_df = pd.concat([existed_wallets_df, wallets_df])
-        elif overwrite.lower() != 'y':
+    pd.DataFrame(rows, columns=columns).to_csv(
+        filepath,
+        mode='a',
+        header=write_header,
+        index=False,
+        encoding='utf-8'
+    )
+
+
+def run_in_pool(
+    function,
+    chunks,
+    max_workers: int = None
+):
+    max_workers = max_workers or os.cpu_count() or 1
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+
+        for chunk in chunks:
+            pending.append(executor.submit(function, *chunk))
+
+            if len(pending) >= max_workers * 2:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def read_csv_chunks(filepath: Path):
+    return pd.read_csv(
+        filepath,
+        dtype=str,
+        keep_default_na=False,
+        chunksize=EXPORT_CHUNK_SIZE
+    )
+
+
+def export_rows(
+    journal_path: Path,
+    filepath: Path,
+    columns: list[str],
+    append: bool = False
+):
+    suffix = filepath.suffix.lower()
+    append = append and filepath.exists()
+    temp_path = filepath.with_name(f'{filepath.stem}.tmp{filepath.suffix}')
+
+    if suffix == '.csv':
+        if not append:
+            os.replace(journal_path, filepath)
+            return
+
+        with read_csv_chunks(journal_path) as journal_chunks:
+            for chunk in journal_chunks:
+                chunk.to_csv(filepath, mode='a', header=False, index=False, encoding='utf-8')
+    elif suffix == '.xlsx':
+        from openpyxl import Workbook, load_workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(columns)
+
+        if append:
+            existed_workbook = load_workbook(filepath, read_only=True)
+            for row in existed_workbook.active.iter_rows(min_row=2, values_only=True):
+                sheet.append(row)
+            existed_workbook.close()
+
+        with read_csv_chunks(journal_path) as journal_chunks:
+            for chunk in journal_chunks:
+                for row in chunk.itertuples(index=False):
+                    sheet.append(list(row))
+
+        workbook.save(temp_path)
+        os.replace(temp_path, filepath)
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(column, pa.string()) for column in columns])
+
+        with pq.ParquetWriter(temp_path, schema) as writer:
+            if append:
+                for batch in pq.ParquetFile(filepath).iter_batches(batch_size=EXPORT_CHUNK_SIZE):
+                    writer.write_table(pa.Table.from_batches([batch]).cast(schema))
+
+            with read_csv_chunks(journal_path) as journal_chunks:
+                for chunk in journal_chunks:
+                    writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+        os.replace(temp_path, filepath)
+
+    journal_path.unlink()
+
+
+def main():
+    progress_path = Path(__file__).parent / 'wallets_progress.json'
+
+    progress = None
+
+    if progress_path.exists():
+        with open(progress_path) as file:
+            progress = json.load(file)
+
+        journal_path = Path(progress['journal_path'])
+        generated = count_csv_rows(journal_path)
+
+        resume = input(f'Found unfinished generation of {progress["amount"]} {progress["wallet_name"]} wallets ({generated} generated). Do you want to resume it? [y/n]: ')
+        if resume.lower() == 'n':
+            journal_path.unlink(missing_ok=True)
+            progress = None
+        elif resume.lower() != 'y':
             print('Wrong answer')
             return
 
+    if progress is None:
+        wallet_name = input('Input wallet name ([B]raavos or [A]rgentX): ')
+
+        if wallet_name.lower() in {'b', 'braavos'}:
+            wallet_name = enums.WalletNames.Braavos
+        elif wallet_name.lower() in {'a', 'argentx'}:
+            wallet_name = enums.WalletNames.ArgentX
+        else:
+            print('Wrong wallet name')
+            return
+
+        amount = int(input('Input amount of wallets to generate: '))
+
+        if amount <= 0:
+            print('Wrong amount')
+            return
+
+        filename = input('Input output file name (.xlsx, .csv or .parquet) [wallets.xlsx]: ').strip() or 'wallets.xlsx'
+        filepath = Path(__file__).parent / filename
+
+        if filepath.suffix.lower() not in OUTPUT_FORMATS:
+            print(f'Wrong file format. Possible formats: {", ".join(sorted(OUTPUT_FORMATS))}')
+            return
+
+        append = False
+
+        if filepath.exists():
+            overwrite = input(f'File {filepath.name} already exists. Do you want to overwrite it? If not, wallets will be appended to it [y/n]: ')
+            if overwrite.lower() == 'n':
+                append = True
+            elif overwrite.lower() != 'y':
+                print('Wrong answer')
+                return
+
+        progress = {
+            'wallet_name': str(wallet_name),
+            'amount': amount,
+            'filepath': str(filepath),
+            'journal_path': str(filepath.with_name(f'{filepath.stem}.part.csv')),
+            'append': append
+        }
+
+        Path(progress['journal_path']).unlink(missing_ok=True)
+
+        with open(progress_path, 'w') as file:
+            json.dump(progress, file, indent=4)
+
+    wallet_name = enums.WalletNames.from_string(progress['wallet_name'])
+    filepath = Path(progress['filepath'])
+    journal_path = Path(progress['journal_path'])
+
+    if filepath.suffix.lower() == '.parquet':
+        try:
+            import pyarrow
+        except ImportError:
+            print('pyarrow is required to save wallets to .parquet files, use `pip install pyarrow` to install it')
+            return
+
+    generated = count_csv_rows(journal_path)
+    remaining = progress['amount'] - generated
+
+    chunks = (
+        (wallet_name, min(CHUNK_SIZE, remaining - offset))
+        for offset in range(0, remaining, CHUNK_SIZE)
+    )
+
     try:
-        wallets_df.to_excel(filepath, index=False)
+        with tqdm.tqdm(total=progress['amount'], initial=generated) as progress_bar:
+            for wallets in run_in_pool(generate_wallets, chunks):
+                append_csv_rows(journal_path, wallets, WALLETS_COLUMNS)
+                progress_bar.update(len(wallets))
+    except KeyboardInterrupt:
+        print(f'Generation interrupted. {count_csv_rows(journal_path)} wallets saved to {journal_path.name}, run the script again to resume')
+        return
+
+    try:
+        export_rows(journal_path, filepath, WALLETS_COLUMNS, append=progress['append'])
     except PermissionError:
-        print(f'File {filepath} cannot be open. It is used by another process. Please close it and try again')
+        print(f'File {filepath} cannot be open. It is used by another process. Please close it and run the script again')
         return
 
+    progress_path.unlink()
+
     print(f'Wallets saved to {filepath}')
 
 
@@ -62,6 +62,7 @@ class TransactionStatus(AutoEnum):
 
 class ModuleNames(AutoEnum):
     Avnu = auto()
+    BestSwap = auto()
     Deploy = auto()
     Dmail = auto()
     Fibrous = auto()
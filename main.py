@@ -1,10 +1,14 @@
 import asyncio
+import contextvars
 import copy
+import itertools
 import json
 import random
+import sys
 import traceback
-from collections import defaultdict
+from collections import defaultdict, deque
 from pathlib import Path
+from typing import Iterable, Iterator
 
 import requests
 
@@ -18,6 +22,60 @@ from logger import logging
 
 USE_TESTNET = False
 
+def get_cli_option(name: str, default: int) -> int:
+    for argument in sys.argv[1:]:
+        if argument.startswith(f'--{name}='):
+            return int(argument.split('=', 1)[1])
+    return default
+
+
+# How many queued accounts to look at for funding tasks to start early
+FUNDING_LOOKAHEAD = get_cli_option('funding-lookahead', 0)
+
+# How many prefetched funding chains may run at the same time
+FUNDING_BUDGET = get_cli_option('funding-budget', FUNDING_LOOKAHEAD)
+
+# A proxy that keeps failing for about a minute is reported to the user
+PROXY_TEST_ATTEMPTS = 5
+
+PROXY_TEST_RETRY_DELAY = 15
+
+
+async def get_task_amount(
+    bot_account: accounts_loader.BotAccount,
+    task: accounts_loader.Task,
+    token_name: enums.TokenNames,
+    min_percentage: float,
+    max_percentage: float,
+    allow_fixed_amount: bool = False
+) -> tuple[float | None, float | None]:
+    """
+    Picks the amount of the task from its USD range, its token range (when
+    allowed) or its percentage range. Exactly one of the returned values is set.
+    """
+    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
+        min_amount, max_amount = await asyncio.gather(
+            utils.usd_to_token(
+                token_name=token_name,
+                usd=task.module_kwargs['min_amount_usd'],
+                proxy=bot_account.proxy
+            ),
+            utils.usd_to_token(
+                token_name=token_name,
+                usd=task.module_kwargs['max_amount_usd'],
+                proxy=bot_account.proxy
+            )
+        )
+        return random.uniform(min_amount, max_amount), None
+
+    if allow_fixed_amount and 'min_amount' in task.module_kwargs and 'max_amount' in task.module_kwargs:
+        return random.uniform(task.module_kwargs['min_amount'], task.module_kwargs['max_amount']), None
+
+    min_percentage = task.module_kwargs.get('min_percentage', min_percentage)
+    max_percentage = task.module_kwargs.get('max_percentage', max_percentage)
+
+    return None, round(random.uniform(min_percentage, max_percentage), 2)
+
 
 async def run_function(
     bot_account: accounts_loader.BotAccount,
@@ -34,26 +92,13 @@ async def run_function(
             if task.module_name == enums.ModuleNames.Avnu:
                 from_token_name = task.module_kwargs.get('from_token_name', enums.TokenNames.ETH)
                 to_token_name = task.module_kwargs.get('to_token_name', enums.TokenNames.USDT)
-                if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                    min_amount_usd = task.module_kwargs['min_amount_usd']
-                    max_amount_usd = task.module_kwargs['max_amount_usd']
-                    min_amount = utils.usd_to_token(
-                        token_name=from_token_name,
-                        usd=min_amount_usd,
-                        proxy=bot_account.proxy
-                    )
-                    max_amount = utils.usd_to_token(
-                        token_name=from_token_name,
-                        usd=max_amount_usd,
-                        proxy=bot_account.proxy
-                    )
-                    amount = random.uniform(min_amount, max_amount)
-                    percentage = None
-                else:
-                    min_percentage = task.module_kwargs.get('min_percentage', 1)
-                    max_percentage = task.module_kwargs.get('max_percentage', 90)
-                    percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                    amount = None
+                amount, percentage = await get_task_amount(
+                    bot_account=bot_account,
+                    task=task,
+                    token_name=from_token_name,
+                    min_percentage=1,
+                    max_percentage=90
+                )
                 slippage = task.module_kwargs.get('slippage', 1)
                 function_result = await modules.avnu.swap(
                     private_key=bot_account.private_key,
@@ -67,6 +112,29 @@ async def run_function(
                     percentage=percentage,
                     proxy=bot_account.proxy
                 )
+            elif task.module_name == enums.ModuleNames.BestSwap:
+                from_token_name = task.module_kwargs.get('from_token_name', enums.TokenNames.ETH)
+                to_token_name = task.module_kwargs.get('to_token_name', enums.TokenNames.USDT)
+                amount, percentage = await get_task_amount(
+                    bot_account=bot_account,
+                    task=task,
+                    token_name=from_token_name,
+                    min_percentage=1,
+                    max_percentage=90
+                )
+                slippage = task.module_kwargs.get('slippage', 1)
+                function_result = await modules.best_swap.swap(
+                    private_key=bot_account.private_key,
+                    address=bot_account.address,
+                    network_name=network_name,
+                    from_token_name=from_token_name,
+                    to_token_name=to_token_name,
+                    slippage=slippage,
+                    cairo_version=bot_account.cairo_version,
+                    amount=amount,
+                    percentage=percentage,
+                    proxy=bot_account.proxy
+                )
             elif task.module_name == enums.ModuleNames.Deploy:
                 function_result = await modules.wallet.deploy(
                     private_key=bot_account.private_key,
@@ -86,26 +154,13 @@ async def run_function(
             elif task.module_name == enums.ModuleNames.Fibrous:
                 from_token_name = task.module_kwargs.get('from_token_name', enums.TokenNames.ETH)
                 to_token_name = task.module_kwargs.get('to_token_name', enums.TokenNames.USDT)
-                if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                    min_amount_usd = task.module_kwargs['min_amount_usd']
-                    max_amount_usd = task.module_kwargs['max_amount_usd']
-                    min_amount = utils.usd_to_token(
-                        token_name=from_token_name,
-                        usd=min_amount_usd,
-                        proxy=bot_account.proxy
-                    )
-                    max_amount = utils.usd_to_token(
-                        token_name=from_token_name,
-                        usd=max_amount_usd,
-                        proxy=bot_account.proxy
-                    )
-                    amount = random.uniform(min_amount, max_amount)
-                    percentage = None
-                else:
-                    min_percentage = task.module_kwargs.get('min_percentage', 1)
-                    max_percentage = task.module_kwargs.get('max_percentage', 90)
-                    percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                    amount = None
+                amount, percentage = await get_task_amount(
+                    bot_account=bot_account,
+                    task=task,
+                    token_name=from_token_name,
+                    min_percentage=1,
+                    max_percentage=90
+                )
                 slippage = task.module_kwargs.get('slippage', 1)
                 function_result = await modules.fibrous.swap(
                     private_key=bot_account.private_key,
@@ -119,68 +174,58 @@ async def run_function(
                     percentage=percentage,
                     proxy=bot_account.proxy
                 )
-            elif task.module_name == enums.ModuleNames.JediSwap:
+            elif task.module_name in modules.best_swap.DEX_ADAPTERS:
                 if function_name == enums.FunctionNames.SWAP:
                     from_token_name = task.module_kwargs.get('from_token_name', enums.TokenNames.ETH)
                     to_token_name = task.module_kwargs.get('to_token_name', enums.TokenNames.USDT)
-                    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                        min_amount_usd = task.module_kwargs['min_amount_usd']
-                        max_amount_usd = task.module_kwargs['max_amount_usd']
-                        min_amount = utils.usd_to_token(
-                            token_name=from_token_name,
-                            usd=min_amount_usd,
+                    amount, percentage = await get_task_amount(
+                        bot_account=bot_account,
+                        task=task,
+                        token_name=from_token_name,
+                        min_percentage=1,
+                        max_percentage=90
+                    )
+                    slippage = task.module_kwargs.get('slippage', 2)
+                    if 'swap_path' in task.module_kwargs:
+                        function_result = await modules.dex.swap_chain(
+                            adapter_class=modules.best_swap.DEX_ADAPTERS[task.module_name],
+                            private_key=bot_account.private_key,
+                            address=bot_account.address,
+                            network_name=network_name,
+                            token_names=task.module_kwargs['swap_path'],
+                            slippage=slippage,
+                            cairo_version=bot_account.cairo_version,
+                            amount=amount,
+                            percentage=percentage,
                             proxy=bot_account.proxy
                         )
-                        max_amount = utils.usd_to_token(
-                            token_name=from_token_name,
-                            usd=max_amount_usd,
+                    else:
+                        function_result = await modules.dex.swap(
+                            adapter_class=modules.best_swap.DEX_ADAPTERS[task.module_name],
+                            private_key=bot_account.private_key,
+                            address=bot_account.address,
+                            network_name=network_name,
+                            from_token_name=from_token_name,
+                            to_token_name=to_token_name,
+                            slippage=slippage,
+                            cairo_version=bot_account.cairo_version,
+                            amount=amount,
+                            percentage=percentage,
                             proxy=bot_account.proxy
                         )
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    else:
-                        min_percentage = task.module_kwargs.get('min_percentage', 1)
-                        max_percentage = task.module_kwargs.get('max_percentage', 90)
-                        percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                        amount = None
-                    slippage = task.module_kwargs.get('slippage', 2)
-                    function_result = await modules.jediswap.swap(
-                        private_key=bot_account.private_key,
-                        address=bot_account.address,
-                        network_name=network_name,
-                        from_token_name=from_token_name,
-                        to_token_name=to_token_name,
-                        slippage=slippage,
-                        cairo_version=bot_account.cairo_version,
-                        amount=amount,
-                        percentage=percentage,
-                        proxy=bot_account.proxy
-                    )
                 elif function_name == enums.FunctionNames.ADD_LIQUIDITY:
                     first_token_name = task.module_kwargs.get('first_token_name', enums.TokenNames.ETH)
                     second_token_name = task.module_kwargs.get('second_token_name', enums.TokenNames.USDC)
                     slippage = task.module_kwargs.get('slippage', 2)
-                    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                        min_amount_usd = task.module_kwargs['min_amount_usd']
-                        max_amount_usd = task.module_kwargs['max_amount_usd']
-                        min_amount = utils.usd_to_token(
-                            token_name=first_token_name,
-                            usd=min_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        max_amount = utils.usd_to_token(
-                            token_name=first_token_name,
-                            usd=max_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    else:
-                        min_percentage = task.module_kwargs.get('min_percentage', 1)
-                        max_percentage = task.module_kwargs.get('max_percentage', 90)
-                        percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                        amount = None
-                    function_result = await modules.jediswap.add_liquidity(
+                    amount, percentage = await get_task_amount(
+                        bot_account=bot_account,
+                        task=task,
+                        token_name=first_token_name,
+                        min_percentage=1,
+                        max_percentage=90
+                    )
+                    function_result = await modules.dex.add_liquidity(
+                        adapter_class=modules.best_swap.DEX_ADAPTERS[task.module_name],
                         private_key=bot_account.private_key,
                         address=bot_account.address,
                         network_name=network_name,
@@ -197,7 +242,8 @@ async def run_function(
                     second_token_name = task.module_kwargs.get('second_token_name', enums.TokenNames.USDC)
                     withdraw_percentage = task.module_kwargs.get('withdraw_percentage', 100)
                     slippage = task.module_kwargs.get('slippage', 2)
-                    function_result = await modules.jediswap.remove_liquidity(
+                    function_result = await modules.dex.remove_liquidity(
+                        adapter_class=modules.best_swap.DEX_ADAPTERS[task.module_name],
                         private_key=bot_account.private_key,
                         address=bot_account.address,
                         network_name=network_name,
@@ -215,31 +261,14 @@ async def run_function(
                         return enums.TransactionStatus.FAILED
 
                     from_network_name = task.module_kwargs.get('from_network', enums.NetworkNames.ETH)
-                    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                        min_amount_usd = task.module_kwargs['min_amount_usd']
-                        max_amount_usd = task.module_kwargs['max_amount_usd']
-                        min_amount = utils.usd_to_token(
-                            token_name=enums.TokenNames.ETH,
-                            usd=min_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        max_amount = utils.usd_to_token(
-                            token_name=enums.TokenNames.ETH,
-                            usd=max_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    elif 'min_amount' in task.module_kwargs and 'max_amount' in task.module_kwargs:
-                        min_amount = task.module_kwargs['min_amount']
-                        max_amount = task.module_kwargs['max_amount']
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    else:
-                        min_percentage = task.module_kwargs.get('min_percentage', 100)
-                        max_percentage = task.module_kwargs.get('max_percentage', 100)
-                        percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                        amount = None
+                    amount, percentage = await get_task_amount(
+                        bot_account=bot_account,
+                        task=task,
+                        token_name=enums.TokenNames.ETH,
+                        min_percentage=100,
+                        max_percentage=100,
+                        allow_fixed_amount=True
+                    )
                     wait_for_receive = task.module_kwargs.get('wait_for_receive', True)
 
                     destination_address_str = task.module_kwargs.get('destination_address', None)
@@ -268,31 +297,14 @@ async def run_function(
                     )
                 elif task.function_name == enums.FunctionNames.WITHDRAW_FROM_STARKNET:
                     to_network_name = task.module_kwargs.get('to_network', enums.NetworkNames.ETH)
-                    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                        min_amount_usd = task.module_kwargs['min_amount_usd']
-                        max_amount_usd = task.module_kwargs['max_amount_usd']
-                        min_amount = utils.usd_to_token(
-                            token_name=enums.TokenNames.ETH,
-                            usd=min_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        max_amount = utils.usd_to_token(
-                            token_name=enums.TokenNames.ETH,
-                            usd=max_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    elif 'min_amount' in task.module_kwargs and 'max_amount' in task.module_kwargs:
-                        min_amount = task.module_kwargs['min_amount']
-                        max_amount = task.module_kwargs['max_amount']
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    else:
-                        min_percentage = task.module_kwargs.get('min_percentage', 100)
-                        max_percentage = task.module_kwargs.get('max_percentage', 100)
-                        percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                        amount = None
+                    amount, percentage = await get_task_amount(
+                        bot_account=bot_account,
+                        task=task,
+                        token_name=enums.TokenNames.ETH,
+                        min_percentage=100,
+                        max_percentage=100,
+                        allow_fixed_amount=True
+                    )
                     wait_for_receive = task.module_kwargs.get('wait_for_receive', True)
 
                     destination_address_str = task.module_kwargs.get('destination_address', None)
@@ -320,121 +332,15 @@ async def run_function(
                         wait_for_receive=wait_for_receive,
                         proxy=bot_account.proxy
                     )
-            elif task.module_name == enums.ModuleNames.mySwap:
-                if function_name == enums.FunctionNames.SWAP:
-                    from_token_name = task.module_kwargs.get('from_token_name', enums.TokenNames.ETH)
-                    to_token_name = task.module_kwargs.get('to_token_name', enums.TokenNames.USDT)
-                    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                        min_amount_usd = task.module_kwargs['min_amount_usd']
-                        max_amount_usd = task.module_kwargs['max_amount_usd']
-                        min_amount = utils.usd_to_token(
-                            token_name=from_token_name,
-                            usd=min_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        max_amount = utils.usd_to_token(
-                            token_name=from_token_name,
-                            usd=max_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    else:
-                        min_percentage = task.module_kwargs.get('min_percentage', 1)
-                        max_percentage = task.module_kwargs.get('max_percentage', 90)
-                        percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                        amount = None
-                    slippage = task.module_kwargs.get('slippage', 2)
-                    function_result = await modules.myswap.swap(
-                        private_key=bot_account.private_key,
-                        address=bot_account.address,
-                        network_name=network_name,
-                        from_token_name=from_token_name,
-                        to_token_name=to_token_name,
-                        slippage=slippage,
-                        cairo_version=bot_account.cairo_version,
-                        amount=amount,
-                        percentage=percentage,
-                        proxy=bot_account.proxy
-                    )
-                elif function_name == enums.FunctionNames.ADD_LIQUIDITY:
-                    first_token_name = task.module_kwargs.get('first_token_name', enums.TokenNames.ETH)
-                    second_token_name = task.module_kwargs.get('second_token_name', enums.TokenNames.USDC)
-                    slippage = task.module_kwargs.get('slippage', 2)
-                    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                        min_amount_usd = task.module_kwargs['min_amount_usd']
-                        max_amount_usd = task.module_kwargs['max_amount_usd']
-                        min_amount = utils.usd_to_token(
-                            token_name=first_token_name,
-                            usd=min_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        max_amount = utils.usd_to_token(
-                            token_name=first_token_name,
-                            usd=max_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    else:
-                        min_percentage = task.module_kwargs.get('min_percentage', 1)
-                        max_percentage = task.module_kwargs.get('max_percentage', 90)
-                        percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                        amount = None
-                    function_result = await modules.myswap.add_liquidity(
-                        private_key=bot_account.private_key,
-                        address=bot_account.address,
-                        network_name=network_name,
-                        first_token_name=first_token_name,
-                        second_token_name=second_token_name,
-                        slippage=slippage,
-                        cairo_version=bot_account.cairo_version,
-                        amount=amount,
-                        percentage=percentage,
-                        proxy=bot_account.proxy
-                    )
-                elif function_name == enums.FunctionNames.REMOVE_LIQUIDITY:
-                    first_token_name = task.module_kwargs.get('first_token_name', enums.TokenNames.ETH)
-                    second_token_name = task.module_kwargs.get('second_token_name', enums.TokenNames.USDC)
-                    withdraw_percentage = task.module_kwargs.get('withdraw_percentage', 100)
-                    slippage = task.module_kwargs.get('slippage', 2)
-                    function_result = await modules.myswap.remove_liquidity(
-                        private_key=bot_account.private_key,
-                        address=bot_account.address,
-                        network_name=network_name,
-                        first_token_name=first_token_name,
-                        second_token_name=second_token_name,
-                        slippage=slippage,
-                        cairo_version=bot_account.cairo_version,
-                        percentage=withdraw_percentage,
-                        proxy=bot_account.proxy
-                    )
             elif task.module_name == enums.ModuleNames.OKX:
-                if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                    min_amount_usd = task.module_kwargs['min_amount_usd']
-                    max_amount_usd = task.module_kwargs['max_amount_usd']
-                    min_amount = utils.usd_to_token(
-                        token_name=enums.TokenNames.ETH,
-                        usd=min_amount_usd,
-                        proxy=bot_account.proxy
-                    )
-                    max_amount = utils.usd_to_token(
-                        token_name=enums.TokenNames.ETH,
-                        usd=max_amount_usd,
-                        proxy=bot_account.proxy
-                    )
-                    amount = random.uniform(min_amount, max_amount)
-                    percentage = None
-                elif 'min_amount' in task.module_kwargs and 'max_amount' in task.module_kwargs:
-                    min_amount = task.module_kwargs['min_amount']
-                    max_amount = task.module_kwargs['max_amount']
-                    amount = random.uniform(min_amount, max_amount)
-                    percentage = None
-                else:
-                    min_percentage = task.module_kwargs.get('min_percentage', 50)
-                    max_percentage = task.module_kwargs.get('max_percentage', 100)
-                    percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                    amount = None
+                amount, percentage = await get_task_amount(
+                    bot_account=bot_account,
+                    task=task,
+                    token_name=enums.TokenNames.ETH,
+                    min_percentage=50,
+                    max_percentage=100,
+                    allow_fixed_amount=True
+                )
                 wait_for_receive = task.module_kwargs.get('wait_for_receive', True)
                 if task.function_name == enums.FunctionNames.DEPOSIT_TO_OKX:
                     from_network_name = task.module_kwargs.get('from_network', enums.NetworkNames.Starknet)
@@ -462,7 +368,7 @@ async def run_function(
                         if bot_account.evm_deposit_address is None:
                             logging.critical(f'[Main] Bot account {bot_account.short_private_key} has no EVM deposit address. OKX Deposit is not possible')
                             return enums.TransactionStatus.FAILED
-                        function_result = modules.okx_module.deposit_to_okx_from_evm(
+                        function_result = await modules.okx_module.deposit_to_okx_from_evm(
                             private_key=bot_account.evm_private_key,
                             network_name=from_network_name,
                             to_address=bot_account.evm_deposit_address,
@@ -493,7 +399,7 @@ async def run_function(
                             return enums.TransactionStatus.FAILED
                         to_address = bot_account.evm_address
 
-                    function_result = modules.okx_module.withdraw_from_okx(
+                    function_result = await modules.okx_module.withdraw_from_okx(
                         to_address=to_address,
                         network_name=to_network_name,
                         api_key=bot_account.okx_api_key,
@@ -511,10 +417,11 @@ async def run_function(
                     ]):
                         logging.critical(f'[Main] Bot account {bot_account.short_private_key} has no OKX API credentials. OKX Withdrawal is not possible')
                         return enums.TransactionStatus.FAILED
-                    function_result = modules.okx_module.transfer_from_subs(
+                    function_result = await modules.okx_module.transfer_from_subs(
                         api_key=bot_account.okx_api_key,
                         api_secret_key=bot_account.okx_secret_key,
-                        passphrase=bot_account.okx_passphrase
+                        passphrase=bot_account.okx_passphrase,
+                        tokens=task.module_kwargs.get('transfer_tokens')
                     )
             elif task.module_name == enums.ModuleNames.Orbiter:
                 if task.function_name == enums.FunctionNames.DEPOSIT_TO_STARKNET:
@@ -523,31 +430,14 @@ async def run_function(
                         return enums.TransactionStatus.FAILED
 
                     from_network_name = task.module_kwargs.get('from_network', enums.NetworkNames.ETH)
-                    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                        min_amount_usd = task.module_kwargs['min_amount_usd']
-                        max_amount_usd = task.module_kwargs['max_amount_usd']
-                        min_amount = utils.usd_to_token(
-                            token_name=enums.TokenNames.ETH,
-                            usd=min_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        max_amount = utils.usd_to_token(
-                            token_name=enums.TokenNames.ETH,
-                            usd=max_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    elif 'min_amount' in task.module_kwargs and 'max_amount' in task.module_kwargs:
-                        min_amount = task.module_kwargs['min_amount']
-                        max_amount = task.module_kwargs['max_amount']
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    else:
-                        min_percentage = task.module_kwargs.get('min_percentage', 100)
-                        max_percentage = task.module_kwargs.get('max_percentage', 100)
-                        percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                        amount = None
+                    amount, percentage = await get_task_amount(
+                        bot_account=bot_account,
+                        task=task,
+                        token_name=enums.TokenNames.ETH,
+                        min_percentage=100,
+                        max_percentage=100,
+                        allow_fixed_amount=True
+                    )
                     wait_for_receive = task.module_kwargs.get('wait_for_receive', True)
                     function_result = await modules.orbiter.deposit_to_starknet(
                         private_key=bot_account.evm_private_key,
@@ -562,31 +452,14 @@ async def run_function(
                     )
                 elif task.function_name == enums.FunctionNames.WITHDRAW_FROM_STARKNET:
                     to_network_name = task.module_kwargs.get('to_network', enums.NetworkNames.ETH)
-                    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                        min_amount_usd = task.module_kwargs['min_amount_usd']
-                        max_amount_usd = task.module_kwargs['max_amount_usd']
-                        min_amount = utils.usd_to_token(
-                            token_name=enums.TokenNames.ETH,
-                            usd=min_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        max_amount = utils.usd_to_token(
-                            token_name=enums.TokenNames.ETH,
-                            usd=max_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    elif 'min_amount' in task.module_kwargs and 'max_amount' in task.module_kwargs:
-                        min_amount = task.module_kwargs['min_amount']
-                        max_amount = task.module_kwargs['max_amount']
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    else:
-                        min_percentage = task.module_kwargs.get('min_percentage', 100)
-                        max_percentage = task.module_kwargs.get('max_percentage', 100)
-                        percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                        amount = None
+                    amount, percentage = await get_task_amount(
+                        bot_account=bot_account,
+                        task=task,
+                        token_name=enums.TokenNames.ETH,
+                        min_percentage=100,
+                        max_percentage=100,
+                        allow_fixed_amount=True
+                    )
                     wait_for_receive = task.module_kwargs.get('wait_for_receive', True)
                     function_result = await modules.orbiter.withdraw_from_starknet(
                         private_key=bot_account.private_key,
@@ -607,31 +480,14 @@ async def run_function(
                         return enums.TransactionStatus.FAILED
 
                     from_network_name = enums.NetworkNames.ETH
-                    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                        min_amount_usd = task.module_kwargs['min_amount_usd']
-                        max_amount_usd = task.module_kwargs['max_amount_usd']
-                        min_amount = utils.usd_to_token(
-                            token_name=enums.TokenNames.ETH,
-                            usd=min_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        max_amount = utils.usd_to_token(
-                            token_name=enums.TokenNames.ETH,
-                            usd=max_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    elif 'min_amount' in task.module_kwargs and 'max_amount' in task.module_kwargs:
-                        min_amount = task.module_kwargs['min_amount']
-                        max_amount = task.module_kwargs['max_amount']
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    else:
-                        min_percentage = task.module_kwargs.get('min_percentage', 100)
-                        max_percentage = task.module_kwargs.get('max_percentage', 100)
-                        percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                        amount = None
+                    amount, percentage = await get_task_amount(
+                        bot_account=bot_account,
+                        task=task,
+                        token_name=enums.TokenNames.ETH,
+                        min_percentage=100,
+                        max_percentage=100,
+                        allow_fixed_amount=True
+                    )
                     wait_for_receive = task.module_kwargs.get('wait_for_receive', True)
                     function_result = await modules.starkgate.deposit_to_starknet(
                         private_key=bot_account.evm_private_key,
@@ -646,31 +502,14 @@ async def run_function(
                     )
                 elif task.function_name == enums.FunctionNames.WITHDRAW_FROM_STARKNET:
                     to_network_name = enums.NetworkNames.ETH
-                    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                        min_amount_usd = task.module_kwargs['min_amount_usd']
-                        max_amount_usd = task.module_kwargs['max_amount_usd']
-                        min_amount = utils.usd_to_token(
-                            token_name=enums.TokenNames.ETH,
-                            usd=min_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        max_amount = utils.usd_to_token(
-                            token_name=enums.TokenNames.ETH,
-                            usd=max_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    elif 'min_amount' in task.module_kwargs and 'max_amount' in task.module_kwargs:
-                        min_amount = task.module_kwargs['min_amount']
-                        max_amount = task.module_kwargs['max_amount']
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    else:
-                        min_percentage = task.module_kwargs.get('min_percentage', 100)
-                        max_percentage = task.module_kwargs.get('max_percentage', 100)
-                        percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                        amount = None
+                    amount, percentage = await get_task_amount(
+                        bot_account=bot_account,
+                        task=task,
+                        token_name=enums.TokenNames.ETH,
+                        min_percentage=100,
+                        max_percentage=100,
+                        allow_fixed_amount=True
+                    )
                     wait_for_receive = task.module_kwargs.get('wait_for_receive', True)
                     function_result = await modules.starkgate.withdraw_from_starknet(
                         private_key=bot_account.private_key,
@@ -700,95 +539,6 @@ async def run_function(
                     cairo_version=bot_account.cairo_version,
                     proxy=bot_account.proxy
                 )
-            elif task.module_name == enums.ModuleNames.TenKSwap:
-                if function_name == enums.FunctionNames.SWAP:
-                    from_token_name = task.module_kwargs.get('from_token_name', enums.TokenNames.ETH)
-                    to_token_name = task.module_kwargs.get('to_token_name', enums.TokenNames.USDT)
-                    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                        min_amount_usd = task.module_kwargs['min_amount_usd']
-                        max_amount_usd = task.module_kwargs['max_amount_usd']
-                        min_amount = utils.usd_to_token(
-                            token_name=from_token_name,
-                            usd=min_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        max_amount = utils.usd_to_token(
-                            token_name=from_token_name,
-                            usd=max_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    else:
-                        min_percentage = task.module_kwargs.get('min_percentage', 1)
-                        max_percentage = task.module_kwargs.get('max_percentage', 90)
-                        percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                        amount = None
-                    slippage = task.module_kwargs.get('slippage', 2)
-                    function_result = await modules.tenkswap.swap(
-                        private_key=bot_account.private_key,
-                        address=bot_account.address,
-                        network_name=network_name,
-                        from_token_name=from_token_name,
-                        to_token_name=to_token_name,
-                        slippage=slippage,
-                        cairo_version=bot_account.cairo_version,
-                        amount=amount,
-                        percentage=percentage,
-                        proxy=bot_account.proxy
-                    )
-                elif function_name == enums.FunctionNames.ADD_LIQUIDITY:
-                    first_token_name = task.module_kwargs.get('first_token_name', enums.TokenNames.ETH)
-                    second_token_name = task.module_kwargs.get('second_token_name', enums.TokenNames.USDC)
-                    slippage = task.module_kwargs.get('slippage', 2)
-                    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                        min_amount_usd = task.module_kwargs['min_amount_usd']
-                        max_amount_usd = task.module_kwargs['max_amount_usd']
-                        min_amount = utils.usd_to_token(
-                            token_name=first_token_name,
-                            usd=min_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        max_amount = utils.usd_to_token(
-                            token_name=first_token_name,
-                            usd=max_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    else:
-                        min_percentage = task.module_kwargs.get('min_percentage', 1)
-                        max_percentage = task.module_kwargs.get('max_percentage', 90)
-                        percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                        amount = None
-                    function_result = await modules.tenkswap.add_liquidity(
-                        private_key=bot_account.private_key,
-                        address=bot_account.address,
-                        network_name=network_name,
-                        first_token_name=first_token_name,
-                        second_token_name=second_token_name,
-                        slippage=slippage,
-                        cairo_version=bot_account.cairo_version,
-                        amount=amount,
-                        percentage=percentage,
-                        proxy=bot_account.proxy
-                    )
-                elif function_name == enums.FunctionNames.REMOVE_LIQUIDITY:
-                    first_token_name = task.module_kwargs.get('first_token_name', enums.TokenNames.ETH)
-                    second_token_name = task.module_kwargs.get('second_token_name', enums.TokenNames.USDC)
-                    withdraw_percentage = task.module_kwargs.get('withdraw_percentage', 100)
-                    slippage = task.module_kwargs.get('slippage', 2)
-                    function_result = await modules.tenkswap.remove_liquidity(
-                        private_key=bot_account.private_key,
-                        address=bot_account.address,
-                        network_name=network_name,
-                        first_token_name=first_token_name,
-                        second_token_name=second_token_name,
-                        slippage=slippage,
-                        cairo_version=bot_account.cairo_version,
-                        percentage=withdraw_percentage,
-                        proxy=bot_account.proxy
-                    )
             elif task.module_name == enums.ModuleNames.Upgrade:
                 function_result = await modules.wallet.upgrade(
                     private_key=bot_account.private_key,
@@ -804,26 +554,13 @@ async def run_function(
             elif task.module_name == enums.ModuleNames.zkLend:
                 if function_name == enums.FunctionNames.SUPPLY:
                     supply_token_name = enums.TokenNames.ETH
-                    if 'min_amount_usd' in task.module_kwargs and 'max_amount_usd' in task.module_kwargs:
-                        min_amount_usd = task.module_kwargs['min_amount_usd']
-                        max_amount_usd = task.module_kwargs['max_amount_usd']
-                        min_amount = utils.usd_to_token(
-                            token_name=supply_token_name,
-                            usd=min_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        max_amount = utils.usd_to_token(
-                            token_name=supply_token_name,
-                            usd=max_amount_usd,
-                            proxy=bot_account.proxy
-                        )
-                        amount = random.uniform(min_amount, max_amount)
-                        percentage = None
-                    else:
-                        min_percentage = task.module_kwargs.get('min_percentage', 10)
-                        max_percentage = task.module_kwargs.get('max_percentage', 90)
-                        percentage = round(random.uniform(min_percentage, max_percentage), 2)
-                        amount = None
+                    amount, percentage = await get_task_amount(
+                        bot_account=bot_account,
+                        task=task,
+                        token_name=supply_token_name,
+                        min_percentage=10,
+                        max_percentage=90
+                    )
                     function_result = await modules.zklend.supply(
                         private_key=bot_account.private_key,
                         address=bot_account.address,
@@ -874,15 +611,95 @@ async def run_function(
 
         if function_result == enums.TransactionStatus.INSUFFICIENT_BALANCE:
             logging.critical(f'[Main] Top up your balance in {network_name} network')
-            input('[Main] Press enter to continue after top up')
+            if not await utils.confirm('[Main] Press enter to continue after top up'):
+                break
         elif function_result != enums.TransactionStatus.FAILED:
             break
 
-        utils.random_sleep()
+        await utils.async_random_sleep(bot_account.min_sleep_time, bot_account.max_sleep_time)
 
     return function_result
 
 
+def get_task_network(task: accounts_loader.Task) -> enums.NetworkNames | None:
+    if task.module_name == enums.ModuleNames.Sleep:
+        return None
+
+    if USE_TESTNET:
+        networks = constants.TESTNET_MODULE_NETWORKS[task.module_name]
+    else:
+        networks = constants.MAINNET_MODULE_NETWORKS[task.module_name]
+    if isinstance(networks, dict):
+        network_name = networks[task.function_name]
+    else:
+        network_name = networks
+
+    if network_name == enums.NetworkNames.DefinedInParams:
+        network_name = task.module_kwargs.get('from_network', enums.NetworkNames.ETH)
+
+    return network_name
+
+
+def get_swap_path(
+    swap_tokens: dict[enums.TokenNames, set[enums.TokenNames]],
+    start_token: enums.TokenNames,
+    end_token: enums.TokenNames,
+    swaps: int
+) -> list[enums.TokenNames]:
+    """
+    Picks the tokens of a swap sequence up front with the same rules as the
+    swap by swap loop of run_module, assuming that every swap succeeds.
+    """
+    path = [start_token]
+
+    if swaps == 1:
+        to_token_name = end_token
+    else:
+        to_token_name = random.choice(list(swap_tokens[start_token]))
+
+    swap = 0
+
+    while swap < swaps:
+        if to_token_name != path[-1]:
+            path.append(to_token_name)
+
+        swap += 1
+        from_token_name = to_token_name
+
+        if swap == swaps - 1:
+            if end_token not in swap_tokens[from_token_name]:
+                possible_tokens = swap_tokens[from_token_name] - {end_token}
+                possible_tokens = {token for token in possible_tokens if end_token in swap_tokens[token]}
+                if possible_tokens:
+                    to_token_name = random.choice(list(swap_tokens[from_token_name] - {end_token}))
+                else:
+                    to_token_name = random.choice(list(swap_tokens[from_token_name]))
+                swaps += 1
+            else:
+                to_token_name = end_token
+        elif swap == swaps - 2:
+            possible_tokens = swap_tokens[from_token_name] - {end_token}
+            if possible_tokens:
+                to_token_name = random.choice(list(possible_tokens))
+            else:
+                to_token_name = end_token
+        elif swap != swaps:
+            to_token_name = random.choice(list(swap_tokens[from_token_name]))
+
+    return path
+
+
+def get_max_gas_price(
+    bot_account: accounts_loader.BotAccount,
+    network_name: enums.NetworkNames
+) -> float:
+    if network_name in utils.GAS_EVM_NETWORKS:
+        return bot_account.max_eth_gwei
+    elif network_name in utils.GAS_STARKNET_NETWORKS:
+        return bot_account.max_starknet_gwei
+    return float('inf')
+
+
 async def run_module(
     bot_account: accounts_loader.BotAccount,
     task: accounts_loader.Task
@@ -894,56 +711,27 @@ async def run_module(
             min_sleep_time = task.module_kwargs.get('min_sleep_time', 1)
             max_sleep_time = task.module_kwargs.get('max_sleep_time', 10)
             sleep_time = random.uniform(min_sleep_time, max_sleep_time)
-        utils.sleep(sleep_time)
+        await utils.async_sleep(sleep_time)
         return enums.TransactionStatus.SUCCESS
-    else:
-        if USE_TESTNET:
-            networks = constants.TESTNET_MODULE_NETWORKS[task.module_name]
-        else:
-            networks = constants.MAINNET_MODULE_NETWORKS[task.module_name]
-        if isinstance(networks, dict):
-            network_name = networks[task.function_name]
-        else:
-            network_name = networks
 
-    if network_name == enums.NetworkNames.DefinedInParams:
-        network_name = task.module_kwargs.get('from_network', enums.NetworkNames.ETH)
+    network_name = get_task_network(task)
 
     if network_name is None:
         logging.warning(f'[Main] Network name for module {task.module_name} is None')
         return enums.TransactionStatus.SUCCESS
 
-    while True:
-        try:
-            current_gas_price = await utils.get_gas_price(
-                network_name=network_name,
+    max_gas_price = get_max_gas_price(bot_account, network_name)
+
+    gas_monitor = utils.get_gas_monitor(network_name)
+
+    if gas_monitor is not None and max_gas_price != float('inf'):
+        current_gas_price = await gas_monitor.wait_for_gas(proxy=bot_account.proxy)
+        if current_gas_price > max_gas_price:
+            logging.info(f'[Main] Current gas price {round(current_gas_price, 3)} Gwei is higher than max {max_gas_price} Gwei, waiting')
+            await gas_monitor.wait_for_gas(
+                max_gas_price=max_gas_price,
                 proxy=bot_account.proxy
             )
-        except BaseException as e:
-            logging.error(f'[Main] Failed to get gas price for {network_name} network: {type(e)} - {e}')
-            utils.sleep(10)
-            continue
-
-        if network_name in {
-            enums.NetworkNames.ETH,
-            enums.NetworkNames.Goerli
-        }:
-            if current_gas_price < bot_account.max_eth_gwei:
-                break
-            else:
-                logging.info(f'[Main] Current gas price {round(current_gas_price, 3)} Gwei is higher than max {bot_account.max_eth_gwei} Gwei')
-        elif network_name in {
-            enums.NetworkNames.Starknet,
-            enums.NetworkNames.StarknetTestnet
-        }:
-            if current_gas_price < bot_account.max_starknet_gwei:
-                break
-            else:
-                logging.info(f'[Main] Current gas price {round(current_gas_price, 3)} Gwei is higher than max {bot_account.max_starknet_gwei} Gwei')
-        else:
-            break
-
-        utils.sleep(10)
 
     function_dict = {
         'bot_account': bot_account,
@@ -1039,6 +827,20 @@ async def run_module(
                     bot_account=bot_account,
                     task=new_task
                 )
+        elif task.module_kwargs.get('chain_swaps', False) and task.module_name in modules.best_swap.DEX_ADAPTERS:
+            swap_path = get_swap_path(swap_tokens, start_token, end_token, swaps)
+
+            if len(swap_path) < 2:
+                return enums.TransactionStatus.SUCCESS
+
+            function_dict['task'].module_kwargs['swap_path'] = swap_path
+            function_dict['task'].module_kwargs['from_token_name'] = swap_path[0]
+            function_dict['task'].module_kwargs['to_token_name'] = swap_path[-1]
+
+            swap_result = await run_function(**function_dict)
+
+            if swap_result == enums.TransactionStatus.SUCCESS:
+                main.last_swap_token = swap_path[-1]
         else:
             from_token_name = start_token
 
@@ -1135,7 +937,7 @@ async def run_module(
                         )
 
                 if swap != swaps:
-                    utils.random_sleep()
+                    await utils.async_random_sleep(bot_account.min_sleep_time, bot_account.max_sleep_time)
         return swap_result
     elif task.module_name in constants.POOLS and task.function_name == enums.FunctionNames.POOL:
         include_tokens = task.module_kwargs.get('pool_tokens', set())
@@ -1168,7 +970,7 @@ async def run_module(
             withdraw_sleep_time = random.uniform(min_withdraw_sleep_time, max_withdraw_sleep_time)
 
             if withdraw_sleep_time > 0:
-                utils.sleep(withdraw_sleep_time)
+                await utils.async_sleep(withdraw_sleep_time)
 
             function_dict['function_name'] = enums.FunctionNames.REMOVE_LIQUIDITY
             function_dict['task'].module_kwargs['withdraw_percentage'] = withdraw_percentage
@@ -1189,14 +991,14 @@ async def run_module(
 
         if task.module_kwargs.get('min_borrow_percentage', 10) > 0 and task.module_kwargs.get('max_borrow_percentage', 100) > 0:
             function_dict['function_name'] = enums.FunctionNames.BORROW
-            utils.random_sleep()
+            await utils.async_random_sleep(bot_account.min_sleep_time, bot_account.max_sleep_time)
             borrow_result = await run_function(**function_dict)
             if borrow_result != enums.TransactionStatus.SUCCESS:
                 logging.error(f'[Main] Error occured while borrowing from zkLend. Please, continue manually')
                 return borrow_result
 
             function_dict['function_name'] = enums.FunctionNames.REPAY
-            utils.random_sleep()
+            await utils.async_random_sleep(bot_account.min_sleep_time, bot_account.max_sleep_time)
             repay_result = await run_function(**function_dict)
             if repay_result != enums.TransactionStatus.SUCCESS:
                 logging.error(f'[Main] Error occured while repaying to zkLend. Please, continue manually')
@@ -1209,7 +1011,7 @@ async def run_module(
         if withdraw_percentage > 0:
             function_dict['function_name'] = enums.FunctionNames.WITHDRAW
             function_dict['task'].module_kwargs['withdraw_percentage'] = withdraw_percentage
-            utils.random_sleep()
+            await utils.async_random_sleep(bot_account.min_sleep_time, bot_account.max_sleep_time)
             withdraw_result = await run_function(**function_dict)
             if withdraw_result != enums.TransactionStatus.SUCCESS:
                 logging.error(f'[Main] Error occured while withdrawing from zkLend. Please, continue manually')
@@ -1232,189 +1034,561 @@ async def run_module(
             if function_result != enums.TransactionStatus.SUCCESS:
                 return function_result
             if i != amount - 1:
-                utils.random_sleep()
+                await utils.async_random_sleep(bot_account.min_sleep_time, bot_account.max_sleep_time)
 
         return function_result
     else:
         return await run_function(**function_dict)
 
 
-async def run_modules(bot_account: accounts_loader.BotAccount):
-    for index, task in enumerate(bot_account.tasks):
+def log_task_result(
+    bot_account: accounts_loader.BotAccount,
+    index: int,
+    module_result: enums.TransactionStatus
+):
+    task = bot_account.tasks[index]
+
+    logging.info(
+        f'[Main] {index + 1}/{len(bot_account.tasks)} task ({task.module_name}{f" - {task.function_name}" if task.function_name else ""}) completed'
+    )
+
+    if module_result == enums.TransactionStatus.SUCCESS:
+        method = file_logger.info
+    elif module_result == enums.TransactionStatus.INSUFFICIENT_BALANCE:
+        method = file_logger.critical
+    elif module_result in {
+        enums.TransactionStatus.FAILED,
+        enums.TransactionStatus.ADDRESS_NOT_ALLOWLISTED,
+        enums.TransactionStatus.INCORRECT_NETWORK
+    }:
+        method = file_logger.error
+    else:
+        method = file_logger.warning
+
+    method(
+        f'{index + 1}/{len(bot_account.tasks)} task ({task.module_name}' +
+        f'{f" - {task.function_name}" if task.function_name else ""}) ' +
+        f'completed with result {module_result}'
+    )
+
+
+async def run_modules(
+    bot_account: accounts_loader.BotAccount,
+    start_index: int = 0,
+    gas_queue: utils.GasParkingQueue = None
+) -> int | None:
+    for index in range(start_index, len(bot_account.tasks)):
+        task = bot_account.tasks[index]
+
+        if gas_queue is not None:
+            network_name = get_task_network(task)
+            max_gas_price = get_max_gas_price(bot_account, network_name)
+            gas_monitor = utils.get_gas_monitor(network_name)
+
+            if gas_monitor is not None and max_gas_price != float('inf'):
+                current_gas_price = await gas_monitor.wait_for_gas(proxy=bot_account.proxy)
+                if current_gas_price > max_gas_price:
+                    logging.info(f'[Main] Current gas price {round(current_gas_price, 3)} Gwei is higher than max {max_gas_price} Gwei, parking account with private_key {bot_account.short_private_key}')
+                    gas_queue.park(
+                        network_name=network_name,
+                        max_gas_price=max_gas_price,
+                        item=(bot_account, index),
+                        tasks_left=len(bot_account.tasks) - index
+                    )
+                    return index
+
         module_result = await run_module(bot_account=bot_account, task=task)
         if module_result in constants.CRITICAL_RESULTS:
-            input(f'[Main] Critical result {module_result} received. Press enter to continue if account is ready to continue')
+            await utils.confirm(f'[Main] Critical result {module_result} received. Press enter to continue if account is ready to continue')
+
+        log_task_result(bot_account, index, module_result)
+
+        update_tasks_left(bot_account, index + 1)
 
-        logging.info(
-            f'[Main] {index + 1}/{len(bot_account.tasks)} task ({task.module_name}{f" - {task.function_name}" if task.function_name else ""}) completed'
+        await utils.async_random_sleep(bot_account.min_sleep_time, bot_account.max_sleep_time)
+
+
+def update_last_state(bot_account: accounts_loader.BotAccount):
+    with open('last_state.json') as file:
+        last_state = json.load(file)
+
+    last_state['account_hash'] = bot_account.hash
+
+    with open('last_state.json', 'w') as file:
+        json.dump(
+            last_state,
+            file,
+            indent=4
         )
 
-        if module_result == enums.TransactionStatus.SUCCESS:
-            method = file_logger.info
-        elif module_result == enums.TransactionStatus.INSUFFICIENT_BALANCE:
-            method = file_logger.critical
-        elif module_result in {
-            enums.TransactionStatus.FAILED,
-            enums.TransactionStatus.ADDRESS_NOT_ALLOWLISTED,
-            enums.TransactionStatus.INCORRECT_NETWORK
-        }:
-            method = file_logger.error
-        else:
-            method = file_logger.warning
 
-        method(
-            f'{index + 1}/{len(bot_account.tasks)} task ({task.module_name}' +
-            f'{f" - {task.function_name}" if task.function_name else ""}) ' +
-            f'completed with result {module_result}'
+def update_tasks_left(
+    bot_account: accounts_loader.BotAccount,
+    start_index: int
+):
+    """
+    Saves the tasks the account has left, so that a restarted session runs
+    the same tasks from there.
+    """
+    with open('last_state.json') as file:
+        last_state = json.load(file)
+
+    last_state.setdefault('tasks', {})[bot_account.hash] = [
+        bot_account.tasks_plan.get_identity(task)
+        for task in bot_account.tasks[start_index:]
+    ]
+
+    with open('last_state.json', 'w') as file:
+        json.dump(
+            last_state,
+            file,
+            indent=4
         )
 
-        utils.random_sleep()
 
+def finish_last_state(bot_account: accounts_loader.BotAccount):
+    with open('last_state.json') as file:
+        last_state = json.load(file)
 
-async def run_accounts(bot_accounts: list[accounts_loader.BotAccount]):
-    if not bot_accounts:
-        return
+    last_state.setdefault('finished', []).append(bot_account.hash)
+    last_state.setdefault('tasks', {}).pop(bot_account.hash, None)
+
+    with open('last_state.json', 'w') as file:
+        json.dump(
+            last_state,
+            file,
+            indent=4
+        )
+
+
+def is_funding_task(task: accounts_loader.Task) -> bool:
+    return task.function_name in constants.FUNDING_FUNCTIONS.get(task.module_name, set())
+
+
+async def run_funding(bot_account: accounts_loader.BotAccount) -> int:
+    index = 0
+
+    while index < len(bot_account.tasks) and is_funding_task(bot_account.tasks[index]):
+        task = bot_account.tasks[index]
+
+        logging.info(f'[Main] Starting {task.module_name} - {task.function_name} early for account with private_key {bot_account.short_private_key}')
+
+        try:
+            module_result = await run_module(bot_account=bot_account, task=task)
+        except Exception as e:
+            logging.error(f'[Main] Early funding for account with private_key {bot_account.short_private_key} failed: {e}')
+            break
+
+        if module_result != enums.TransactionStatus.SUCCESS:
+            logging.warning(f'[Main] Early funding for account with private_key {bot_account.short_private_key} finished with result {module_result}, task will be repeated when the account starts')
+            break
+
+        log_task_result(bot_account, index, module_result)
+
+        index += 1
+        update_tasks_left(bot_account, index)
+
+        await utils.async_random_sleep(bot_account.min_sleep_time, bot_account.max_sleep_time)
+
+    return index
+
+
+class FundingPrefetcher:
+    """
+    Runs the leading funding tasks (OKX withdrawals, bridge deposits) of the
+    next accounts in the queue in the background, so their funds have landed
+    by the time the account starts. Background runs never wait for the user,
+    a task that needs the user is left to the account itself.
+    """
+
+    def __init__(
+        self,
+        lookahead: int,
+        budget: int
+    ):
+        self.lookahead = lookahead
+        self.budget = budget
+        self.fundings = {}
+
+    @property
+    def in_flight(self) -> int:
+        return sum(not funding.done() for funding in self.fundings.values())
+
+    def schedule(self, pending_accounts: deque):
+        for bot_account in itertools.islice(pending_accounts, self.lookahead):
+            if self.in_flight >= self.budget:
+                break
 
-    accounts_hashes = [bot_account.hash for bot_account in bot_accounts]
+            if (
+                bot_account.hash in self.fundings
+                or bot_account.mobile_proxy_changelink
+                or not bot_account.tasks
+                or not is_funding_task(bot_account.tasks[0])
+            ):
+                continue
+
+            context = contextvars.copy_context()
+            context.run(utils.interactive.set, False)
+
+            self.fundings[bot_account.hash] = asyncio.create_task(
+                run_funding(bot_account),
+                context=context
+            )
+
+    async def take(self, bot_account: accounts_loader.BotAccount) -> int:
+        funding = self.fundings.pop(bot_account.hash, None)
+
+        if funding is None:
+            return 0
+
+        if not funding.done():
+            logging.info(f'[Main] Waiting for early funding of account with private_key {bot_account.short_private_key}')
+
+        return await funding
+
+
+async def next_account(accounts_iterator: Iterator[accounts_loader.BotAccount]) -> accounts_loader.BotAccount | bool | None:
+    """
+    Reads the next account in a worker thread, so that parsing the accounts
+    file does not stop the gas monitors and the early funding.
+    """
+    return await asyncio.to_thread(next, accounts_iterator, None)
+
+
+async def pull_accounts(
+    accounts_iterator: Iterator[accounts_loader.BotAccount],
+    pending_accounts: deque,
+    count: int
+) -> bool:
+    """
+    Takes accounts from the loader until `count` accounts are pending, adding
+    them to the saved order. Returns False if the loader failed.
+    """
+    pulled_hashes = []
+
+    while len(pending_accounts) < count:
+        bot_account = await next_account(accounts_iterator)
+
+        if bot_account is None:
+            break
+        elif bot_account is False:
+            return False
+
+        pending_accounts.append(bot_account)
+        pulled_hashes.append(bot_account.hash)
+
+    if not pulled_hashes:
+        return True
+
+    with open('last_state.json') as file:
+        last_state = json.load(file)
+
+    ordered = set(last_state['order'])
+    last_state['order'].extend(
+        account_hash for account_hash in pulled_hashes
+        if account_hash not in ordered
+    )
+
+    with open('last_state.json', 'w') as file:
+        json.dump(
+            last_state,
+            file,
+            indent=4
+        )
+
+    return True
+
+
+async def prepare_proxy(bot_account: accounts_loader.BotAccount) -> bool | None:
+    """
+    Changes the mobile proxy and checks that the proxy works. Runs every time
+    the account starts or resumes, so it never continues on the IP that
+    another account has left behind.
+    """
+    if bot_account.mobile_proxy_changelink:
+        try:
+            response = await asyncio.to_thread(
+                requests.get,
+                bot_account.mobile_proxy_changelink,
+                timeout=utils.HTTP_REQUEST_TIMEOUT
+            )
+        except Exception as e:
+            logging.warning(f'[Main] Failed to change mobile proxy for account with private_key {bot_account.short_private_key}: {e}')
+        else:
+            if response.status_code == 200:
+                logging.info(f'[Main] Changed mobile proxy for account with private_key {bot_account.short_private_key}: {response.text}')
+                await utils.async_sleep(5)
+            else:
+                logging.warning(f'[Main] Failed to change mobile proxy for account with private_key {bot_account.short_private_key}')
+
+    if bot_account.proxy:
+        proxy_error = True
+
+        for attempt in range(PROXY_TEST_ATTEMPTS):
+            proxy_test_result = await asyncio.to_thread(utils.test_proxy, bot_account.proxy)
+            if isinstance(proxy_test_result, str):
+                logging.info(f'[Main] Outgoing IP for account with private_key {bot_account.short_private_key} - {proxy_test_result}')
+                proxy_error = False
+                break
+            elif proxy_test_result:
+                logging.warning(f'[Main] Failed to get outgoing IP for account with private_key {bot_account.short_private_key}')
+                proxy_error = False
+                break
+            else:
+                logging.error(f'[Main] Proxy specified for account with private_key {bot_account.short_private_key} is not working ({attempt + 1}/{PROXY_TEST_ATTEMPTS})')
+                if attempt != PROXY_TEST_ATTEMPTS - 1:
+                    await utils.async_sleep(PROXY_TEST_RETRY_DELAY)
+
+        if proxy_error:
+            proxy_result = await utils.async_input(
+                '[Main] What to do? (possible options: [s]kip, [e]xit, [d]elete (deletes proxy)): '
+            )
+            if proxy_result.lower() in {'s', 'skip'}:
+                logging.warning(f'[Main] Skipping account with private_key {bot_account.short_private_key}')
+                file_logger.warning(f'Skipping account with private_key {bot_account.short_private_key}\n')
+                return False
+            elif proxy_result.lower() in {'e', 'exit'}:
+                logging.error(f'[Main] Exiting session due to incorrect proxy')
+                file_logger.info(f'Exiting session due to incorrect proxy\n')
+                return None
+            else:
+                logging.info(f'[Main] Deleting proxy for account with private_key {bot_account.short_private_key}')
+                bot_account.proxy = None
+
+    return True
+
+
+async def prepare_account(bot_account: accounts_loader.BotAccount) -> bool | None:
+    prepare_result = await prepare_proxy(bot_account)
+
+    if not prepare_result:
+        return prepare_result
+
+    if bot_account.wallet_name == enums.WalletNames.ArgentXOld:
+        try:
+            supports_cairo_1 = await utils.supports_cairo_1(
+                private_key=bot_account.private_key,
+                address=bot_account.address,
+                network_name=enums.NetworkNames.StarknetTestnet if USE_TESTNET else enums.NetworkNames.Starknet,
+                wallet_name=bot_account.wallet_name,
+                proxy=bot_account.proxy
+            )
+        except BaseException as e:
+            ...
+        else:
+            if supports_cairo_1:
+                bot_account.cairo_version = 1
+
+    return True
+
+
+async def run_accounts(bot_accounts: Iterable[accounts_loader.BotAccount]):
+    accounts_iterator = iter(bot_accounts)
+    last_state = {}
 
     if Path('last_state.json').exists():
         with open('last_state.json', 'r') as file:
             last_state = json.load(file)
 
         order = last_state.get('order', [])
+        ordered = set(order)
+        finished = set(last_state.get('finished', []))
 
-        if sorted(order) == sorted(accounts_hashes):
-            last_bot_index = order.index(last_state['account_hash'])
-            last_bot_account = next(
-                filter(
-                    lambda bot_account: bot_account.hash == last_state['account_hash'],
-                    bot_accounts
-                )
-            )
+        # Only the accounts of the saved order are needed to continue, they
+        # were the first ones read in the previous session. The rest of the
+        # accounts is still streamed
+        loaded_accounts = []
+        accounts_by_hash = {}
+
+        while not ordered <= accounts_by_hash.keys():
+            bot_account = await next_account(accounts_iterator)
+
+            if bot_account is None:
+                break
+            elif bot_account is False:
+                return
+
+            loaded_accounts.append(bot_account)
+            if bot_account.hash in ordered:
+                accounts_by_hash[bot_account.hash] = bot_account
+
+        resumed_accounts = None
+
+        if order and ordered <= accounts_by_hash.keys():
+            last_bot_account = accounts_by_hash.get(last_state.get('account_hash'))
+            if last_bot_account is not None and last_bot_account.hash in finished:
+                last_bot_account = None
+
+            if last_bot_account is not None:
+                continue_result = input(f'[Main] Continue account with private_key {last_bot_account.short_private_key}? [y/n]: ')
+            else:
+                continue_result = input(f'[Main] Continue previous session with {len(finished)} finished accounts? [y/n]: ')
 
-            continue_result = input(f'[Main] Continue account with private_key {last_bot_account.short_private_key}? [y/n]: ')
             if continue_result.lower() == 'y':
-                print('[Main] Select from which task to continue:')
-                for task_index, task in enumerate(last_bot_account.tasks, 1):
-                    print(f'{task_index}. {task.module_name}{f" - {task.function_name}" if task.function_name else ""}')
-                if last_bot_account.tasks:
-                    while True:
-                        task_num = int(input('[Main] Task number: '))
-                        if task_num > len(last_bot_account.tasks):
-                            print(f'[Main] Task number must be less than {len(last_bot_account.tasks)}')
-                        elif task_num < 1:
-                            print('[Main] Task number must be greater than 1')
-                        else:
-                            break
-                    last_bot_account.tasks = last_bot_account.tasks[task_num - 1:]
-                bot_accounts = [bot_accounts[accounts_hashes.index(account_hash)] for account_hash in order]
-                accounts_hashes = [bot_account.hash for bot_account in bot_accounts]
-                bot_accounts = bot_accounts[last_bot_index + 1:]
-                bot_accounts.insert(0, last_bot_account)
-                logging.info(f'[Main] Continuing account with private_key {last_bot_account.short_private_key} with {len(last_bot_account.tasks)} tasks')
+                for account_hash, identities in last_state.get('tasks', {}).items():
+                    tasks = accounts_by_hash[account_hash].tasks_plan.restore(identities)
+                    if tasks is None:
+                        logging.warning(f'[Main] Tasks of account with private_key {accounts_by_hash[account_hash].short_private_key} have changed, starting them from scratch')
+                    else:
+                        accounts_by_hash[account_hash].tasks = tasks
+
+                if last_bot_account is not None:
+                    print('[Main] Select from which task to continue:')
+                    for task_index, task in enumerate(last_bot_account.tasks, 1):
+                        print(f'{task_index}. {task.module_name}{f" - {task.function_name}" if task.function_name else ""}')
+                    if last_bot_account.tasks:
+                        while True:
+                            task_num = int(input('[Main] Task number: '))
+                            if task_num > len(last_bot_account.tasks):
+                                print(f'[Main] Task number must be less than {len(last_bot_account.tasks)}')
+                            elif task_num < 1:
+                                print('[Main] Task number must be greater than 1')
+                            else:
+                                break
+                        last_bot_account.tasks = last_bot_account.tasks[task_num - 1:]
+                    logging.info(f'[Main] Continuing account with private_key {last_bot_account.short_private_key} with {len(last_bot_account.tasks)} tasks')
+
+                # Finished accounts are left out, the started and parked ones
+                # continue with the tasks they had left, the rest follows
+                resumed_accounts = [
+                    *([last_bot_account] if last_bot_account is not None else []),
+                    *(
+                        accounts_by_hash[account_hash] for account_hash in order
+                        if account_hash not in finished and accounts_by_hash[account_hash] is not last_bot_account
+                    ),
+                    *(bot_account for bot_account in loaded_accounts if bot_account.hash not in ordered)
+                ]
+
+                logging.info(f'Continuing with accounts: {" -> ".join(bot_account.short_private_key for bot_account in resumed_accounts)}')
+
+        if resumed_accounts is None:
+            last_state = {}
+            resumed_accounts = loaded_accounts
+
+        accounts_iterator = itertools.chain(resumed_accounts, accounts_iterator)
 
     with open('last_state.json', 'w') as file:
         json.dump(
             {
-                'order': accounts_hashes,
-                'account_hash': bot_accounts[0].hash
+                'order': last_state.get('order', []),
+                'account_hash': None,
+                'finished': last_state.get('finished', []),
+                'tasks': last_state.get('tasks', {})
             },
             file,
             indent=4
         )
 
-    logging.info(f'Accounts order: {" -> ".join(bot_account.short_private_key for bot_account in bot_accounts)}')
+    # Accounts are taken from the loader only when they are needed, so the
+    # first accounts start while the rest of the file is still being read
+    pending_accounts = deque()
+
+    if not await pull_accounts(accounts_iterator, pending_accounts, 1):
+        return
+
+    if not pending_accounts:
+        Path('last_state.json').unlink()
+        return
 
     logfile_path = Path(file_logger.handlers[0].baseFilename)
     if logfile_path.exists() and logfile_path.stat().st_size > 0:
         with open(logfile_path, 'a') as file:
             file.write('\n\n\n')
 
-    file_logger.info(f'New session with {len(bot_accounts)} accounts started\n')
+    file_logger.info(f'New session started\n')
 
-    for bot_account in bot_accounts:
-        start_message = f'[Main] Starting account with private_key {bot_account.short_private_key} with {len(bot_account.tasks)} tasks'
-        logging.info(start_message)
-        file_logger.info(start_message)
-        utils.random_sleep.min_sleep_time = bot_account.min_sleep_time
-        utils.random_sleep.max_sleep_time = bot_account.max_sleep_time
+    gas_queue = utils.GasParkingQueue()
+    prefetcher = FundingPrefetcher(
+        lookahead=FUNDING_LOOKAHEAD,
+        budget=FUNDING_BUDGET
+    )
 
-        with open('last_state.json') as file:
-            last_state = json.load(file)
-
-        last_state['account_hash'] = bot_account.hash
+    started_accounts = 0
 
-        with open('last_state.json', 'w') as file:
-            json.dump(
-                last_state,
-                file,
-                indent=4
-            )
+    while True:
+        ready_accounts = gas_queue.pop_ready()
 
-        if bot_account.mobile_proxy_changelink:
-            response = requests.get(bot_account.mobile_proxy_changelink)
-            if response.status_code == 200:
-                logging.info(f'[Main] Changed mobile proxy for account with private_key {bot_account.short_private_key}: {response.text}')
-                utils.sleep(5)
-            else:
-                logging.warning(f'[Main] Failed to change mobile proxy for account with private_key {bot_account.short_private_key}')
+        if not ready_accounts:
+            if not await pull_accounts(accounts_iterator, pending_accounts, FUNDING_LOOKAHEAD + 1):
+                logging.error('[Main] Failed to load the remaining accounts, stopping the session')
+                break
 
-        if bot_account.proxy:
-            proxy_error = False
-
-            while True:
-                try:
-                    proxy_test_result = utils.test_proxy(bot_account.proxy)
-                    if isinstance(proxy_test_result, str):
-                        logging.info(f'[Main] Outgoing IP for account with private_key {bot_account.short_private_key} - {proxy_test_result}')
-                        break
-                    elif proxy_test_result:
-                        logging.warning(f'[Main] Failed to get outgoing IP for account with private_key {bot_account.short_private_key}')
-                        break
-                    else:
-                        logging.error(f'[Main] Proxy specified for account with private_key {bot_account.short_private_key} is not working. Retrying...')
-                        logging.info(f'[Main] To stop retrying, press Ctrl+C')
-                        utils.time.sleep(15)
-                except KeyboardInterrupt:
-                    proxy_error = True
+            if not pending_accounts:
+                if not gas_queue:
+                    # Nothing is left to continue, the next session streams
+                    # the accounts from the start again
+                    Path('last_state.json').unlink()
                     break
 
-            if proxy_error:
-                proxy_result = input(
-                    '[Main] What to do? (possible options: [s]kip, [e]xit, [d]elete (deletes proxy)): '
-                )
-                if proxy_result.lower() in {'s', 'skip'}:
-                    logging.warning(f'[Main] Skipping account with private_key {bot_account.short_private_key}')
-                    file_logger.warning(f'Skipping account with private_key {bot_account.short_private_key}\n')
-                    continue
-                elif proxy_result.lower() in {'e', 'exit'}:
-                    logging.error(f'[Main] Exiting session due to incorrect proxy')
-                    file_logger.info(f'Exiting session due to incorrect proxy\n')
+                logging.info(f'[Main] {len(gas_queue)} accounts are waiting for gas price to drop')
+                await gas_queue.wait_ready()
+                continue
+
+            bot_account = pending_accounts.popleft()
+            started_accounts += 1
+            prefetcher.schedule(pending_accounts)
+
+            start_message = f'[Main] Starting account with private_key {bot_account.short_private_key} with {len(bot_account.tasks)} tasks'
+            logging.info(start_message)
+            file_logger.info(start_message)
+
+            update_last_state(bot_account)
+
+            prepare_result = await prepare_account(bot_account)
+
+            if prepare_result is None:
+                break
+            elif not prepare_result:
+                finish_last_state(bot_account)
+                continue
+
+            ready_accounts = [(bot_account, None)]
+
+        session_stopped = False
+
+        for bot_account, task_index in ready_accounts:
+            if task_index is not None:
+                logging.info(f'[Main] Resuming account with private_key {bot_account.short_private_key} from task {task_index + 1}/{len(bot_account.tasks)}')
+                update_last_state(bot_account)
+
+                prepare_result = await prepare_proxy(bot_account)
+
+                if prepare_result is None:
+                    session_stopped = True
                     break
-                else:
-                    logging.info(f'[Main] Deleting proxy for account with private_key {bot_account.short_private_key}')
-                    bot_account.proxy = None
+                elif not prepare_result:
+                    finish_last_state(bot_account)
+                    continue
 
-        if bot_account.wallet_name == enums.WalletNames.ArgentXOld:
-            try:
-                supports_cairo_1 = await utils.supports_cairo_1(
-                    private_key=bot_account.private_key,
-                    address=bot_account.address,
-                    network_name=enums.NetworkNames.StarknetTestnet if USE_TESTNET else enums.NetworkNames.Starknet,
-                    wallet_name=bot_account.wallet_name,
-                    proxy=bot_account.proxy
-                )
-            except BaseException as e:
-                ...
+                start_index = task_index
             else:
-                if supports_cairo_1:
-                    bot_account.cairo_version = 1
+                start_index = await prefetcher.take(bot_account)
+                if start_index:
+                    logging.info(f'[Main] First {start_index} funding tasks of account with private_key {bot_account.short_private_key} are already completed')
+
+            update_tasks_left(bot_account, start_index)
+
+            utils.random_sleep.min_sleep_time = bot_account.min_sleep_time
+            utils.random_sleep.max_sleep_time = bot_account.max_sleep_time
 
-        await run_modules(bot_account=bot_account)
-        logging.info(f'[Main] Finished account with private_key {bot_account.short_private_key}')
-        file_logger.info(f'Finished account with private_key {bot_account.short_private_key}\n')
+            parked_index = await run_modules(
+                bot_account=bot_account,
+                start_index=start_index,
+                gas_queue=gas_queue
+            )
+
+            if parked_index is not None:
+                continue
 
-    file_logger.info(f'Session with {len(bot_accounts)} accounts finished')
+            finish_last_state(bot_account)
+
+            logging.info(f'[Main] Finished account with private_key {bot_account.short_private_key}')
+            file_logger.info(f'Finished account with private_key {bot_account.short_private_key}\n')
+
+        if session_stopped:
+            break
+
+    file_logger.info(f'Session with {started_accounts} accounts finished')
 
 
 async def main():
@@ -1426,9 +1600,9 @@ async def main():
     print(r'$$\   $$ |  $$ |$$\ $$  __$$ |$$ |      $$  _$$<  $$ |  $$ |$$   ____| $$ |$$\       $$ |  $$ |$$ |  $$ | $$ |$$\ ')
     print(r'\$$$$$$  |  \$$$$  |\$$$$$$$ |$$ |      $$ | \$$\ $$ |  $$ |\$$$$$$$\  \$$$$  |      $$$$$$$  |\$$$$$$  | \$$$$  |')
     print(r' \______/    \____/  \_______|\__|      \__|  \__|\__|  \__| \_______|  \____/       \_______/  \______/   \____/ ')
-    bot_accounts = accounts_loader.read_accounts()
-    if isinstance(bot_accounts, list):
-        await run_accounts(bot_accounts=bot_accounts)
+    utils.token_prices.network_name = enums.NetworkNames.StarknetTestnet if USE_TESTNET else enums.NetworkNames.Starknet
+
+    await run_accounts(bot_accounts=accounts_loader.iter_accounts(rebuild='--rebuild-accounts' in sys.argv))
 
 
 if __name__ == '__main__':
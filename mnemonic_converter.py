@@ -1,3 +1,8 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
 import pandas as pd
 import tqdm
 
@@ -5,47 +10,131 @@ import create_accounts
 import enums
 import utils
 
+CONVERT_DTYPES = {
+    'mnemonic': str,
+    'wallet_name': str,
+    'address': str,
+    'private_key': str
+}
 
-def main():
-    wallets_df = pd.read_csv(
-        'convert.csv',
+
+def read_convert_chunks(filepath: Path, skip_rows: int = 0, **kwargs):
+    return pd.read_csv(
+        filepath,
         header=0,
-        index_col='mnemonic',
-        dtype={
-            'mnemonic': str,
-            'wallet_name': str,
-            'address': str,
-            'private_key': str
-        }
+        dtype=CONVERT_DTYPES,
+        skiprows=range(1, skip_rows + 1),
+        chunksize=create_accounts.CHUNK_SIZE,
+        **kwargs
     )
 
-    if wallets_df.wallet_name.isna().any():
-        print('Some wallets are missing names. Please fill them in and try again.')
-        return
 
-    for index, row in tqdm.tqdm(list(wallets_df.iterrows())):
-        try:
-            wallet_name = enums.WalletNames.from_string(row.wallet_name)
-        except ValueError:
-            print(f'Wallet {index} has invalid wallet name. Please fix it and try again.')
-            return
+def hash_file(filepath: Path) -> str:
+    file_hash = hashlib.sha256()
+
+    with open(filepath, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            file_hash.update(block)
+
+    return file_hash.hexdigest()
+
+
+def convert_chunk(wallets_df: pd.DataFrame) -> pd.DataFrame:
+    wallets_df = wallets_df.copy()
+
+    for wallet_name_str, group_df in wallets_df.groupby(wallets_df.wallet_name.str.lower()):
+        wallet_name = enums.WalletNames.from_string(wallet_name_str)
+
+        private_keys = [
+            create_accounts.private_key_from_mnemonic(mnemonic, wallet_name)
+            for mnemonic in group_df.mnemonic
+        ]
+        wallets = create_accounts.wallets_from_private_keys(private_keys, wallet_name)
+
+        wallets_df.loc[group_df.index, 'private_key'] = [hex(key_pair.private_key) for key_pair, _ in wallets]
+        wallets_df.loc[group_df.index, 'address'] = [utils.extend_hex(address, 64) for _, address in wallets]
+
+    return wallets_df
+
+
+def main():
+    filepath = Path('convert.csv')
+    journal_path = filepath.with_name(f'{filepath.stem}.part.csv')
+    progress_path = filepath.with_name(f'{filepath.stem}.part.json')
+
+    total = 0
+
+    with read_convert_chunks(filepath, usecols=['mnemonic', 'wallet_name']) as wallets_chunks:
+        for wallets_df in wallets_chunks:
+            if wallets_df.wallet_name.isna().any():
+                print('Some wallets are missing names. Please fill them in and try again.')
+                return
+
+            for index, wallet_name in wallets_df.wallet_name.items():
+                try:
+                    enums.WalletNames.from_string(wallet_name)
+                except ValueError:
+                    print(f'Wallet on row {index + 2} has invalid wallet name. Please fix it and try again.')
+                    return
+
+            total += len(wallets_df)
+
+    input_hash = hash_file(filepath)
+
+    progress = None
+
+    if progress_path.exists():
+        with open(progress_path) as file:
+            progress = json.load(file)
+
+    converted = create_accounts.count_csv_rows(journal_path)
 
-        key_pair, address = create_accounts.wallet_from_mnemonic(
-            mnemonic=row.name,
-            wallet_name=wallet_name
-        )
+    if converted and (progress is None or progress.get('input_hash') != input_hash):
+        print(f'{journal_path.name} was made from another {filepath.name}, starting the conversion from scratch')
+        converted = 0
+        journal_path.unlink()
+    elif converted > total:
+        converted = 0
+        journal_path.unlink()
+    elif converted:
+        print(f'Resuming conversion from {journal_path.name} ({converted}/{total} wallets converted)')
 
-        wallets_df.loc[index, 'address'] = utils.extend_hex(address, 64)
-        wallets_df.loc[index, 'private_key'] = hex(key_pair.private_key)
+    if not converted:
+        journal_path.unlink(missing_ok=True)
+
+        with open(progress_path, 'w') as file:
+            json.dump({'input_hash': input_hash}, file, indent=4)
+
+    try:
+        with read_convert_chunks(filepath, skip_rows=converted) as wallets_chunks, tqdm.tqdm(total=total, initial=converted) as progress_bar:
+            chunks = ((wallets_df,) for wallets_df in wallets_chunks)
+            for wallets_df in create_accounts.run_in_pool(convert_chunk, chunks):
+                wallets_df.to_csv(
+                    journal_path,
+                    mode='a',
+                    header=not journal_path.exists() or journal_path.stat().st_size == 0,
+                    index=False
+                )
+                progress_bar.update(len(wallets_df))
+    except KeyboardInterrupt:
+        print(f'Conversion interrupted. Converted wallets are saved to {journal_path.name}, run the script again to resume')
+        return
 
     print('Saving results to convert.csv')
 
+    if not journal_path.exists():
+        progress_path.unlink(missing_ok=True)
+        print('Done!')
+        return
+
     try:
-        wallets_df.to_csv('convert.csv')
+        os.replace(journal_path, filepath)
     except PermissionError:
         print('Please close convert.csv and try again.')
         return
 
+    progress_path.unlink(missing_ok=True)
+
     print('Done!')
 
 
@@ -1,4 +1,6 @@
 from modules.avnu import avnu
+from modules.best_swap import best_swap
+from modules.dex import dex
 from modules.dmail import dmail
 from modules.fibrous import fibrous
 from modules.jediswap import jediswap
@@ -1,5 +1,3 @@
-import requests
-
 import constants
 import enums
 import utils
@@ -13,6 +11,66 @@ BASE_URLS = {
 }
 
 
+async def get_quote(
+    network_name: enums.NetworkNames,
+    from_token: constants.NetworkToken,
+    to_token: constants.NetworkToken,
+    amount_in_wei: int,
+    address: str,
+    proxy: dict[str, str] = None
+) -> dict | None:
+    status, quotes_json = await utils.http_request(
+        'GET',
+        f'{BASE_URLS[network_name]}/swap/v1/quotes',
+        proxy=proxy,
+        params={
+            'sellTokenAddress': from_token.contract_address,
+            'buyTokenAddress': to_token.contract_address,
+            'sellAmount': hex(amount_in_wei),
+            'size': 1,
+            'takerAddress': address,
+            'integratorName': 'AVNU Portal'
+        }
+    )
+
+    if status != 200 or not quotes_json:
+        logging.error(f'[Avnu] Failed to get quotes: {status} {quotes_json}')
+        return None
+
+    return quotes_json[0]
+
+
+async def build_swap_call(
+    network_name: enums.NetworkNames,
+    quote: dict,
+    address: str,
+    slippage: float,
+    proxy: dict[str, str] = None
+) -> Call | None:
+    status, build_json = await utils.http_request(
+        'POST',
+        f'{BASE_URLS[network_name]}/swap/v1/build',
+        proxy=proxy,
+        json={
+            'quoteId': quote['quoteId'],
+            'takerAddress': address,
+            'slippage': str(slippage / 100)
+        }
+    )
+
+    if status != 200 or not build_json:
+        logging.error(f'[Avnu] Failed to build swap: {status} {build_json}')
+        return None
+
+    return Call(
+        to_addr=int(build_json['contractAddress'], 16),
+        selector=get_selector_from_name(build_json['entrypoint']),
+        calldata=[
+            int(value, 16) for value in build_json['calldata']
+        ]
+    )
+
+
 async def swap(
     private_key: str,
     address: str,
@@ -43,78 +101,49 @@ async def swap(
     from_token = constants.NETWORK_TOKENS[network_name, from_token_name]
     to_token = constants.NETWORK_TOKENS[network_name, to_token_name]
 
-    from_token_contract = utils.get_starknet_erc20_contract(
-        token_address=from_token.contract_address,
-        provider=account
+    amount_in_wei, amount = await utils.resolve_token_amount(
+        account=account,
+        token=from_token,
+        amount=amount,
+        percentage=percentage
     )
 
-    amount_in_wei = await account.get_balance(from_token.contract_address)
-
-    if amount is None:
-        if percentage == 100:
-            amount_in_wei = amount_in_wei
-        else:
-            amount_in_wei = int(amount_in_wei * percentage / 100)
-        amount = amount_in_wei / 10 ** from_token.decimals
-    else:
-        amount_in_wei = int(amount * 10 ** from_token.decimals)
-
     logging.info(f'[Avnu] Swapping {amount} {from_token_name} to {to_token_name}')
 
-    base_url = BASE_URLS[network_name]
-
-    quotes_response = requests.get(
-        url=f'{base_url}/swap/v1/quotes',
-        params={
-            'sellTokenAddress': from_token.contract_address,
-            'buyTokenAddress': to_token.contract_address,
-            'sellAmount': hex(amount_in_wei),
-            'size': 1,
-            'takerAddress': address,
-            'integratorName': 'AVNU Portal'
-        }
+    quote = await get_quote(
+        network_name=network_name,
+        from_token=from_token,
+        to_token=to_token,
+        amount_in_wei=amount_in_wei,
+        address=address,
+        proxy=proxy
     )
 
-    if quotes_response.status_code != 200:
-        logging.error(f'[Avnu] Failed to get quotes: {quotes_response.status_code} {quotes_response.reason}')
+    if quote is None:
         return enums.TransactionStatus.FAILED
 
-    quotes_json = quotes_response.json()
-
-    quote = quotes_json[0]
-
-    build_response = requests.post(
-        url=f'{base_url}/swap/v1/build',
-        json={
-            'quoteId': quote['quoteId'],
-            'takerAddress': address,
-            'slippage': str(slippage / 100)
-        }
+    swap_call = await build_swap_call(
+        network_name=network_name,
+        quote=quote,
+        address=address,
+        slippage=slippage,
+        proxy=proxy
     )
 
-    if build_response.status_code != 200:
-        logging.error(f'[Avnu] Failed to build swap: {build_response.status_code} {build_response.reason}')
+    if swap_call is None:
         return enums.TransactionStatus.FAILED
 
-    build_json = build_response.json()
-    router_address = build_json['contractAddress']
-
-    approve_call = from_token_contract.functions['approve'].prepare(
-        spender=int(router_address, 16),
-        amount=amount_in_wei
-    )
-
-    swap_call = Call(
-        to_addr=int(router_address, 16),
-        selector=get_selector_from_name(build_json['entrypoint']),
-        calldata=[
-            int(value, 16) for value in build_json['calldata']
-        ]
-    )
+    approvals = [
+        utils.Approval(
+            token_address=from_token.contract_address,
+            spender=swap_call.to_addr,
+            amount=amount_in_wei
+        )
+    ]
 
     resp = await account.execute(
         [
-            approve_call,
+            *await utils.get_approve_calls(account, approvals),
             swap_call
         ],
         cairo_version=cairo_version,
@@ -129,7 +158,11 @@ async def swap(
         logging_prefix='Avnu'
     )
 
-    if receipt.execution_status == TransactionExecutionStatus.SUCCEEDED:
+    succeeded = receipt.execution_status == TransactionExecutionStatus.SUCCEEDED
+
+    utils.update_allowances(account, approvals, succeeded)
+
+    if succeeded:
         logging.info(f'[Avnu] Successfully swapped {amount} {from_token_name} to {to_token_name}')
         return enums.TransactionStatus.SUCCESS
     else:
@@ -0,0 +1,314 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from starknet_py.net.account.account import Account
+from starknet_py.net.client_models import Call
+
+import constants
+import enums
+import utils
+from logger import logging
+from modules.avnu import avnu
+from modules.dex import dex
+from modules.fibrous import fibrous
+from modules.jediswap import jediswap
+from modules.myswap import myswap
+from modules.tenkswap import tenkswap
+
+DEX_ADAPTERS = {
+    enums.ModuleNames.JediSwap: jediswap.JediSwap,
+    enums.ModuleNames.mySwap: myswap.MySwap,
+    enums.ModuleNames.TenKSwap: tenkswap.TenKSwap
+}
+
+QUOTE_SOURCES = [
+    enums.ModuleNames.Avnu,
+    enums.ModuleNames.Fibrous,
+    *DEX_ADAPTERS
+]
+
+# Sources that have not answered within this time are left out of the comparison
+BEST_SWAP_QUOTE_TIMEOUT = 5
+
+
+@dataclass
+class SwapQuote:
+    source: enums.ModuleNames
+    amount_out: int
+    latency: float
+    data: Any = None
+
+
+def get_pair_sources(
+    network_name: enums.NetworkNames,
+    from_token_name: enums.TokenNames,
+    to_token_name: enums.TokenNames
+) -> list[enums.ModuleNames]:
+    sources = []
+
+    for source in QUOTE_SOURCES:
+        pairs = constants.SWAP_PAIRS[source].get(network_name, set())
+        if (from_token_name, to_token_name) in pairs or (to_token_name, from_token_name) in pairs:
+            sources.append(source)
+
+    return sources
+
+
+async def fetch_source_quote(
+    source: enums.ModuleNames,
+    account: Account,
+    network_name: enums.NetworkNames,
+    from_token: constants.NetworkToken,
+    to_token: constants.NetworkToken,
+    amount_in_wei: int,
+    proxy: dict[str, str] = None
+) -> tuple[int | None, Any]:
+    if source == enums.ModuleNames.Avnu:
+        quote = await avnu.get_quote(
+            network_name=network_name,
+            from_token=from_token,
+            to_token=to_token,
+            amount_in_wei=amount_in_wei,
+            address=hex(account.address),
+            proxy=proxy
+        )
+        return (None, None) if quote is None else (int(quote['buyAmount'], 16), quote)
+
+    if source == enums.ModuleNames.Fibrous:
+        return await fibrous.get_quote(
+            from_token=from_token,
+            to_token=to_token,
+            amount_in_wei=amount_in_wei,
+            proxy=proxy
+        ), None
+
+    adapter = DEX_ADAPTERS[source](account, network_name)
+    return await adapter.quote(from_token, to_token, amount_in_wei), adapter
+
+
+async def get_source_quote(
+    source: enums.ModuleNames,
+    account: Account,
+    network_name: enums.NetworkNames,
+    from_token: constants.NetworkToken,
+    to_token: constants.NetworkToken,
+    amount_in_wei: int,
+    proxy: dict[str, str] = None
+) -> SwapQuote | None:
+    start_time = time.monotonic()
+
+    amount_out, data = await fetch_source_quote(
+        source=source,
+        account=account,
+        network_name=network_name,
+        from_token=from_token,
+        to_token=to_token,
+        amount_in_wei=amount_in_wei,
+        proxy=proxy
+    )
+
+    latency = time.monotonic() - start_time
+
+    if not amount_out:
+        logging.warning(f'[Best Swap] {source} returned no quote in {latency:.2f}s')
+        return None
+
+    logging.info(f'[Best Swap] {source} quote: {amount_out / 10 ** to_token.decimals} in {latency:.2f}s')
+
+    return SwapQuote(
+        source=source,
+        amount_out=amount_out,
+        latency=latency,
+        data=data
+    )
+
+
+async def get_quotes(
+    sources: list[enums.ModuleNames],
+    account: Account,
+    network_name: enums.NetworkNames,
+    from_token: constants.NetworkToken,
+    to_token: constants.NetworkToken,
+    amount_in_wei: int,
+    timeout: float = BEST_SWAP_QUOTE_TIMEOUT,
+    proxy: dict[str, str] = None
+) -> list[SwapQuote]:
+    """
+    Requests quotes from all sources at once and returns the ones that arrived
+    within the timeout, best first.
+    """
+    tasks = {
+        asyncio.create_task(get_source_quote(
+            source=source,
+            account=account,
+            network_name=network_name,
+            from_token=from_token,
+            to_token=to_token,
+            amount_in_wei=amount_in_wei,
+            proxy=proxy
+        )): source
+        for source in sources
+    }
+
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+    for task in pending:
+        task.cancel()
+        logging.warning(f'[Best Swap] {tasks[task]} did not quote within {timeout}s')
+
+    quotes = []
+
+    for task in done:
+        if task.exception() is not None:
+            logging.warning(f'[Best Swap] {tasks[task]} quote failed: {task.exception()}')
+        elif task.result() is not None:
+            quotes.append(task.result())
+
+    return sorted(quotes, key=lambda quote: quote.amount_out, reverse=True)
+
+
+async def build_calls(
+    quote: SwapQuote,
+    account: Account,
+    network_name: enums.NetworkNames,
+    from_token: constants.NetworkToken,
+    to_token: constants.NetworkToken,
+    amount_in_wei: int,
+    slippage: float,
+    proxy: dict[str, str] = None
+) -> tuple[list[utils.Approval], list[Call]] | None:
+    if quote.source in DEX_ADAPTERS:
+        adapter = quote.data
+
+        approval = adapter.build_approval(
+            token_address=from_token.contract_address,
+            amount=amount_in_wei
+        )
+
+        swap_call = adapter.build_swap_call(
+            from_token=from_token,
+            to_token=to_token,
+            amount_in_wei=amount_in_wei,
+            amount_out_min=int(quote.amount_out * (1 - slippage / 100)),
+            deadline=await adapter.get_deadline()
+        )
+
+        return [approval], [swap_call]
+
+    if quote.source == enums.ModuleNames.Avnu:
+        swap_call = await avnu.build_swap_call(
+            network_name=network_name,
+            quote=quote.data,
+            address=hex(account.address),
+            slippage=slippage,
+            proxy=proxy
+        )
+    else:
+        swap_call = await fibrous.build_swap_call(
+            network_name=network_name,
+            from_token=from_token,
+            to_token=to_token,
+            amount_in_wei=amount_in_wei,
+            address=hex(account.address),
+            slippage=slippage,
+            proxy=proxy
+        )
+
+    if swap_call is None:
+        return None
+
+    approval = utils.Approval(
+        token_address=from_token.contract_address,
+        spender=swap_call.to_addr,
+        amount=amount_in_wei
+    )
+
+    return [approval], [swap_call]
+
+
+async def swap(
+    private_key: str,
+    address: str,
+    network_name: enums.NetworkNames,
+    from_token_name: enums.TokenNames,
+    to_token_name: enums.TokenNames,
+    slippage: float,
+    cairo_version: int,
+    *,
+    amount: float = None,
+    percentage: float = None,
+    proxy: dict[str, str] = None
+) -> enums.TransactionStatus:
+    if not any([amount, percentage]):
+        raise ValueError('Either amount or percentage must be specified')
+    elif all([amount, percentage]):
+        raise ValueError('Only one of amount or percentage must be specified')
+
+    sources = get_pair_sources(network_name, from_token_name, to_token_name)
+
+    if not sources:
+        logging.error(f'[Best Swap] No sources for pair: {from_token_name}/{to_token_name}')
+        return enums.TransactionStatus.FAILED
+
+    account = utils.get_account(
+        network_name=network_name,
+        private_key=private_key,
+        address=address,
+        proxy=proxy
+    )
+
+    from_token = constants.NETWORK_TOKENS[network_name, from_token_name]
+    to_token = constants.NETWORK_TOKENS[network_name, to_token_name]
+
+    (amount_in_wei, amount), nonce = await asyncio.gather(
+        utils.resolve_token_amount(
+            account=account,
+            token=from_token,
+            amount=amount,
+            percentage=percentage
+        ),
+        account.get_nonce()
+    )
+
+    logging.info(f'[Best Swap] Swapping {amount} {from_token_name} to {to_token_name}')
+
+    quotes = await get_quotes(
+        sources=sources,
+        account=account,
+        network_name=network_name,
+        from_token=from_token,
+        to_token=to_token,
+        amount_in_wei=amount_in_wei,
+        proxy=proxy
+    )
+
+    for quote in quotes:
+        built_calls = await build_calls(
+            quote=quote,
+            account=account,
+            network_name=network_name,
+            from_token=from_token,
+            to_token=to_token,
+            amount_in_wei=amount_in_wei,
+            slippage=slippage,
+            proxy=proxy
+        )
+
+        if built_calls is None:
+            continue
+
+        approvals, calls = built_calls
+
+        logging.info(f'[Best Swap] Swapping through {quote.source}')
+
+        if await dex.execute(account, network_name, calls, cairo_version, 'Best Swap', nonce=nonce, approvals=approvals):
+            logging.info(f'[Best Swap] Successfully swapped {amount} {from_token_name} to {to_token_name} through {quote.source}')
+            return enums.TransactionStatus.SUCCESS
+        else:
+            logging.error(f'[Best Swap] Failed to swap {amount} {from_token_name} to {to_token_name} through {quote.source}')
+            return enums.TransactionStatus.FAILED
+
+    logging.error(f'[Best Swap] No quotes for {from_token_name}/{to_token_name}')
+    return enums.TransactionStatus.FAILED
@@ -0,0 +1,879 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from starknet_py.net.account.account import Account
+from starknet_py.net.client_models import Call, TransactionExecutionStatus
+from starknet_py.net.full_node_client import FullNodeClient
+
+import constants
+import enums
+import utils
+from logger import logging
+
+POOL_STATE_BLOCK_POLL_INTERVAL = 5
+
+
+@dataclass
+class LiquidityPool:
+    liquidity_token: int
+    reserves: dict[int, int]
+    pool_id: int = None
+    token_addresses: list[int] = field(default_factory=list)
+    # Swap fee of the pool in units of the adapter's pool_fee_denominator,
+    # None if the pool does not report it
+    fee: int = None
+
+
+class PoolStateCache:
+    """
+    Pool states of one network at its latest block, shared by all accounts.
+    The head is checked at most once per block_poll_interval seconds, states
+    are keyed by (pool, block number) and dropped when a new block arrives.
+    States are read at the latest accepted block rather than the pending one,
+    transactions that are not in a block yet are covered by the slippage.
+    """
+
+    def __init__(
+        self,
+        network_name: enums.NetworkNames,
+        block_poll_interval: float = POOL_STATE_BLOCK_POLL_INTERVAL
+    ):
+        self.network_name = network_name
+        self.block_poll_interval = block_poll_interval
+        self.block_number = None
+        self.states = {}
+        self.last_block_check = 0
+        self.update_task = None
+
+    async def update(self, client: FullNodeClient):
+        self.last_block_check = time.time()
+
+        block_number = await client.get_block_number()
+
+        if block_number != self.block_number:
+            self.states = {}
+            self.block_number = block_number
+
+    async def get_block_number(self, client: FullNodeClient) -> int:
+        if time.time() - self.last_block_check > self.block_poll_interval:
+            if (
+                self.update_task is None
+                or self.update_task.done()
+                or self.update_task.get_loop() is not asyncio.get_running_loop()
+            ):
+                self.update_task = asyncio.create_task(self.update(client))
+
+        if (
+            self.update_task is not None
+            and not self.update_task.done()
+            and self.update_task.get_loop() is asyncio.get_running_loop()
+        ):
+            await asyncio.shield(self.update_task)
+
+        return self.block_number
+
+    def discard_failed(self, key: tuple, future: asyncio.Future):
+        if future.cancelled() or future.exception() is not None:
+            if self.states.get(key) is future:
+                del self.states[key]
+
+    async def get_state(
+        self,
+        pool_key: Any,
+        client: FullNodeClient,
+        fetch: Callable[[int], Awaitable[Any]]
+    ) -> Any:
+        block_number = await self.get_block_number(client)
+
+        key = (pool_key, block_number)
+        future = self.states.get(key)
+
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            future = asyncio.ensure_future(fetch(block_number))
+            future.add_done_callback(lambda done_future: self.discard_failed(key, done_future))
+            self.states[key] = future
+
+        return await asyncio.shield(future)
+
+
+def get_pool_state_cache(network_name: enums.NetworkNames) -> PoolStateCache:
+    caches = getattr(get_pool_state_cache, 'caches', {})
+
+    if network_name not in caches:
+        caches[network_name] = PoolStateCache(network_name)
+        get_pool_state_cache.caches = caches
+
+    return caches[network_name]
+
+
+class DexAdapter(ABC):
+    """
+    Protocol specific part of a DEX: quotes, pools and the router calls.
+    Amount resolution, slippage, approvals and execution are shared by all
+    DEXes and live in the module level functions below.
+    """
+
+    name = None
+    abi_dir = None
+    router_addresses = {}
+    deadline = None
+    swap_fee_per_mille = 3
+    pool_fee_denominator = 1000
+
+    def __init__(
+        self,
+        account: Account,
+        network_name: enums.NetworkNames
+    ):
+        self.account = account
+        self.network_name = network_name
+        self.router_contract = utils.get_starknet_contract(
+            address=self.router_addresses[network_name],
+            abi=self.load_abi('Router'),
+            provider=account
+        )
+        self.pools = {}
+
+    def load_abi(self, name: str) -> list:
+        with open(Path(self.abi_dir) / f'{name}.json') as file:
+            return json.load(file)
+
+    def supports_pair(
+        self,
+        first_token_name: enums.TokenNames,
+        second_token_name: enums.TokenNames
+    ) -> bool:
+        return True
+
+    def prefetch(
+        self,
+        first_token: constants.NetworkToken,
+        second_token: constants.NetworkToken
+    ):
+        """
+        Starts the requests that do not depend on the amount, so that they run
+        while the balance is being read.
+        """
+
+    def get_pool(
+        self,
+        first_token: constants.NetworkToken,
+        second_token: constants.NetworkToken
+    ) -> asyncio.Future:
+        """
+        Pool state at the latest block. Requests in flight are shared, finished
+        ones are looked up again in the network wide pool state cache, so
+        failed requests are retried and states of old blocks are not reused.
+        """
+        key = frozenset({first_token.int_contract_address, second_token.int_contract_address})
+        pool = self.pools.get(key)
+
+        if pool is None or pool.done():
+            self.pools[key] = asyncio.ensure_future(get_pool_state_cache(self.network_name).get_state(
+                pool_key=(self.name, key),
+                client=self.account.client,
+                fetch=lambda block_number: self.fetch_pool(first_token, second_token, block_number)
+            ))
+
+        return self.pools[key]
+
+    async def get_deadline(self) -> int | None:
+        if self.deadline is None:
+            return None
+
+        return await utils.get_block_timestamp(self.network_name, self.account.client) + self.deadline
+
+    @abstractmethod
+    async def fetch_pool(
+        self,
+        first_token: constants.NetworkToken,
+        second_token: constants.NetworkToken,
+        block_number: int
+    ) -> LiquidityPool | None:
+        raise NotImplementedError
+
+    async def quote(
+        self,
+        from_token: constants.NetworkToken,
+        to_token: constants.NetworkToken,
+        amount_in_wei: int
+    ) -> int | None:
+        """
+        Constant product output of the pool after the swap fee, the way the
+        router computes it. The fee reported by the pool is used if there is one.
+        """
+        pool = await self.get_pool(from_token, to_token)
+
+        if pool is None:
+            return None
+
+        reserve_in = pool.reserves[from_token.int_contract_address]
+        reserve_out = pool.reserves[to_token.int_contract_address]
+
+        if not reserve_in or not reserve_out:
+            return None
+
+        if pool.fee is None:
+            fee, fee_denominator = self.swap_fee_per_mille, 1000
+        else:
+            fee, fee_denominator = pool.fee, self.pool_fee_denominator
+
+        # Same integer math as get_amount_out of the Uniswap V2 router
+        amount_in_with_fee = amount_in_wei * (fee_denominator - fee)
+
+        return amount_in_with_fee * reserve_out // (reserve_in * fee_denominator + amount_in_with_fee)
+
+    def build_approval(
+        self,
+        token_address: str | int,
+        amount: int
+    ) -> utils.Approval:
+        return utils.Approval(
+            token_address=token_address,
+            spender=self.router_contract.address,
+            amount=amount
+        )
+
+    @abstractmethod
+    def build_swap_call(
+        self,
+        from_token: constants.NetworkToken,
+        to_token: constants.NetworkToken,
+        amount_in_wei: int,
+        amount_out_min: int,
+        deadline: int | None
+    ) -> Call:
+        raise NotImplementedError
+
+    @abstractmethod
+    def build_add_liquidity_call(
+        self,
+        first_token: constants.NetworkToken,
+        second_token: constants.NetworkToken,
+        first_amount: int,
+        second_amount: int,
+        first_min_amount: int,
+        second_min_amount: int,
+        deadline: int | None
+    ) -> Call:
+        raise NotImplementedError
+
+    @abstractmethod
+    def build_remove_liquidity_call(
+        self,
+        pool: LiquidityPool,
+        first_token: constants.NetworkToken,
+        second_token: constants.NetworkToken,
+        liquidity: int,
+        first_min_amount: int,
+        second_min_amount: int,
+        deadline: int | None
+    ) -> Call:
+        raise NotImplementedError
+
+
+class UniswapV2Adapter(DexAdapter):
+    """
+    Router, factory and pair contracts of a Uniswap V2 fork. Subclasses only
+    provide the contract function names and the factory address.
+    """
+
+    swap_function = None
+    add_liquidity_function = None
+    remove_liquidity_function = None
+    get_pair_function = None
+    get_reserves_function = None
+
+    pair_addresses = {}
+
+    @abstractmethod
+    async def get_factory_address(self) -> str | int:
+        raise NotImplementedError
+
+    async def get_pair_address(
+        self,
+        token0: constants.NetworkToken,
+        token1: constants.NetworkToken
+    ) -> int:
+        key = (self.name, self.network_name, token0.int_contract_address, token1.int_contract_address)
+
+        if key not in self.pair_addresses:
+            factory_contract = utils.get_starknet_contract(
+                address=await self.get_factory_address(),
+                abi=self.load_abi('Factory'),
+                provider=self.account
+            )
+
+            pair_address = (await factory_contract.functions[self.get_pair_function].call(
+                token0=token0.int_contract_address,
+                token1=token1.int_contract_address
+            )).pair
+
+            if not pair_address:
+                return pair_address
+
+            self.pair_addresses[key] = pair_address
+
+        return self.pair_addresses[key]
+
+    async def fetch_pool(
+        self,
+        first_token: constants.NetworkToken,
+        second_token: constants.NetworkToken,
+        block_number: int
+    ) -> LiquidityPool | None:
+        token0, token1 = sorted([first_token, second_token])
+
+        pair_address = await self.get_pair_address(token0, token1)
+
+        if not pair_address:
+            return None
+
+        pair_contract = utils.get_starknet_contract(
+            address=pair_address,
+            abi=self.load_abi('Pair'),
+            provider=self.account
+        )
+
+        reserves = await pair_contract.functions[self.get_reserves_function].call(block_number=block_number)
+
+        return LiquidityPool(
+            liquidity_token=pair_address,
+            reserves={
+                token0.int_contract_address: reserves.reserve0,
+                token1.int_contract_address: reserves.reserve1
+            },
+            token_addresses=[token0.int_contract_address, token1.int_contract_address]
+        )
+
+    def build_swap_call(
+        self,
+        from_token: constants.NetworkToken,
+        to_token: constants.NetworkToken,
+        amount_in_wei: int,
+        amount_out_min: int,
+        deadline: int | None
+    ) -> Call:
+        return self.router_contract.functions[self.swap_function].prepare(
+            amountIn=amount_in_wei,
+            amountOutMin=amount_out_min,
+            path=[
+                from_token.int_contract_address,
+                to_token.int_contract_address
+            ],
+            deadline=deadline,
+            to=self.account.address
+        )
+
+    def build_add_liquidity_call(
+        self,
+        first_token: constants.NetworkToken,
+        second_token: constants.NetworkToken,
+        first_amount: int,
+        second_amount: int,
+        first_min_amount: int,
+        second_min_amount: int,
+        deadline: int | None
+    ) -> Call:
+        if second_token < first_token:
+            first_token, second_token = second_token, first_token
+            first_amount, second_amount = second_amount, first_amount
+            first_min_amount, second_min_amount = second_min_amount, first_min_amount
+
+        return self.router_contract.functions[self.add_liquidity_function].prepare(
+            tokenA=first_token.int_contract_address,
+            tokenB=second_token.int_contract_address,
+            amountADesired=first_amount,
+            amountBDesired=second_amount,
+            amountAMin=first_min_amount,
+            amountBMin=second_min_amount,
+            to=self.account.address,
+            deadline=deadline
+        )
+
+    def build_remove_liquidity_call(
+        self,
+        pool: LiquidityPool,
+        first_token: constants.NetworkToken,
+        second_token: constants.NetworkToken,
+        liquidity: int,
+        first_min_amount: int,
+        second_min_amount: int,
+        deadline: int | None
+    ) -> Call:
+        if second_token < first_token:
+            first_token, second_token = second_token, first_token
+            first_min_amount, second_min_amount = second_min_amount, first_min_amount
+
+        return self.router_contract.functions[self.remove_liquidity_function].prepare(
+            tokenA=first_token.int_contract_address,
+            tokenB=second_token.int_contract_address,
+            liquidity=liquidity,
+            amountAMin=first_min_amount,
+            amountBMin=second_min_amount,
+            to=self.account.address,
+            deadline=deadline
+        )
+
+
+async def execute(
+    account: Account,
+    network_name: enums.NetworkNames,
+    calls: list[Call],
+    cairo_version: int,
+    logging_prefix: str,
+    nonce: int = None,
+    approvals: list[utils.Approval] = None
+) -> bool:
+    """
+    Sends the calls, prepending the approve calls of the approvals whose
+    allowance is not enough, and waits for the transaction.
+    """
+    network = constants.NETWORKS[network_name]
+
+    approvals = approvals or []
+
+    calls = await utils.get_approve_calls(account, approvals) + calls
+
+    resp = await account.execute(
+        calls,
+        nonce=nonce,
+        cairo_version=cairo_version,
+        auto_estimate=True
+    )
+
+    logging.info(f'[{logging_prefix}] Transaction: {network.txn_explorer_url}{utils.int_hash_to_hex(resp.transaction_hash)}')
+
+    receipt = await utils.wait_for_starknet_receipt(
+        client=account.client,
+        transaction_hash=resp.transaction_hash,
+        logging_prefix=logging_prefix
+    )
+
+    succeeded = receipt.execution_status == TransactionExecutionStatus.SUCCEEDED
+
+    utils.update_allowances(account, approvals, succeeded)
+
+    return succeeded
+
+
+async def swap(
+    adapter_class: type[DexAdapter],
+    private_key: str,
+    address: str,
+    network_name: enums.NetworkNames,
+    from_token_name: enums.TokenNames,
+    to_token_name: enums.TokenNames,
+    slippage: float,
+    cairo_version: int,
+    *,
+    amount: float = None,
+    percentage: float = None,
+    proxy: dict[str, str] = None
+) -> enums.TransactionStatus:
+    if not any([amount, percentage]):
+        raise ValueError('Either amount or percentage must be specified')
+    elif all([amount, percentage]):
+        raise ValueError('Only one of amount or percentage must be specified')
+
+    account = utils.get_account(
+        network_name=network_name,
+        private_key=private_key,
+        address=address,
+        proxy=proxy
+    )
+
+    adapter = adapter_class(account, network_name)
+
+    if not adapter.supports_pair(from_token_name, to_token_name):
+        logging.error(f'[{adapter.name}] Selected incorrect pool: {from_token_name}/{to_token_name}')
+        return enums.TransactionStatus.FAILED
+
+    from_token = constants.NETWORK_TOKENS[network_name, from_token_name]
+    to_token = constants.NETWORK_TOKENS[network_name, to_token_name]
+
+    adapter.prefetch(from_token, to_token)
+
+    swap_inputs = await utils.prepare_swap(
+        account=account,
+        network_name=network_name,
+        token=from_token,
+        get_quote=lambda amount_in_wei: adapter.quote(from_token, to_token, amount_in_wei),
+        amount=amount,
+        percentage=percentage,
+        deadline=adapter.deadline
+    )
+
+    if swap_inputs.quote is None:
+        logging.error(f'[{adapter.name}] Selected incorrect pool: {from_token_name}/{to_token_name}')
+        return enums.TransactionStatus.FAILED
+
+    amount = swap_inputs.amount
+
+    logging.info(f'[{adapter.name}] Swapping {amount} {from_token_name} to {to_token_name}')
+
+    amount_out_min = int(swap_inputs.quote * (1 - slippage / 100))
+
+    approvals = [
+        adapter.build_approval(
+            token_address=from_token.contract_address,
+            amount=swap_inputs.amount_in_wei
+        )
+    ]
+
+    calls = [
+        adapter.build_swap_call(
+            from_token=from_token,
+            to_token=to_token,
+            amount_in_wei=swap_inputs.amount_in_wei,
+            amount_out_min=amount_out_min,
+            deadline=swap_inputs.deadline
+        )
+    ]
+
+    if await execute(account, network_name, calls, cairo_version, adapter.name, nonce=swap_inputs.nonce, approvals=approvals):
+        logging.info(f'[{adapter.name}] Successfully swapped {amount} {from_token_name} to {to_token_name}')
+        return enums.TransactionStatus.SUCCESS
+    else:
+        logging.error(f'[{adapter.name}] Failed to swap {amount} {from_token_name} to {to_token_name}')
+        return enums.TransactionStatus.FAILED
+
+
+async def swap_chain(
+    adapter_class: type[DexAdapter],
+    private_key: str,
+    address: str,
+    network_name: enums.NetworkNames,
+    token_names: list[enums.TokenNames],
+    slippage: float,
+    cairo_version: int,
+    *,
+    amount: float = None,
+    percentage: float = None,
+    proxy: dict[str, str] = None
+) -> enums.TransactionStatus:
+    """
+    Swaps along token_names in a single transaction. Every hop after the first
+    one spends the minimum output of the previous hop, so whatever the previous
+    hop returns above its minimum stays in the intermediate token.
+    """
+    if not any([amount, percentage]):
+        raise ValueError('Either amount or percentage must be specified')
+    elif all([amount, percentage]):
+        raise ValueError('Only one of amount or percentage must be specified')
+
+    account = utils.get_account(
+        network_name=network_name,
+        private_key=private_key,
+        address=address,
+        proxy=proxy
+    )
+
+    adapter = adapter_class(account, network_name)
+
+    hops = list(zip(token_names, token_names[1:]))
+
+    for from_token_name, to_token_name in hops:
+        if not adapter.supports_pair(from_token_name, to_token_name):
+            logging.error(f'[{adapter.name}] Selected incorrect pool: {from_token_name}/{to_token_name}')
+            return enums.TransactionStatus.FAILED
+
+    tokens = [constants.NETWORK_TOKENS[network_name, token_name] for token_name in token_names]
+
+    for from_token, to_token in zip(tokens, tokens[1:]):
+        adapter.prefetch(from_token, to_token)
+
+    (amount_in_wei, amount), deadline, nonce = await asyncio.gather(
+        utils.resolve_token_amount(
+            account=account,
+            token=tokens[0],
+            amount=amount,
+            percentage=percentage
+        ),
+        adapter.get_deadline(),
+        account.get_nonce()
+    )
+
+    route = ' -> '.join(str(token_name) for token_name in token_names)
+
+    logging.info(f'[{adapter.name}] Swapping {amount} {token_names[0]} along {route} in one transaction')
+
+    approved_amounts = {}
+    calls = []
+
+    for from_token, to_token in zip(tokens, tokens[1:]):
+        quote = await adapter.quote(from_token, to_token, amount_in_wei)
+
+        if quote is None:
+            logging.error(f'[{adapter.name}] Selected incorrect pool: {from_token.token}/{to_token.token}')
+            return enums.TransactionStatus.FAILED
+
+        amount_out_min = int(quote * (1 - slippage / 100))
+
+        approved_amounts[from_token.contract_address] = approved_amounts.get(from_token.contract_address, 0) + amount_in_wei
+
+        calls.append(adapter.build_swap_call(
+            from_token=from_token,
+            to_token=to_token,
+            amount_in_wei=amount_in_wei,
+            amount_out_min=amount_out_min,
+            deadline=deadline
+        ))
+
+        amount_in_wei = amount_out_min
+
+    approvals = [
+        adapter.build_approval(
+            token_address=token_address,
+            amount=approved_amount
+        )
+        for token_address, approved_amount in approved_amounts.items()
+    ]
+
+    if await execute(account, network_name, calls, cairo_version, adapter.name, nonce=nonce, approvals=approvals):
+        logging.info(f'[{adapter.name}] Successfully swapped {amount} {token_names[0]} along {route}')
+        return enums.TransactionStatus.SUCCESS
+    else:
+        logging.error(f'[{adapter.name}] Failed to swap {amount} {token_names[0]} along {route}')
+        return enums.TransactionStatus.FAILED
+
+
+async def add_liquidity(
+    adapter_class: type[DexAdapter],
+    private_key: str,
+    address: str,
+    network_name: enums.NetworkNames,
+    first_token_name: enums.TokenNames,
+    second_token_name: enums.TokenNames,
+    slippage: float,
+    cairo_version: int,
+    *,
+    amount: float = None,
+    percentage: float = None,
+    proxy: dict[str, str] = None
+) -> enums.TransactionStatus:
+    if not any([amount, percentage]):
+        raise ValueError('Either amount or percentage must be specified')
+    elif all([amount, percentage]):
+        raise ValueError('Only one of amount or percentage must be specified')
+
+    account = utils.get_account(
+        network_name=network_name,
+        private_key=private_key,
+        address=address,
+        proxy=proxy
+    )
+
+    adapter = adapter_class(account, network_name)
+
+    if not adapter.supports_pair(first_token_name, second_token_name):
+        logging.error(f'[{adapter.name}] Selected incorrect pool: {first_token_name}/{second_token_name}')
+        return enums.TransactionStatus.FAILED
+
+    first_token = constants.NETWORK_TOKENS[network_name, first_token_name]
+    second_token = constants.NETWORK_TOKENS[network_name, second_token_name]
+
+    adapter.prefetch(first_token, second_token)
+
+    (amount_in_wei, amount), second_token_balance = await asyncio.gather(
+        utils.resolve_token_amount(
+            account=account,
+            token=first_token,
+            amount=amount,
+            percentage=percentage
+        ),
+        account.get_balance(second_token.contract_address)
+    )
+
+    logging.info(f'[{adapter.name}] Adding {amount} {first_token_name} to {first_token_name}/{second_token_name} liquidity pool')
+
+    second_token_desired = await adapter.quote(first_token, second_token, amount_in_wei)
+
+    if second_token_desired is None:
+        logging.error(f'[{adapter.name}] Selected incorrect pool: {first_token_name}/{second_token_name}')
+        return enums.TransactionStatus.FAILED
+
+    if second_token_balance < second_token_desired:
+        amount /= 2
+        amount_in_wei //= 2
+
+        logging.info(f'[{adapter.name}] Swapping {amount} {first_token_name} to {second_token_name} to add liquidity')
+
+        swap_result = await swap(
+            adapter_class=adapter_class,
+            private_key=private_key,
+            address=address,
+            network_name=network_name,
+            from_token_name=first_token_name,
+            to_token_name=second_token_name,
+            slippage=slippage,
+            cairo_version=cairo_version,
+            amount=amount,
+            proxy=proxy
+        )
+
+        if swap_result != enums.TransactionStatus.SUCCESS:
+            return swap_result
+
+        await utils.async_random_sleep()
+
+        second_token_desired = await adapter.quote(first_token, second_token, amount_in_wei)
+
+    first_token_desired = amount_in_wei
+
+    second_token_balance, deadline, nonce = await asyncio.gather(
+        account.get_balance(second_token.contract_address),
+        adapter.get_deadline(),
+        account.get_nonce()
+    )
+
+    if second_token_balance < second_token_desired:
+        first_token_desired = first_token_desired * second_token_balance // second_token_desired
+        second_token_desired = second_token_balance
+
+    approvals = [
+        adapter.build_approval(
+            token_address=first_token.contract_address,
+            amount=first_token_desired
+        ),
+        adapter.build_approval(
+            token_address=second_token.contract_address,
+            amount=second_token_desired
+        )
+    ]
+
+    calls = [
+        adapter.build_add_liquidity_call(
+            first_token=first_token,
+            second_token=second_token,
+            first_amount=first_token_desired,
+            second_amount=second_token_desired,
+            first_min_amount=int(first_token_desired * (1 - slippage / 100)),
+            second_min_amount=int(second_token_desired * (1 - slippage / 100)),
+            deadline=deadline
+        )
+    ]
+
+    if await execute(account, network_name, calls, cairo_version, adapter.name, nonce=nonce, approvals=approvals):
+        logging.info(f'[{adapter.name}] Successfully added liquidity to {first_token_name}/{second_token_name} pool')
+        return enums.TransactionStatus.SUCCESS
+    else:
+        logging.error(f'[{adapter.name}] Failed to add liquidity to {first_token_name}/{second_token_name} pool')
+        return enums.TransactionStatus.FAILED
+
+
+async def remove_liquidity(
+    adapter_class: type[DexAdapter],
+    private_key: str,
+    address: str,
+    network_name: enums.NetworkNames,
+    first_token_name: enums.TokenNames,
+    second_token_name: enums.TokenNames,
+    slippage: float,
+    cairo_version: int,
+    percentage: float = 100,
+    proxy: dict[str, str] = None
+) -> enums.TransactionStatus:
+    account = utils.get_account(
+        network_name=network_name,
+        private_key=private_key,
+        address=address,
+        proxy=proxy
+    )
+
+    adapter = adapter_class(account, network_name)
+
+    if not adapter.supports_pair(first_token_name, second_token_name):
+        logging.error(f'[{adapter.name}] Selected incorrect pool: {first_token_name}/{second_token_name}')
+        return enums.TransactionStatus.FAILED
+
+    first_token = constants.NETWORK_TOKENS[network_name, first_token_name]
+    second_token = constants.NETWORK_TOKENS[network_name, second_token_name]
+
+    logging.info(f'[{adapter.name}] Removing {percentage}% of {first_token_name}/{second_token_name} liquidity pool')
+
+    pool = await adapter.get_pool(first_token, second_token)
+
+    if pool is None:
+        logging.error(f'[{adapter.name}] Selected incorrect pool: {first_token_name}/{second_token_name}')
+        return enums.TransactionStatus.FAILED
+
+    liquidity_token_contract = utils.get_starknet_erc20_contract(
+        token_address=pool.liquidity_token,
+        provider=account
+    )
+
+    total_supply, liquidity, deadline, nonce = await asyncio.gather(
+        liquidity_token_contract.functions['totalSupply'].call(),
+        liquidity_token_contract.functions['balanceOf'].call(account.address),
+        adapter.get_deadline(),
+        account.get_nonce()
+    )
+
+    total_supply = total_supply.totalSupply
+    liquidity = liquidity.balance
+
+    if percentage != 100:
+        liquidity = int(liquidity * percentage / 100)
+
+    first_token_desired = liquidity / total_supply * pool.reserves[first_token.int_contract_address]
+    second_token_desired = liquidity / total_supply * pool.reserves[second_token.int_contract_address]
+
+    approvals = [
+        adapter.build_approval(
+            token_address=pool.liquidity_token,
+            amount=liquidity
+        )
+    ]
+
+    calls = [
+        adapter.build_remove_liquidity_call(
+            pool=pool,
+            first_token=first_token,
+            second_token=second_token,
+            liquidity=liquidity,
+            first_min_amount=int(first_token_desired * (1 - slippage / 100)),
+            second_min_amount=int(second_token_desired * (1 - slippage / 100)),
+            deadline=deadline
+        )
+    ]
+
+    if await execute(account, network_name, calls, cairo_version, adapter.name, nonce=nonce, approvals=approvals):
+        logging.info(f'[{adapter.name}] Successfully removed liquidity from {first_token_name}/{second_token_name} pool')
+    else:
+        logging.error(f'[{adapter.name}] Failed to remove liquidity from {first_token_name}/{second_token_name} pool')
+        return enums.TransactionStatus.FAILED
+
+    await utils.async_random_sleep()
+
+    second_token_balance = await account.get_balance(second_token.contract_address)
+
+    swap_amount = min(second_token_desired, second_token_balance)
+
+    if swap_amount == second_token_balance:
+        swap_percentage = 100
+    else:
+        swap_percentage = swap_amount / second_token_balance * 100
+
+    swap_result = await swap(
+        adapter_class=adapter_class,
+        private_key=private_key,
+        address=address,
+        network_name=network_name,
+        from_token_name=second_token_name,
+        to_token_name=first_token_name,
+        slippage=slippage,
+        cairo_version=cairo_version,
+        percentage=swap_percentage,
+        proxy=proxy
+    )
+
+    if swap_result != enums.TransactionStatus.SUCCESS:
+        logging.error(f'[{adapter.name}] Failed to swap {second_token_name} to {first_token_name}. Advise to swap manually')
+
+    return enums.TransactionStatus.SUCCESS
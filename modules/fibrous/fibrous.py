@@ -1,5 +1,3 @@
-import requests
-
 import constants
 import enums
 import utils
@@ -18,6 +16,65 @@ CONTRACT_ADRESSES = {
     }
 }
 
+FIBROUS_API_URL = 'https://api.fibrous.finance'
+
+
+async def get_quote(
+    from_token: constants.NetworkToken,
+    to_token: constants.NetworkToken,
+    amount_in_wei: int,
+    proxy: dict[str, str] = None
+) -> int | None:
+    status, route_json = await utils.http_request(
+        'GET',
+        f'{FIBROUS_API_URL}/route',
+        proxy=proxy,
+        params={
+            'amount': hex(amount_in_wei),
+            'tokenInAddress': from_token.contract_address,
+            'tokenOutAddress': to_token.contract_address
+        }
+    )
+
+    if status != 200 or not route_json or not route_json.get('success'):
+        logging.error(f'[Fibrous] Failed to get route: {status} {route_json}')
+        return None
+
+    return int(str(route_json['outputAmount']), 0)
+
+
+async def build_swap_call(
+    network_name: enums.NetworkNames,
+    from_token: constants.NetworkToken,
+    to_token: constants.NetworkToken,
+    amount_in_wei: int,
+    address: str,
+    slippage: float,
+    proxy: dict[str, str] = None
+) -> Call | None:
+    status, calldata = await utils.http_request(
+        'GET',
+        f'{FIBROUS_API_URL}/execute',
+        proxy=proxy,
+        params={
+            'amount': hex(amount_in_wei),
+            'tokenInAddress': from_token.contract_address,
+            'tokenOutAddress': to_token.contract_address,
+            'slippage': str(slippage / 100),
+            'destination': address
+        }
+    )
+
+    if status != 200 or not calldata:
+        logging.error(f'[Fibrous] Failed to execute: {status} {calldata}')
+        return None
+
+    return Call(
+        to_addr=int(CONTRACT_ADRESSES[ContractTypes.ROUTER][network_name], 16),
+        selector=get_selector_from_name('swap'),
+        calldata=[int(str(value), 0) for value in calldata]
+    )
+
 
 async def swap(
     private_key: str,
@@ -49,57 +106,39 @@ async def swap(
     from_token = constants.NETWORK_TOKENS[network_name, from_token_name]
     to_token = constants.NETWORK_TOKENS[network_name, to_token_name]
 
-    from_token_contract = utils.get_starknet_erc20_contract(
-        token_address=from_token.contract_address,
-        provider=account
+    amount_in_wei, amount = await utils.resolve_token_amount(
+        account=account,
+        token=from_token,
+        amount=amount,
+        percentage=percentage
     )
 
-    amount_in_wei = await account.get_balance(from_token.contract_address)
-
-    if amount is None:
-        if percentage == 100:
-            amount_in_wei = amount_in_wei
-        else:
-            amount_in_wei = int(amount_in_wei * percentage / 100)
-        amount = amount_in_wei / 10 ** from_token.decimals
-    else:
-        amount_in_wei = int(amount * 10 ** from_token.decimals)
-
     logging.info(f'[Fibrous] Swapping {amount} {from_token_name} to {to_token_name}')
 
-    execute_response = requests.get(
-        url='https://api.fibrous.finance/execute',
-        params={
-            'amount': hex(amount_in_wei),
-            'tokenInAddress': from_token.contract_address,
-            'tokenOutAddress': to_token.contract_address,
-            'slippage': '0.01',
-            'destination': address
-        }
+    swap_call = await build_swap_call(
+        network_name=network_name,
+        from_token=from_token,
+        to_token=to_token,
+        amount_in_wei=amount_in_wei,
+        address=address,
+        slippage=slippage,
+        proxy=proxy
     )
 
-    if execute_response.status_code != 200:
-        logging.error(f'[Fibrous] Failed to execute: {execute_response.status_code} {execute_response.reason}')
+    if swap_call is None:
         return enums.TransactionStatus.FAILED
 
-    calldata = execute_response.json()
-
-    router_address = CONTRACT_ADRESSES[ContractTypes.ROUTER][network_name]
-
-    approve_call = from_token_contract.functions['approve'].prepare(
-        spender=int(router_address, 16),
-        amount=amount_in_wei
-    )
-
-    swap_call = Call(
-        to_addr=int(router_address, 16),
-        selector=get_selector_from_name('swap'),
-        calldata=[int(str(value), 0) for value in calldata]
-    )
+    approvals = [
+        utils.Approval(
+            token_address=from_token.contract_address,
+            spender=swap_call.to_addr,
+            amount=amount_in_wei
+        )
+    ]
 
     resp = await account.execute(
         [
-            approve_call,
+            *await utils.get_approve_calls(account, approvals),
             swap_call
         ],
         cairo_version=cairo_version,
@@ -114,7 +153,11 @@ async def swap(
         logging_prefix='Fibrous'
     )
 
-    if receipt.execution_status == TransactionExecutionStatus.SUCCEEDED:
+    succeeded = receipt.execution_status == TransactionExecutionStatus.SUCCEEDED
+
+    utils.update_allowances(account, approvals, succeeded)
+
+    if succeeded:
         logging.info(f'[Fibrous] Successfully swapped {amount} {from_token_name} to {to_token_name}')
         return enums.TransactionStatus.SUCCESS
     else:
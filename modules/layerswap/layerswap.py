@@ -1,9 +1,11 @@
+import asyncio
 import json
 import random
 import time
 from pathlib import Path
 
-import requests
+import aiohttp
+from aiohttp_socks import ProxyConnector
 from starknet_py.net.client_models import TransactionExecutionStatus
 from web3 import Web3
 
@@ -22,6 +24,20 @@ LAYERSWAP_NETWORKS = {
     enums.NetworkNames.ArbitrumTestnet: 'ARBITRUM_GOERLI',
 }
 
+LAYERSWAP_API_URL = 'https://bridge-api.layerswap.io/'
+
+LAYERSWAP_IDENTITY_URL = 'https://identity-api.layerswap.io/connect/token'
+
+LAYERSWAP_REQUEST_TIMEOUT = 30
+
+LAYERSWAP_TOKEN_EXPIRY_MARGIN = 60
+
+LAYERSWAP_MIN_POLL_INTERVAL = 5
+
+LAYERSWAP_MAX_POLL_INTERVAL = 60
+
+LAYERSWAP_PENDING_STATUSES = {'user_transfer_pending', 'ls_transfer_pending'}
+
 
 class ContractTypes(enums.AutoEnum):
     ROUTER = enums.auto()
@@ -35,6 +51,271 @@ CONTRACT_ADRESSES = {
 }
 
 
+class LayerswapClient:
+    """
+    Layerswap API client for one proxy: keeps the access token until it
+    expires, reuses one HTTP session and tracks all pending swaps in a
+    single polling loop.
+    """
+
+    def __init__(self, proxy: dict[str, str] = None):
+        self.proxy_url = None if proxy is None else proxy['http']
+        self.session = None
+        self.session_loop = None
+        self.access_token = None
+        self.access_token_expiry = 0
+        self.access_token_lock = None
+        self.swaps = {}
+        self.track_task = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if (
+            self.session is None
+            or self.session.closed
+            or self.session_loop is not asyncio.get_running_loop()
+        ):
+            connector = None
+            if self.proxy_url and self.proxy_url.startswith('socks5://'):
+                connector = ProxyConnector.from_url(url=self.proxy_url, rdns=True)
+
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=LAYERSWAP_REQUEST_TIMEOUT)
+            )
+            self.session_loop = asyncio.get_running_loop()
+            self.access_token_lock = asyncio.Lock()
+
+        return self.session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        **kwargs
+    ) -> tuple[int, dict | None]:
+        async with self.get_session().request(
+            method,
+            url,
+            proxy=None if self.proxy_url and self.proxy_url.startswith('socks5://') else self.proxy_url,
+            **kwargs
+        ) as response:
+            try:
+                response_json = await response.json(content_type=None)
+            except ValueError:
+                response_json = None
+            return response.status, response_json
+
+    async def get_access_token(self) -> str | bool:
+        self.get_session()
+
+        async with self.access_token_lock:
+            if self.access_token is not None and time.time() < self.access_token_expiry:
+                return self.access_token
+
+            status, connect_json = await self.request(
+                'POST',
+                LAYERSWAP_IDENTITY_URL,
+                data={
+                    'client_id': 'layerswap_bridge_ui',
+                    'grant_type': 'credentialless'
+                }
+            )
+
+            if status != 200:
+                logging.error(f'[Layerswap] Error connecting: {status}')
+                if status == 500:
+                    logging.info('[Layerswap] This is likely because the Layerswap bridge is down for maintenance')
+                return False
+
+            self.access_token = connect_json['access_token']
+            self.access_token_expiry = time.time() + connect_json.get('expires_in', 0) - LAYERSWAP_TOKEN_EXPIRY_MARGIN
+
+        return self.access_token
+
+    async def api_request(
+        self,
+        method: str,
+        path: str,
+        **kwargs
+    ) -> tuple[int, dict | None]:
+        access_token = await self.get_access_token()
+
+        if access_token is False:
+            return 0, None
+
+        return await self.request(
+            method,
+            f'{LAYERSWAP_API_URL}{path}',
+            headers={
+                'Authorization': f'Bearer {access_token}'
+            },
+            **kwargs
+        )
+
+    async def create_swap(self, swap_params: dict) -> str | bool:
+        status, swap_response_json = await self.api_request(
+            'POST',
+            'api/swaps',
+            json=swap_params
+        )
+
+        if status != 200:
+            logging.error(f'[Layerswap] Error creating swap: {status}')
+            if status == 400:
+                logging.info(f'[Layerswap] This error usually means that the swap amount is too small')
+            return False
+
+        if swap_response_json['error']:
+            logging.error(f'[Layerswap] Error creating swap: {swap_response_json["error"]}')
+            return False
+
+        return swap_response_json['data']['swap_id']
+
+    async def get_deposit_address(self, network_name: enums.NetworkNames) -> str | bool:
+        status, deposit_address_response_json = await self.api_request(
+            'POST',
+            f'api/deposit_addresses/{LAYERSWAP_NETWORKS[network_name]}'
+        )
+
+        if status != 200:
+            logging.error(f'[Layerswap] Error getting deposit address: {status}')
+            return False
+
+        return deposit_address_response_json['data']['address']
+
+    async def get_managed_deposit_address(
+        self,
+        swap_id: str,
+        network_name: enums.NetworkNames
+    ) -> str | bool:
+        status, swap_data_json = await self.request(
+            'GET',
+            f'https://www.layerswap.io/app/_next/data/i4WW7fZZ3mOPR-Fb0-34i/en/swap/{swap_id}.json',
+            params={
+                'swapId': swap_id
+            }
+        )
+
+        if status != 200:
+            logging.error(f'[Layerswap] Error getting swap data: {status}')
+            return False
+
+        for layerswap_network in swap_data_json['pageProps']['settings']['networks']:
+            if layerswap_network['internal_name'] == LAYERSWAP_NETWORKS[network_name]:
+                return random.choice(layerswap_network['managed_accounts'])['address']
+
+        logging.error(f'[Layerswap] Error getting deposit address: {swap_data_json}')
+        return False
+
+    async def get_swap(self, swap_id: str) -> dict | bool:
+        status, swap_json = await self.api_request(
+            'GET',
+            f'api/swaps/{swap_id}'
+        )
+
+        if status != 200:
+            logging.error(f'[Layerswap] Error getting swap info: {status}')
+            return False
+
+        return swap_json['data']
+
+    async def track(self):
+        poll_interval = LAYERSWAP_MIN_POLL_INTERVAL
+        statuses = {}
+
+        while True:
+            await asyncio.sleep(poll_interval)
+
+            swap_ids = [swap_id for swap_id, future in self.swaps.items() if not future.done()]
+
+            if not swap_ids:
+                break
+
+            swaps = await asyncio.gather(
+                *[self.get_swap(swap_id) for swap_id in swap_ids],
+                return_exceptions=True
+            )
+
+            changed = False
+
+            for swap_id, swap in zip(swap_ids, swaps):
+                if isinstance(swap, BaseException):
+                    logging.warning(f'[Layerswap] Error while waiting: {swap}')
+                    continue
+                if swap is False:
+                    continue
+
+                if statuses.get(swap_id) != swap['status']:
+                    statuses[swap_id] = swap['status']
+                    changed = True
+
+                future = self.swaps.get(swap_id)
+                if swap['status'] not in LAYERSWAP_PENDING_STATUSES and future is not None and not future.done():
+                    future.set_result(swap)
+
+            if changed:
+                poll_interval = LAYERSWAP_MIN_POLL_INTERVAL
+            else:
+                poll_interval = min(poll_interval * 2, LAYERSWAP_MAX_POLL_INTERVAL)
+
+    async def wait_for_swap(
+        self,
+        swap_id: str,
+        timeout: float = None
+    ) -> dict | None:
+        self.swaps[swap_id] = asyncio.get_running_loop().create_future()
+
+        if (
+            self.track_task is None
+            or self.track_task.done()
+            or self.track_task.get_loop() is not asyncio.get_running_loop()
+        ):
+            self.track_task = asyncio.create_task(self.track())
+
+        try:
+            return await asyncio.wait_for(self.swaps[swap_id], timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            del self.swaps[swap_id]
+
+
+def get_layerswap_client(proxy: dict[str, str] = None) -> LayerswapClient:
+    clients = getattr(get_layerswap_client, 'clients', {})
+
+    key = None if proxy is None else proxy['http']
+
+    if key not in clients:
+        clients[key] = LayerswapClient(proxy)
+        get_layerswap_client.clients = clients
+
+    return clients[key]
+
+
+async def wait_for_swap(
+    client: LayerswapClient,
+    swap_id: str,
+    to_network_name: enums.NetworkNames
+) -> enums.TransactionStatus:
+    logging.info(f'[Layerswap] Waiting for {to_network_name} transaction to be completed')
+
+    swap = await client.wait_for_swap(swap_id, timeout=utils.ARRIVAL_TIMEOUT)
+
+    if swap is None:
+        logging.warning(f'[Layerswap] Swap was not completed in {utils.ARRIVAL_TIMEOUT // 60} minutes, skipping waiting')
+        return enums.TransactionStatus.SUCCESS
+
+    if swap['status'] != 'completed':
+        logging.error(f'[Layerswap] Swap failed: {swap["status"]}. Full data: {swap}')
+        return enums.TransactionStatus.FAILED
+
+    for transaction in swap['transactions']:
+        if transaction['type'] == 'output':
+            logging.info(f'[Layerswap] {to_network_name} transaction: {transaction["explorer_url"]}')
+
+    return enums.TransactionStatus.SUCCESS
+
+
 async def deposit_to_starknet(
     private_key: str,
     from_network_name: enums.NetworkNames,
@@ -55,18 +336,14 @@ async def deposit_to_starknet(
     from_network = constants.NETWORKS[from_network_name]
     to_network = constants.NETWORKS[to_network_name]
 
-    web3 = Web3(
-        Web3.HTTPProvider(
-            from_network.rpc_url,
-            request_kwargs={
-                'proxies': proxy
-            }
-        )
+    web3 = utils.get_async_web3(
+        network_name=from_network_name,
+        proxy=proxy
     )
 
     evm_account = web3.eth.account.from_key(private_key)
 
-    balance_in_wei = web3.eth.get_balance(evm_account.address)
+    balance_in_wei = await web3.eth.get_balance(evm_account.address)
 
     if amount is None:
         if percentage == 100:
@@ -83,28 +360,10 @@ async def deposit_to_starknet(
         logging.error(f'[Layerswap] Selected incorrect source network: {from_network_name}')
         return enums.TransactionStatus.FAILED
 
-    connect_response = requests.post(
-        url='https://identity-api.layerswap.io/connect/token',
-        data={
-            'client_id': 'layerswap_bridge_ui',
-            'grant_type': 'credentialless'
-        },
-        proxies=proxy
-    )
-
-    if connect_response.status_code != 200:
-        logging.error(f'[Layerswap] Error connecting: {connect_response.status_code}')
-        if connect_response.status_code == 500:
-            logging.info('[Layerswap] This is likely because the Layerswap bridge is down for maintenance')
-        return enums.TransactionStatus.FAILED
-
-    connect_json = connect_response.json()
-
-    access_token = connect_json['access_token']
+    client = get_layerswap_client(proxy)
 
-    swap_response = requests.post(
-        url='https://bridge-api.layerswap.io//api/swaps',
-        data=json.dumps({
+    swap_id, deposit_address = await asyncio.gather(
+        client.create_swap({
             'amount': amount,
             'destination': LAYERSWAP_NETWORKS[to_network_name],
             'destination_address': to_address,
@@ -114,54 +373,18 @@ async def deposit_to_starknet(
             'source_address': evm_account.address,
             'source_asset': 'ETH'
         }),
-        headers={
-            'Authorization': f'Bearer {access_token}',
-            'Content-Type': 'application/json'
-        },
-        proxies=proxy
+        client.get_deposit_address(from_network_name)
     )
 
-    if swap_response.status_code != 200:
-        logging.error(f'[Layerswap] Error creating swap: {swap_response.status_code}')
-        if swap_response.status_code == 400:
-            logging.info(f'[Layerswap] This error usually means that the swap amount is too small')
-        return enums.TransactionStatus.FAILED
-
-    swap_response_json = swap_response.json()
-
-    if swap_response_json['error']:
-        logging.error(f'[Layerswap] Error creating swap: {swap_response_json["error"]}')
+    if swap_id is False or deposit_address is False:
         return enums.TransactionStatus.FAILED
 
-    swap_id = swap_response_json['data']['swap_id']
+    swap = await client.get_swap(swap_id)
 
-    deposit_address_response = requests.post(
-        f'https://bridge-api.layerswap.io//api/deposit_addresses/{LAYERSWAP_NETWORKS[from_network_name]}',
-        headers={
-            'Authorization': f'Bearer {access_token}'
-        },
-        proxies=proxy
-    )
-
-    if deposit_address_response.status_code != 200:
-        logging.error(f'[Layerswap] Error getting deposit address: {deposit_address_response.status_code}')
+    if swap is False:
         return enums.TransactionStatus.FAILED
 
-    deposit_address_response_json = deposit_address_response.json()
-
-    deposit_address = deposit_address_response_json['data']['address']
-
-    swap_info_response = requests.get(
-        f'https://bridge-api.layerswap.io//api/swaps/{swap_id}',
-        headers={
-            'Authorization': f'Bearer {access_token}'
-        },
-        proxies=proxy
-    )
-
-    swap_json = swap_info_response.json()
-
-    gas_price = utils.suggest_gas_fees(
+    gas_price = await utils.suggest_gas_fees(
         network_name=from_network_name,
         proxy=None
     )
@@ -170,18 +393,18 @@ async def deposit_to_starknet(
         return enums.TransactionStatus.FAILED
 
     txn = {
-        'chainId': web3.eth.chain_id,
-        'nonce': web3.eth.get_transaction_count(evm_account.address),
+        'chainId': await web3.eth.chain_id,
+        'nonce': await web3.eth.get_transaction_count(evm_account.address),
         'from': evm_account.address,
         'to': Web3.to_checksum_address(deposit_address),
         'gas': 0,
         **gas_price,
         'value': 1,
-        'data': hex(swap_json['data']['sequence_number'])
+        'data': hex(swap['sequence_number'])
     }
 
     try:
-        txn['gas'] = web3.eth.estimate_gas(txn)
+        txn['gas'] = await web3.eth.estimate_gas(txn)
     except Exception as e:
         if 'insufficient funds for transfer' in str(e):
             logging.critical(f'[Layerswap] Insufficient balance to bridge {amount} ETH')
@@ -206,7 +429,7 @@ async def deposit_to_starknet(
     txn['value'] = amount_in_wei
 
     try:
-        txn['gas'] = web3.eth.estimate_gas(txn)
+        txn['gas'] = await web3.eth.estimate_gas(txn)
     except Exception as e:
         if 'insufficient funds for transfer' in str(e):
             logging.critical(f'[Layerswap] Insufficient balance to bridge {amount} ETH')
@@ -216,11 +439,11 @@ async def deposit_to_starknet(
 
     signed_txn = evm_account.sign_transaction(txn)
 
-    txn_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+    txn_hash = await web3.eth.send_raw_transaction(signed_txn.rawTransaction)
 
     logging.info(f'[Layerswap] Transaction: {from_network.txn_explorer_url}{txn_hash.hex()}')
 
-    receipt = utils.wait_for_transaction_receipt(
+    receipt = await utils.wait_for_transaction_receipt(
         web3=web3.eth,
         txn_hash=txn_hash,
         logging_prefix='Layerswap'
@@ -233,35 +456,11 @@ async def deposit_to_starknet(
         return enums.TransactionStatus.FAILED
 
     if wait_for_receive:
-        logging.info(f'[Layerswap] Waiting for {to_network_name} transaction to be completed. If you want to skip this, press Ctrl+C')
-        while True:
-            try:
-                swap_info_response = requests.get(
-                    f'https://bridge-api.layerswap.io//api/swaps/{swap_id}',
-                    headers={
-                        'Authorization': f'Bearer {access_token}'
-                    },
-                    proxies=proxy
-                )
-
-                swap_json = swap_info_response.json()
-
-                status = swap_json['data']['status']
-
-                if status not in {'user_transfer_pending', 'ls_transfer_pending', 'completed'}:
-                    logging.error(f'[Layerswap] Swap failed: {status}. Full data: {swap_json}')
-                    return enums.TransactionStatus.FAILED
-                elif status == 'completed':
-                    for transaction in swap_json['data']['transactions']:
-                        if transaction['type'] == 'output':
-                            logging.info(f'[Layerswap] {to_network_name} transaction: {transaction["explorer_url"]}')
-                    break
-            except KeyboardInterrupt:
-                logging.info(f'[Layerswap] Skipping waiting for {to_network_name} transaction')
-                break
-            except BaseException as e:
-                logging.warning(f'[Layerswap] Error while waiting: {e}')
-            time.sleep(10)
+        return await wait_for_swap(
+            client=client,
+            swap_id=swap_id,
+            to_network_name=to_network_name
+        )
 
     return enums.TransactionStatus.SUCCESS
 
@@ -313,92 +512,30 @@ async def withdraw_from_starknet(
         logging.error(f'[Layerswap] Selected incorrect source network: {from_network_name}')
         return enums.TransactionStatus.FAILED
 
-    connect_response = requests.post(
-        url='https://identity-api.layerswap.io/connect/token',
-        data={
-            'client_id': 'layerswap_bridge_ui',
-            'grant_type': 'credentialless'
-        },
-        proxies=proxy
-    )
-
-    if connect_response.status_code != 200:
-        logging.error(f'[Layerswap] Error connecting: {connect_response.status_code}')
-        if connect_response.status_code == 500:
-            logging.info('[Layerswap] This is likely because the Layerswap bridge is down for maintenance')
-        return enums.TransactionStatus.FAILED
-
-    connect_json = connect_response.json()
-
-    access_token = connect_json['access_token']
-
-    swap_response = requests.post(
-        url='https://bridge-api.layerswap.io//api/swaps',
-        data=json.dumps({
-            'amount': amount,
-            'destination': LAYERSWAP_NETWORKS[to_network_name],
-            'destination_address': Web3.to_checksum_address(to_address),
-            'destination_asset': 'ETH',
-            'refuel': False,
-            'source': LAYERSWAP_NETWORKS[from_network_name],
-            'source_address': to_address,
-            'source_asset': 'ETH'
-        }),
-        headers={
-            'Authorization': f'Bearer {access_token}',
-            'Content-Type': 'application/json'
-        },
-        proxies=proxy
-    )
-
-    if swap_response.status_code != 200:
-        logging.error(f'[Layerswap] Error creating swap: {swap_response.status_code}')
-        if swap_response.status_code == 400:
-            logging.info(f'[Layerswap] This error usually means that the swap amount is too small')
-        return enums.TransactionStatus.FAILED
-
-    swap_response_json = swap_response.json()
+    client = get_layerswap_client(proxy)
 
-    if swap_response_json['error']:
-        logging.error(f'[Layerswap] Error creating swap: {swap_response_json["error"]}')
-        return enums.TransactionStatus.FAILED
-
-    swap_id = swap_response_json['data']['swap_id']
-
-    swap_data_response = requests.get(
-        url=f'https://www.layerswap.io/app/_next/data/i4WW7fZZ3mOPR-Fb0-34i/en/swap/{swap_id}.json?swapId={swap_id}'
-    )
-
-    if swap_data_response.status_code != 200:
-        logging.error(f'[Layerswap] Error getting swap data: {swap_data_response.status_code}')
-        return enums.TransactionStatus.FAILED
-
-    deposit_address_response_json = swap_data_response.json()
+    swap_id = await client.create_swap({
+        'amount': amount,
+        'destination': LAYERSWAP_NETWORKS[to_network_name],
+        'destination_address': Web3.to_checksum_address(to_address),
+        'destination_asset': 'ETH',
+        'refuel': False,
+        'source': LAYERSWAP_NETWORKS[from_network_name],
+        'source_address': to_address,
+        'source_asset': 'ETH'
+    })
 
-    layerswap_networks = deposit_address_response_json['pageProps']['settings']['networks']
-
-    for layerswap_network in layerswap_networks:
-        if layerswap_network['internal_name'] == LAYERSWAP_NETWORKS[from_network_name]:
-            deposit_address = random.choice(layerswap_network['managed_accounts'])['address']
-            break
-    else:
-        logging.error(f'[Layerswap] Error getting deposit address: {deposit_address_response_json}')
+    if swap_id is False:
         return enums.TransactionStatus.FAILED
 
-    swap_info_response = requests.get(
-        f'https://bridge-api.layerswap.io//api/swaps/{swap_id}',
-        headers={
-            'Authorization': f'Bearer {access_token}'
-        },
-        proxies=proxy
+    deposit_address, swap = await asyncio.gather(
+        client.get_managed_deposit_address(swap_id, from_network_name),
+        client.get_swap(swap_id)
     )
 
-    if swap_info_response.status_code != 200:
-        logging.error(f'[Layerswap] Error getting swap info: {swap_info_response.status_code}')
+    if deposit_address is False or swap is False:
         return enums.TransactionStatus.FAILED
 
-    swap_json = swap_info_response.json()
-
     token_contract = utils.get_starknet_erc20_contract(
         token_address=transfer_token.contract_address,
         provider=account
@@ -419,7 +556,7 @@ async def withdraw_from_starknet(
     )
 
     watch_call = router_contract.functions['watch'].prepare(
-        _Id=swap_json['data']['sequence_number']
+        _Id=swap['sequence_number']
     )
 
     try:
@@ -477,34 +614,10 @@ async def withdraw_from_starknet(
         return enums.TransactionStatus.FAILED
 
     if wait_for_receive:
-        logging.info(f'[Layerswap] Waiting for {to_network_name} transaction to be completed. If you want to skip this, press Ctrl+C')
-        while True:
-            try:
-                swap_info_response = requests.get(
-                    f'https://bridge-api.layerswap.io//api/swaps/{swap_id}',
-                    headers={
-                        'Authorization': f'Bearer {access_token}'
-                    },
-                    proxies=proxy
-                )
-
-                swap_json = swap_info_response.json()
-
-                status = swap_json['data']['status']
-
-                if status not in {'user_transfer_pending', 'ls_transfer_pending', 'completed'}:
-                    logging.error(f'[Layerswap] Swap failed: {status}. Full data: {swap_json}')
-                    return enums.TransactionStatus.FAILED
-                elif status == 'completed':
-                    for transaction in swap_json['data']['transactions']:
-                        if transaction['type'] == 'output':
-                            logging.info(f'[Layerswap] {to_network_name} transaction: {transaction["explorer_url"]}')
-                    break
-            except KeyboardInterrupt:
-                logging.info(f'[Layerswap] Skipping waiting for {to_network_name} transaction')
-                break
-            except BaseException as e:
-                logging.warning(f'[Layerswap] Error while waiting: {e}')
-            time.sleep(10)
+        return await wait_for_swap(
+            client=client,
+            swap_id=swap_id,
+            to_network_name=to_network_name
+        )
 
     return enums.TransactionStatus.SUCCESS
@@ -1,9 +1,11 @@
+import asyncio
 import time
+from collections import deque
+from dataclasses import dataclass
 
 from okx.Funding import FundingAPI
 from okx.SubAccount import SubAccountAPI
 from starknet_py.net.client_models import TransactionExecutionStatus
-from web3 import Web3
 
 import constants
 import enums
@@ -31,6 +33,38 @@ class OKXTransactionStatus(enums.Enum):
     WAITING_MANUAL_REVIEW_12 = 12
 
 
+OKX_SUBACCOUNTS_PAGE_SIZE = 100
+
+OKX_HISTORY_PAGE_SIZE = 100
+
+OKX_HISTORY_POLL_INTERVAL = 10
+
+OKX_CURRENCIES_TTL = 10 * 60
+
+# https://www.okx.com/docs-v5/en/#funding-account-rest-api and
+# https://www.okx.com/docs-v5/en/#sub-account-rest-api, (requests, seconds)
+OKX_RATE_LIMITS = {
+    'subaccounts': (2, 2),
+    'subaccount_balances': (6, 2),
+    'balances': (6, 1),
+    'currencies': (6, 1),
+    'withdrawal': (6, 1),
+    'withdrawal_history': (6, 1)
+}
+
+# Funds transfer is limited per currency
+OKX_TRANSFER_RATE_LIMIT = (1, 1)
+
+# Currencies that can be transferred from subaccounts, the token list keywords
+# Random, Last and All are not OKX currencies
+OKX_TRANSFER_TOKENS = frozenset({
+    enums.TokenNames.ETH,
+    enums.TokenNames.DAI,
+    enums.TokenNames.USDC,
+    enums.TokenNames.USDT,
+    enums.TokenNames.WBTC
+})
+
 OKX_NETWORKS = {
     enums.NetworkNames.ETH: 'ERC20',
     enums.NetworkNames.Starknet: 'StarkNet',
@@ -38,68 +72,312 @@ OKX_NETWORKS = {
     enums.NetworkNames.Optimism: 'Optimism'
 }
 
+OKX_FINAL_STATES = {
+    OKXTransactionStatus.WITHDRAW_SUCCESS,
+    OKXTransactionStatus.FAILED,
+    OKXTransactionStatus.CANCELING,
+    OKXTransactionStatus.CANCELED
+}
 
-def withdraw_from_okx(
-    to_address: str,
-    network_name: enums.NetworkNames,
-    api_key: str,
-    api_secret_key: str,
-    passphrase: str,
-    *,
-    amount: float = None,
-    percentage: float = None,
-    wait_for_receive: bool = True
-) -> enums.TransactionStatus:
-    if not any([amount, percentage]):
-        raise ValueError('Either amount or percentage must be specified')
-    elif all([amount, percentage]):
-        raise ValueError('Only one of amount or percentage must be specified')
 
-    client = FundingAPI(
-        api_key=api_key,
-        api_secret_key=api_secret_key,
-        passphrase=passphrase,
-        flag='0'
-    )
+class RateLimiter:
+    """
+    Lets through at most max_calls calls in any period seconds.
+    """
 
-    with utils.suppress_print():
-        eth_balance = client.get_balances('ETH')
+    def __init__(
+        self,
+        max_calls: int,
+        period: float
+    ):
+        self.max_calls = max_calls
+        self.period = period
+        self.calls = deque()
+        self.lock = asyncio.Lock()
 
-    if eth_balance['code'] != '0':
-        logging.error(f'[OKX Withdraw] Failed to get ETH balance: {eth_balance["msg"]}')
-        return enums.TransactionStatus.FAILED
+    async def acquire(self):
+        async with self.lock:
+            while self.calls and time.monotonic() - self.calls[0] >= self.period:
+                self.calls.popleft()
 
-    balance = float(eth_balance['data'][0]['availBal'])
+            if len(self.calls) >= self.max_calls:
+                await asyncio.sleep(self.period - (time.monotonic() - self.calls.popleft()))
 
-    if amount is None:
-        if percentage == 100:
-            amount = balance
-        else:
-            amount = float(balance) * percentage / 100
+            self.calls.append(time.monotonic())
 
-    logging.info(f'[OKX Withdraw] Withdrawing {amount} ETH to {to_address}')
 
-    with utils.suppress_print():
-        eth_currencies = client.get_currencies('ETH')
+async def call_okx(
+    rate_limiter: RateLimiter,
+    function,
+    **kwargs
+) -> dict:
+    await rate_limiter.acquire()
+    return await asyncio.to_thread(function, **kwargs)
 
-    if eth_currencies['code'] != '0':
-        logging.error(f'[OKX Withdraw] Failed to get ETH currencies: {eth_currencies["msg"]}')
-        return enums.TransactionStatus.FAILED
 
-    try:
-        okx_network_name = OKX_NETWORKS[network_name]
-    except KeyError:
-        logging.error(f'[OKX Withdraw] Unsupported network: {network_name}')
-        return enums.TransactionStatus.FAILED
+@dataclass
+class WithdrawalTarget:
+    to_address: str
+    network_name: enums.NetworkNames
+    amount: float = None
+    percentage: float = None
 
-    for currency in eth_currencies['data']:
-        if currency['chain'].lower() == f'ETH-{okx_network_name}'.lower():
-            eth_currency = currency
-            break
-    else:
-        logging.error(f'[OKX Withdraw] Failed to get ETH info from currencies: {eth_currencies["msg"]}')
-        return enums.TransactionStatus.FAILED
 
+class WithdrawalDispatcher:
+    """
+    Submits ETH withdrawals for one OKX account and tracks all of them
+    with a single periodic withdrawal history query.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret_key: str,
+        passphrase: str
+    ):
+        # The SDK client is called from worker threads, so debug output is
+        # disabled instead of redirecting stdout with suppress_print
+        self.client = FundingAPI(
+            api_key=api_key,
+            api_secret_key=api_secret_key,
+            passphrase=passphrase,
+            flag='0',
+            debug=False
+        )
+        self.rate_limiters = {
+            name: RateLimiter(*rate_limit)
+            for name, rate_limit in OKX_RATE_LIMITS.items()
+        }
+        self.currencies = {}
+        self.currencies_update = 0
+        self.currencies_lock = asyncio.Lock()
+        self.balance_lock = asyncio.Lock()
+        self.reserved = 0
+        self.withdrawals = {}
+        self.track_task = None
+
+    async def get_balance(self) -> float | bool:
+        balances_response = await call_okx(
+            self.rate_limiters['balances'],
+            self.client.get_balances,
+            ccy='ETH'
+        )
+
+        if balances_response['code'] != '0':
+            logging.error(f'[OKX Withdraw] Failed to get ETH balance: {balances_response["msg"]}')
+            return False
+
+        return float(balances_response['data'][0]['availBal'])
+
+    async def get_currency(self, network_name: enums.NetworkNames) -> dict | bool:
+        if network_name not in OKX_NETWORKS:
+            logging.error(f'[OKX Withdraw] Unsupported network: {network_name}')
+            return False
+
+        async with self.currencies_lock:
+            if time.time() - self.currencies_update > OKX_CURRENCIES_TTL:
+                currencies_response = await call_okx(
+                    self.rate_limiters['currencies'],
+                    self.client.get_currencies,
+                    ccy='ETH'
+                )
+
+                if currencies_response['code'] != '0':
+                    logging.error(f'[OKX Withdraw] Failed to get ETH currencies: {currencies_response["msg"]}')
+                    return False
+
+                self.currencies = {
+                    currency['chain'].lower(): currency
+                    for currency in currencies_response['data']
+                }
+                self.currencies_update = time.time()
+
+        eth_currency = self.currencies.get(f'ETH-{OKX_NETWORKS[network_name]}'.lower())
+
+        if eth_currency is None:
+            logging.error(f'[OKX Withdraw] Failed to get ETH info for {network_name} from currencies')
+            return False
+
+        return eth_currency
+
+    async def reserve(
+        self,
+        eth_currency: dict,
+        amount: float = None,
+        percentage: float = None
+    ) -> tuple[float, float] | enums.TransactionStatus:
+        """
+        Picks the withdrawal amount from the balance that is not reserved yet
+        and reserves it with the fee until release is called, so concurrent
+        withdrawals never spend the same balance.
+        """
+        async with self.balance_lock:
+            balance = await self.get_balance()
+
+            if balance is False:
+                return enums.TransactionStatus.FAILED
+
+            available = max(balance - self.reserved, 0)
+
+            if amount is None:
+                if percentage == 100:
+                    amount = available
+                else:
+                    amount = available * percentage / 100
+
+            withdrawal_amount = get_withdrawal_amount(
+                amount=amount,
+                balance=available,
+                eth_currency=eth_currency,
+                fit_to_balance=percentage is not None
+            )
+
+            if not isinstance(withdrawal_amount, enums.TransactionStatus):
+                self.reserved += sum(withdrawal_amount)
+
+            return withdrawal_amount
+
+    def release(self, amount: float):
+        self.reserved = max(self.reserved - amount, 0)
+
+    async def submit(
+        self,
+        to_address: str,
+        amount: float,
+        fee: float,
+        eth_currency: dict
+    ) -> str | enums.TransactionStatus:
+        withdrawal_data = await call_okx(
+            self.rate_limiters['withdrawal'],
+            self.client.withdrawal,
+            ccy='ETH',
+            amt=str(amount),
+            dest='4',
+            toAddr=to_address,
+            fee=str(fee),
+            chain=eth_currency['chain']
+        )
+
+        if withdrawal_data['code'] != '0':
+            if 'Withdrawal address is not allowlisted' in withdrawal_data['msg']:
+                logging.critical(f'[OKX Withdraw] Withdrawal address is not allowlisted. Please add {to_address} to allowlist')
+                return enums.TransactionStatus.ADDRESS_NOT_ALLOWLISTED
+            logging.error(f'[OKX Withdraw] Failed to withdraw ETH: {withdrawal_data["msg"]}')
+            return enums.TransactionStatus.FAILED
+
+        withdrawal_id = withdrawal_data['data'][0]['wdId']
+
+        self.withdrawals[withdrawal_id] = asyncio.get_running_loop().create_future()
+
+        if (
+            self.track_task is None
+            or self.track_task.done()
+            or self.track_task.get_loop() is not asyncio.get_running_loop()
+        ):
+            self.track_task = asyncio.create_task(self.track())
+
+        return withdrawal_id
+
+    async def fetch_states(self, withdrawal_ids: set[str]) -> dict[str, OKXTransactionStatus]:
+        states = {}
+        found_ids = set()
+        after = ''
+
+        for _ in range(len(withdrawal_ids) // OKX_HISTORY_PAGE_SIZE + 1):
+            history = await call_okx(
+                self.rate_limiters['withdrawal_history'],
+                self.client.get_withdrawal_history,
+                ccy='ETH',
+                after=after,
+                limit=str(OKX_HISTORY_PAGE_SIZE)
+            )
+
+            if history['code'] != '0':
+                logging.warning(f'[OKX Withdraw] Failed to get withdrawal history: {history["msg"]}')
+                break
+
+            for withdrawal in history['data']:
+                if withdrawal['wdId'] not in withdrawal_ids:
+                    continue
+
+                found_ids.add(withdrawal['wdId'])
+
+                try:
+                    states[withdrawal['wdId']] = OKXTransactionStatus(int(withdrawal['state']))
+                except ValueError:
+                    logging.warning(f'[OKX Withdraw] Unknown state {withdrawal["state"]} of withdrawal {withdrawal["wdId"]}')
+
+            if len(history['data']) < OKX_HISTORY_PAGE_SIZE or withdrawal_ids <= found_ids:
+                break
+
+            after = history['data'][-1]['ts']
+
+        return states
+
+    async def track(self):
+        while True:
+            await asyncio.sleep(OKX_HISTORY_POLL_INTERVAL)
+
+            withdrawal_ids = {
+                withdrawal_id
+                for withdrawal_id, future in self.withdrawals.items()
+                if not future.done()
+            }
+
+            if not withdrawal_ids:
+                break
+
+            try:
+                states = await self.fetch_states(withdrawal_ids)
+            except Exception as e:
+                logging.warning(f'[OKX Withdraw] Exception occurred while tracking withdrawals: {e}')
+                continue
+
+            for withdrawal_id, state in states.items():
+                future = self.withdrawals.get(withdrawal_id)
+                if future is not None and not future.done() and state in OKX_FINAL_STATES:
+                    future.set_result(state)
+                    # Waiters already hold the future, withdrawals nobody waits
+                    # for must not stay in the dict for the whole session
+                    del self.withdrawals[withdrawal_id]
+
+    async def wait(
+        self,
+        withdrawal_id: str,
+        timeout: float = None
+    ) -> OKXTransactionStatus | None:
+        try:
+            return await asyncio.wait_for(self.withdrawals[withdrawal_id], timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self.withdrawals.pop(withdrawal_id, None)
+
+
+def get_withdrawal_dispatcher(
+    api_key: str,
+    api_secret_key: str,
+    passphrase: str
+) -> WithdrawalDispatcher:
+    dispatchers = getattr(get_withdrawal_dispatcher, 'dispatchers', {})
+
+    if api_key not in dispatchers:
+        dispatchers[api_key] = WithdrawalDispatcher(
+            api_key=api_key,
+            api_secret_key=api_secret_key,
+            passphrase=passphrase
+        )
+        get_withdrawal_dispatcher.dispatchers = dispatchers
+
+    return dispatchers[api_key]
+
+
+def get_withdrawal_amount(
+    amount: float,
+    balance: float,
+    eth_currency: dict,
+    fit_to_balance: bool
+) -> tuple[float, float] | enums.TransactionStatus:
     min_amount = float(eth_currency['minWd'])
 
     fee = float(eth_currency['minFee'])
@@ -108,7 +386,7 @@ def withdraw_from_okx(
         amount -= fee
 
     if balance < amount + fee:
-        if percentage is None:
+        if not fit_to_balance:
             logging.critical(f'[OKX Withdraw] Insufficient balance to withdraw {amount} ETH')
             return enums.TransactionStatus.INSUFFICIENT_BALANCE
         else:
@@ -121,61 +399,145 @@ def withdraw_from_okx(
         logging.error(f'[OKX Withdraw] Amount {amount} is less than minimum withdrawal amount {min_amount}')
         return enums.TransactionStatus.FAILED
 
-    with utils.suppress_print():
-        withdrawal_data = client.withdrawal(
-            ccy='ETH',
-            amt=str(amount),
-            dest='4',
-            toAddr=to_address,
-            fee=str(fee),
-            chain=eth_currency['chain']
-        )
+    return amount, fee
+
 
-    if withdrawal_data['code'] != '0':
-        if 'Withdrawal address is not allowlisted' in withdrawal_data['msg']:
-            logging.critical(f'[OKX Withdraw] Withdrawal address is not allowlisted. Please add {to_address} to allowlist')
-            return enums.TransactionStatus.ADDRESS_NOT_ALLOWLISTED
-        logging.error(f'[OKX Withdraw] Failed to withdraw ETH: {withdrawal_data["msg"]}')
+async def wait_for_withdrawal(
+    dispatcher: WithdrawalDispatcher,
+    withdrawal_id: str,
+    network_name: enums.NetworkNames
+) -> enums.TransactionStatus:
+    logging.info(f'[OKX Withdraw] Waiting for withdrawal {withdrawal_id} to be received')
+
+    state = await dispatcher.wait(withdrawal_id, timeout=utils.ARRIVAL_TIMEOUT)
+
+    if state is None:
+        logging.warning(f'[OKX Withdraw] Withdrawal {withdrawal_id} was not completed in {utils.ARRIVAL_TIMEOUT // 60} minutes, skipping waiting')
+    elif state in {OKXTransactionStatus.CANCELING, OKXTransactionStatus.CANCELED}:
+        logging.error(f'[OKX Withdraw] Withdrawal {withdrawal_id} canceled by user')
+        return enums.TransactionStatus.FAILED
+    elif state == OKXTransactionStatus.FAILED:
+        logging.error(f'[OKX Withdraw] Withdrawal {withdrawal_id} failed')
+        return enums.TransactionStatus.FAILED
+    else:
+        logging.info(f'[OKX Withdraw] Successfully received funds on {network_name}')
+
+    return enums.TransactionStatus.SUCCESS
+
+
+async def withdraw_from_okx(
+    to_address: str,
+    network_name: enums.NetworkNames,
+    api_key: str,
+    api_secret_key: str,
+    passphrase: str,
+    *,
+    amount: float = None,
+    percentage: float = None,
+    wait_for_receive: bool = True
+) -> enums.TransactionStatus:
+    if not any([amount, percentage]):
+        raise ValueError('Either amount or percentage must be specified')
+    elif all([amount, percentage]):
+        raise ValueError('Only one of amount or percentage must be specified')
+
+    dispatcher = get_withdrawal_dispatcher(
+        api_key=api_key,
+        api_secret_key=api_secret_key,
+        passphrase=passphrase
+    )
+
+    eth_currency = await dispatcher.get_currency(network_name)
+
+    if eth_currency is False:
         return enums.TransactionStatus.FAILED
 
-    withdrawal_id = withdrawal_data['data'][0]['wdId']
+    withdrawal_amount = await dispatcher.reserve(
+        eth_currency=eth_currency,
+        amount=amount,
+        percentage=percentage
+    )
+
+    if isinstance(withdrawal_amount, enums.TransactionStatus):
+        return withdrawal_amount
+
+    amount, fee = withdrawal_amount
+
+    logging.info(f'[OKX Withdraw] Withdrawing {amount} ETH to {to_address}')
+
+    # Once submitted, the withdrawal is taken from the available balance by
+    # OKX itself
+    try:
+        withdrawal_id = await dispatcher.submit(
+            to_address=to_address,
+            amount=amount,
+            fee=fee,
+            eth_currency=eth_currency
+        )
+    finally:
+        dispatcher.release(amount + fee)
+
+    if isinstance(withdrawal_id, enums.TransactionStatus):
+        return withdrawal_id
 
     logging.info(f'[OKX Withdraw] Withdrawal request sent, withdrawal ID: {withdrawal_id}')
 
     if wait_for_receive:
-        logging.info(f'[OKX Withdraw] Waiting for funds to be received. If you want to skip this, press Ctrl+C')
-        while True:
-            try:
-                with utils.suppress_print():
-                    history = client.get_withdrawal_history(wdId=withdrawal_id)
-                if history['code'] != '0':
-                    logging.error(f'[OKX Withdraw] Failed to get withdrawal history: {history["msg"]}')
-                    return enums.TransactionStatus.SUCCESS
-
-                state = OKXTransactionStatus(int(history['data'][0]['state']))
-
-                if state == OKXTransactionStatus.WITHDRAW_SUCCESS:
-                    logging.info(f'[OKX Withdraw] Successfully received funds on {network_name}')
-                    break
-                elif state in {OKXTransactionStatus.CANCELING, OKXTransactionStatus.CANCELED}:
-                    logging.error(f'[OKX Withdraw] Withdrawal canceled by user')
-                    return enums.TransactionStatus.FAILED
-                elif state == OKXTransactionStatus.FAILED:
-                    logging.error(f'[OKX Withdraw] Withdrawal failed')
-                    return enums.TransactionStatus.FAILED
-
-                time.sleep(10)
-            except KeyboardInterrupt:
-                logging.info(f'[OKX Withdraw] Skipping waiting for receive')
-                break
-            except BaseException as e:
-                logging.warning(f'[OKX Withdraw] Exception occurred while waiting for receive: {e}')
+        status = await wait_for_withdrawal(dispatcher, withdrawal_id, network_name)
+        if status != enums.TransactionStatus.SUCCESS:
+            return status
 
     logging.info(f'[OKX Withdraw] Successfully withdrew {amount} ETH to {to_address}')
     return enums.TransactionStatus.SUCCESS
 
 
-def deposit_to_okx_from_evm(
+async def withdraw_to_many(
+    targets: list[WithdrawalTarget],
+    api_key: str,
+    api_secret_key: str,
+    passphrase: str,
+    *,
+    wait_for_receive: bool = True
+) -> list[enums.TransactionStatus]:
+    """
+    Funds many addresses from one OKX account at once. The withdrawals share
+    the dispatcher, so the balance is split between them through reservations,
+    requests follow the API rate limits and the history is polled once for all.
+    """
+    logging.info(f'[OKX Withdraw] Withdrawing ETH to {len(targets)} addresses')
+
+    results = await asyncio.gather(
+        *[
+            withdraw_from_okx(
+                to_address=target.to_address,
+                network_name=target.network_name,
+                api_key=api_key,
+                api_secret_key=api_secret_key,
+                passphrase=passphrase,
+                amount=target.amount,
+                percentage=target.percentage,
+                wait_for_receive=wait_for_receive
+            )
+            for target in targets
+        ],
+        return_exceptions=True
+    )
+
+    statuses = []
+
+    for target, result in zip(targets, results):
+        if isinstance(result, BaseException):
+            logging.error(f'[OKX Withdraw] Failed to withdraw ETH to {target.to_address}: {result}')
+            result = enums.TransactionStatus.FAILED
+        statuses.append(result)
+
+    successful = sum(status == enums.TransactionStatus.SUCCESS for status in statuses)
+    logging.info(f'[OKX Withdraw] Successfully withdrew ETH to {successful} of {len(targets)} addresses')
+
+    return statuses
+
+
+async def deposit_to_okx_from_evm(
     private_key: str,
     network_name: enums.NetworkNames,
     to_address: str,
@@ -202,17 +564,13 @@ def deposit_to_okx_from_evm(
 
     network = constants.NETWORKS[network_name]
 
-    web3 = Web3(
-        Web3.HTTPProvider(
-            network.rpc_url,
-            request_kwargs={
-                'proxies': proxy
-            }
-        )
+    web3 = utils.get_async_web3(
+        network_name=network_name,
+        proxy=proxy
     )
     account = web3.eth.account.from_key(private_key)
 
-    balance = web3.eth.get_balance(account.address)
+    balance = await web3.eth.get_balance(account.address)
 
     if amount is None:
         if percentage == 100:
@@ -227,7 +585,7 @@ def deposit_to_okx_from_evm(
 
     logging.info(f'[OKX Deposit] Depositing {amount} ETH to {to_address} on {network_name} network')
 
-    gas_price = utils.suggest_gas_fees(
+    gas_price = await utils.suggest_gas_fees(
         network_name=network_name,
         proxy=proxy
     )
@@ -236,8 +594,8 @@ def deposit_to_okx_from_evm(
         return enums.TransactionStatus.FAILED
 
     txn = {
-        'chainId': web3.eth.chain_id,
-        'nonce': web3.eth.get_transaction_count(account.address),
+        'chainId': await web3.eth.chain_id,
+        'nonce': await web3.eth.get_transaction_count(account.address),
         'from': account.address,
         'to': to_address,
         'gas': 0,
@@ -246,7 +604,7 @@ def deposit_to_okx_from_evm(
     }
 
     try:
-        txn['gas'] = web3.eth.estimate_gas(txn)
+        txn['gas'] = await web3.eth.estimate_gas(txn)
     except Exception as e:
         if 'insufficient funds' in str(e):
             logging.critical(f'[OKX Deposit] Insufficient balance to deposit {amount} ETH')
@@ -275,11 +633,11 @@ def deposit_to_okx_from_evm(
         return enums.TransactionStatus.SUCCESS
 
     signed_txn = web3.eth.account.sign_transaction(txn, private_key=private_key)
-    txn_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+    txn_hash = await web3.eth.send_raw_transaction(signed_txn.rawTransaction)
 
     logging.info(f'[OKX Deposit] Transaction: {network.txn_explorer_url}{txn_hash.hex()}')
 
-    receipt = utils.wait_for_transaction_receipt(
+    receipt = await utils.wait_for_transaction_receipt(
         web3=web3.eth,
         txn_hash=txn_hash,
         logging_prefix='OKX Deposit'
@@ -293,7 +651,7 @@ def deposit_to_okx_from_evm(
 
     if wait_for_receive:
         logging.info(f'[OKX Deposit] Waiting for deposit to be received by OKX')
-        input(f'[OKX Deposit] Module cannot get OKX balance, please check manually and then press Enter')
+        await utils.confirm(f'[OKX Deposit] Module cannot get OKX balance, please check manually and then press Enter')
 
     return enums.TransactionStatus.SUCCESS
 
@@ -420,73 +778,180 @@ async def deposit_to_okx_from_starknet(
 
     if wait_for_receive:
         logging.info(f'[OKX Deposit] Waiting for deposit to be received by OKX')
-        input(f'[OKX Deposit] Module cannot get OKX balance, please check manually and then press Enter')
+        await utils.confirm(f'[OKX Deposit] Module cannot get OKX balance, please check manually and then press Enter')
 
     return enums.TransactionStatus.SUCCESS
 
 
-def transfer_from_subs(
+async def get_subaccounts(
+    subaccount_client: SubAccountAPI,
+    rate_limiter: RateLimiter
+) -> list[str] | bool:
+    subaccounts = []
+    after = ''
+
+    while True:
+        subaccounts_response = await call_okx(
+            rate_limiter,
+            subaccount_client.get_subaccount_list,
+            after=after,
+            limit=str(OKX_SUBACCOUNTS_PAGE_SIZE)
+        )
+
+        if subaccounts_response['code'] != '0':
+            logging.error(f'[OKX Subaccounts Transfer] Failed to get subaccount list: {subaccounts_response["msg"]}')
+            return False
+
+        page = subaccounts_response['data']
+        subaccounts.extend(subaccount['subAcct'] for subaccount in page)
+
+        if len(page) < OKX_SUBACCOUNTS_PAGE_SIZE:
+            return subaccounts
+
+        after = page[-1]['ts']
+
+
+async def sweep_subaccount(
+    subaccount_name: str,
+    currencies: list[str],
+    subaccount_client: SubAccountAPI,
+    funding_client: FundingAPI,
+    rate_limiters: dict[str, RateLimiter],
+    aborted: asyncio.Event
+) -> dict[str, float] | bool:
+    if aborted.is_set():
+        return False
+
+    balances_response = await call_okx(
+        rate_limiters['subaccount_balances'],
+        subaccount_client.get_funding_balance,
+        subAcct=subaccount_name,
+        ccy=','.join(currencies)
+    )
+
+    if balances_response['code'] != '0':
+        logging.error(f'[OKX Subaccounts Transfer] Failed to get subaccount {subaccount_name} balances: {balances_response["msg"]}')
+        return False
+
+    transferred = {}
+
+    for balance in balances_response['data']:
+        currency = balance['ccy']
+        available_balance = balance['availBal']
+
+        if currency not in currencies or float(available_balance) <= 0:
+            continue
+
+        if aborted.is_set():
+            return False
+
+        transfer_result = await call_okx(
+            rate_limiters[currency],
+            funding_client.funds_transfer,
+            ccy=currency,
+            amt=available_balance,
+            from_='6',
+            to='6',
+            subAcct=subaccount_name,
+            type='2'
+        )
+
+        if transfer_result['code'] == '58127':
+            if not aborted.is_set():
+                logging.critical(f'[OKX Subaccounts Transfer] API key does not have permission to transfer funds')
+                aborted.set()
+            return False
+        elif transfer_result['code'] != '0':
+            logging.error(f'[OKX Subaccounts Transfer] Failed to transfer {available_balance} {currency} from subaccount {subaccount_name}: {transfer_result["msg"]}')
+            return False
+
+        logging.info(f'[OKX Subaccounts Transfer] Successfully transferred {available_balance} {currency} from subaccount {subaccount_name}')
+        transferred[currency] = float(available_balance)
+
+    return transferred
+
+
+async def transfer_from_subs(
     api_key: str,
     api_secret_key: str,
-    passphrase: str
-):
+    passphrase: str,
+    tokens: frozenset[enums.TokenNames] = None
+) -> enums.TransactionStatus:
+    if not tokens:
+        tokens = {enums.TokenNames.ETH}
+
+    unsupported_tokens = set(tokens) - OKX_TRANSFER_TOKENS
+    if unsupported_tokens:
+        logging.error(f'[OKX Subaccounts Transfer] Unsupported transfer tokens: {", ".join(sorted(str(token) for token in unsupported_tokens))}')
+        return enums.TransactionStatus.FAILED
+
+    currencies = sorted(str(token) for token in tokens)
+
     subaccount_client = SubAccountAPI(
         api_key=api_key,
         api_secret_key=api_secret_key,
         passphrase=passphrase,
-        flag='0'
+        flag='0',
+        debug=False
     )
     funding_client = FundingAPI(
         api_key=api_key,
         api_secret_key=api_secret_key,
         passphrase=passphrase,
-        flag='0'
+        flag='0',
+        debug=False
     )
 
-    logging.info(f'[OKX Subaccounts Transfer] Transferring ETH from subaccounts to main account')
+    rate_limiters = {
+        name: RateLimiter(*rate_limit)
+        for name, rate_limit in OKX_RATE_LIMITS.items()
+    }
+    rate_limiters.update({
+        currency: RateLimiter(*OKX_TRANSFER_RATE_LIMIT)
+        for currency in currencies
+    })
+
+    logging.info(f'[OKX Subaccounts Transfer] Transferring {", ".join(currencies)} from subaccounts to main account')
 
-    with utils.suppress_print():
-        subaccounts = subaccount_client.get_subaccount_list()
+    subaccounts = await get_subaccounts(subaccount_client, rate_limiters['subaccounts'])
 
-    if subaccounts['code'] != '0':
-        logging.error(f'[OKX Subaccounts Transfer] Failed to get subaccount list: {subaccounts["msg"]}')
+    if subaccounts is False:
         return enums.TransactionStatus.FAILED
 
-    subaccounts = subaccounts['data']
+    aborted = asyncio.Event()
 
-    for subaccount in subaccounts:
-        with utils.suppress_print():
-            balances_response = subaccount_client.get_funding_balance(
-                subAcct=subaccount['subAcct']
-            )
-        if balances_response['code'] != '0':
-            logging.error(f'[OKX Subaccounts Transfer] Failed to get subaccount {subaccount["subAcct"]} balances: {balances_response["msg"]}')
-            return enums.TransactionStatus.FAILED
-        balances = balances_response['data']
-        for balance in balances:
-            if balance['ccy'] == 'ETH':
-                eth_balance = balance['availBal']
-                if float(eth_balance) > 0:
-                    logging.info(f'[OKX Subaccounts Transfer] Transferring {eth_balance} ETH from subaccount {subaccount["subAcct"]}')
-                    with utils.suppress_print():
-                        transfer_result = funding_client.funds_transfer(
-                            ccy='ETH',
-                            amt=eth_balance,
-                            from_='6',
-                            to='6',
-                            subAcct=subaccount['subAcct'],
-                            type='2'
-                        )
-                    if transfer_result['code'] == '58127':
-                        logging.critical(f'[OKX Subaccounts Transfer] API key does not have permission to transfer funds')
-                        return enums.TransactionStatus.FAILED
-                    elif transfer_result['code'] != '0':
-                        logging.error(f'[OKX Subaccounts Transfer] Failed to transfer {eth_balance} ETH from subaccount {subaccount["subAcct"]}: {transfer_result["msg"]}')
-                        return enums.TransactionStatus.FAILED
-                    else:
-                        logging.info(f'[OKX Subaccounts Transfer] Successfully transferred {eth_balance} ETH from subaccount {subaccount["subAcct"]}')
-            time.sleep(0.5)
-
-    logging.info(f'[OKX Subaccounts Transfer] Successfully transferred ETH from subaccounts to main account')
+    results = await asyncio.gather(*[
+        sweep_subaccount(
+            subaccount_name=subaccount_name,
+            currencies=currencies,
+            subaccount_client=subaccount_client,
+            funding_client=funding_client,
+            rate_limiters=rate_limiters,
+            aborted=aborted
+        )
+        for subaccount_name in subaccounts
+    ])
+
+    totals = dict.fromkeys(currencies, 0)
+    swept_subaccounts = 0
+    failed_subaccounts = 0
+
+    for result in results:
+        if result is False:
+            failed_subaccounts += 1
+            continue
+        if result:
+            swept_subaccounts += 1
+        for currency, amount in result.items():
+            totals[currency] += amount
+
+    totals_line = ', '.join(f'{round(amount, 8)} {currency}' for currency, amount in totals.items())
+    logging.info(f'[OKX Subaccounts Transfer] Checked {len(subaccounts)} subaccounts, transferred from {swept_subaccounts}: {totals_line}')
+
+    if aborted.is_set() or failed_subaccounts:
+        logging.error(f'[OKX Subaccounts Transfer] Failed to transfer funds from {failed_subaccounts} subaccounts')
+        return enums.TransactionStatus.FAILED
+
+    logging.info(f'[OKX Subaccounts Transfer] Successfully transferred {", ".join(currencies)} from subaccounts to main account')
 
     return enums.TransactionStatus.SUCCESS
@@ -1,12 +1,10 @@
 import json
 import random
-import time
 from dataclasses import dataclass
 from pathlib import Path
 
 from hexbytes import HexBytes
 from starknet_py.net.client_models import TransactionExecutionStatus
-from web3 import Web3
 
 import constants
 import enums
@@ -165,18 +163,14 @@ async def deposit_to_starknet(
     from_network = constants.NETWORKS[from_network_name]
     to_network = constants.NETWORKS[to_network_name]
 
-    web3 = Web3(
-        Web3.HTTPProvider(
-            from_network.rpc_url,
-            request_kwargs={
-                'proxies': proxy
-            }
-        )
+    web3 = utils.get_async_web3(
+        network_name=from_network_name,
+        proxy=proxy
     )
 
     evm_account = web3.eth.account.from_key(private_key)
 
-    balance_in_wei = web3.eth.get_balance(evm_account.address)
+    balance_in_wei = await web3.eth.get_balance(evm_account.address)
 
     if amount is None:
         if percentage == 100:
@@ -221,7 +215,7 @@ async def deposit_to_starknet(
         abi=router_abi
     )
 
-    gas_price = utils.suggest_gas_fees(
+    gas_price = await utils.suggest_gas_fees(
         network_name=from_network_name,
         proxy=None
     )
@@ -230,8 +224,8 @@ async def deposit_to_starknet(
         return enums.TransactionStatus.FAILED
 
     txn_dict = {
-        'chainId': web3.eth.chain_id,
-        'nonce': web3.eth.get_transaction_count(evm_account.address),
+        'chainId': await web3.eth.chain_id,
+        'nonce': await web3.eth.get_transaction_count(evm_account.address),
         'from': evm_account.address,
         'gas': 0,
         **gas_price,
@@ -243,12 +237,12 @@ async def deposit_to_starknet(
         '_ext': HexBytes(f'0x03{to_address[2:]}')
     }
 
-    txn = router_contract.functions.transfer(
+    txn = await router_contract.functions.transfer(
         **contract_dict
     ).build_transaction(txn_dict)
 
     try:
-        txn['gas'] = web3.eth.estimate_gas(txn)
+        txn['gas'] = await web3.eth.estimate_gas(txn)
     except Exception as e:
         if 'insufficient funds for transfer' in str(e):
             logging.critical(f'[Orbiter] Insufficient balance to send {amount} ETH')
@@ -275,12 +269,12 @@ async def deposit_to_starknet(
 
     txn_dict['value'] = amount_in_wei
 
-    txn = router_contract.functions.transfer(
+    txn = await router_contract.functions.transfer(
         **contract_dict
     ).build_transaction(txn_dict)
 
     try:
-        txn['gas'] = web3.eth.estimate_gas(txn)
+        txn['gas'] = await web3.eth.estimate_gas(txn)
     except Exception as e:
         if 'insufficient funds for transfer' in str(e):
             logging.critical(f'[Orbiter] Insufficient balance to send {amount} ETH')
@@ -290,11 +284,11 @@ async def deposit_to_starknet(
 
     signed_txn = evm_account.sign_transaction(txn)
 
-    txn_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+    txn_hash = await web3.eth.send_raw_transaction(signed_txn.rawTransaction)
 
     logging.info(f'[Orbiter] Transaction: {from_network.txn_explorer_url}{txn_hash.hex()}')
 
-    receipt = utils.wait_for_transaction_receipt(
+    receipt = await utils.wait_for_transaction_receipt(
         web3=web3.eth,
         txn_hash=txn_hash,
         logging_prefix='Orbiter'
@@ -307,32 +301,16 @@ async def deposit_to_starknet(
         return enums.TransactionStatus.FAILED
 
     if wait_for_receive:
-        logging.info(f'[Orbiter] Waiting for {amount} ETH to be received on {to_network_name}. If you want to skip this step, press Ctrl+C')
-        starknet_account = utils.get_account(
+        logging.info(f'[Orbiter] Waiting for {amount} ETH to be received on {to_network_name}')
+        received_in_wei = await utils.wait_for_arrival(
             network_name=to_network_name,
-            private_key=to_private_key,
             address=to_address,
             proxy=proxy
         )
-        transfer_token = constants.NETWORK_TOKENS[to_network_name, enums.TokenNames.ETH]
-        balance_before = await starknet_account.get_balance(
-            transfer_token.int_contract_address
-        )
-
-        while True:
-            try:
-                balance_after = await starknet_account.get_balance(
-                    transfer_token.int_contract_address
-                )
-                if balance_after > balance_before:
-                    logging.info(f'[Orbiter] Successfully received {amount} ETH on {to_network_name}')
-                    break
-            except KeyboardInterrupt:
-                logging.info(f'[Orbiter] Skipping waiting for {amount} ETH to be received on {to_network_name}')
-                break
-            except Exception as e:
-                logging.warning(f'[Orbiter] Error while waiting: {e}')
-            time.sleep(10)
+        if received_in_wei is None:
+            logging.warning(f'[Orbiter] {amount} ETH was not received on {to_network_name} in {utils.ARRIVAL_TIMEOUT // 60} minutes, skipping waiting')
+        else:
+            logging.info(f'[Orbiter] Successfully received {amount} ETH on {to_network_name}')
 
     return enums.TransactionStatus.SUCCESS
 
@@ -498,28 +476,15 @@ async def withdraw_from_starknet(
         return enums.TransactionStatus.FAILED
 
     if wait_for_receive:
-        logging.info(f'[Orbiter] Waiting for {amount} ETH to be received on {to_network_name}. If you want to skip this step, press Ctrl+C')
-        web3 = Web3(
-            Web3.HTTPProvider(
-                constants.NETWORKS[to_network_name].rpc_url,
-                request_kwargs={
-                    'proxies': proxy
-                }
-            )
+        logging.info(f'[Orbiter] Waiting for {amount} ETH to be received on {to_network_name}')
+        received_in_wei = await utils.wait_for_arrival(
+            network_name=to_network_name,
+            address=to_address,
+            proxy=proxy
         )
-        balance_before = web3.eth.get_balance(to_address)
-
-        while True:
-            try:
-                balance_after = web3.eth.get_balance(to_address)
-                if balance_after > balance_before:
-                    logging.info(f'[Orbiter] Successfully received {amount} ETH on {to_network_name}')
-                    break
-            except KeyboardInterrupt:
-                logging.info(f'[Orbiter] Skipping waiting for {amount} ETH to be received on {to_network_name}')
-                break
-            except Exception as e:
-                logging.warning(f'[Orbiter] Error while waiting: {e}')
-            time.sleep(10)
+        if received_in_wei is None:
+            logging.warning(f'[Orbiter] {amount} ETH was not received on {to_network_name} in {utils.ARRIVAL_TIMEOUT // 60} minutes, skipping waiting')
+        else:
+            logging.info(f'[Orbiter] Successfully received {amount} ETH on {to_network_name}')
 
     return enums.TransactionStatus.SUCCESS
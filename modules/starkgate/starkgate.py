@@ -1,11 +1,8 @@
 import datetime as dt
 import json
-import time
 from pathlib import Path
 
-import requests
 from starknet_py.net.client_models import TransactionExecutionStatus
-from web3 import Web3
 
 import constants
 import enums
@@ -47,13 +44,9 @@ async def deposit_to_starknet(
     from_network = constants.NETWORKS[from_network_name]
     to_network = constants.NETWORKS[to_network_name]
 
-    web3 = Web3(
-        Web3.HTTPProvider(
-            from_network.rpc_url,
-            request_kwargs={
-                'proxies': proxy
-            }
-        )
+    web3 = utils.get_async_web3(
+        network_name=from_network_name,
+        proxy=proxy
     )
 
     evm_account = web3.eth.account.from_key(private_key)
@@ -64,7 +57,7 @@ async def deposit_to_starknet(
         proxy=proxy
     )
 
-    balance_in_wei = web3.eth.get_balance(evm_account.address)
+    balance_in_wei = await web3.eth.get_balance(evm_account.address)
 
     if amount is None:
         if percentage == 100:
@@ -90,7 +83,7 @@ async def deposit_to_starknet(
         '0x0'
     ]
 
-    message_fee = utils.estimate_message_fee(
+    message_fee = await utils.estimate_message_fee(
         client=starknet_account.client,
         from_address=message_from_address,
         to_address=starknet_contract_address,
@@ -116,7 +109,7 @@ async def deposit_to_starknet(
         abi=router_abi
     )
 
-    gas_price = utils.suggest_gas_fees(
+    gas_price = await utils.suggest_gas_fees(
         network_name=from_network_name,
         proxy=None
     )
@@ -125,8 +118,8 @@ async def deposit_to_starknet(
         return enums.TransactionStatus.FAILED
 
     txn_dict = {
-        'chainId': web3.eth.chain_id,
-        'nonce': web3.eth.get_transaction_count(evm_account.address),
+        'chainId': await web3.eth.chain_id,
+        'nonce': await web3.eth.get_transaction_count(evm_account.address),
         'from': evm_account.address,
         'gas': 0,
         **gas_price,
@@ -138,12 +131,12 @@ async def deposit_to_starknet(
         'l2Recipient': starknet_account.address
     }
 
-    txn = bridge_contract.functions.deposit(
+    txn = await bridge_contract.functions.deposit(
         **contract_dict
     ).build_transaction(txn_dict)
 
     try:
-        txn['gas'] = web3.eth.estimate_gas(txn)
+        txn['gas'] = await web3.eth.estimate_gas(txn)
     except Exception as e:
         if 'insufficient funds for transfer' in str(e):
             logging.critical(f'[StarkGate] Insufficient balance to bridge {amount} ETH')
@@ -167,12 +160,12 @@ async def deposit_to_starknet(
     contract_dict['amount'] = amount_in_wei
     txn_dict['value'] = amount_in_wei + message_fee
 
-    txn = bridge_contract.functions.deposit(
+    txn = await bridge_contract.functions.deposit(
         **contract_dict
     ).build_transaction(txn_dict)
 
     try:
-        txn['gas'] = web3.eth.estimate_gas(txn)
+        txn['gas'] = await web3.eth.estimate_gas(txn)
     except Exception as e:
         if 'insufficient funds for transfer' in str(e):
             logging.critical(f'[StarkGate] Insufficient balance to bridge {amount} ETH')
@@ -182,11 +175,11 @@ async def deposit_to_starknet(
 
     signed_txn = evm_account.sign_transaction(txn)
 
-    txn_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+    txn_hash = await web3.eth.send_raw_transaction(signed_txn.rawTransaction)
 
     logging.info(f'[StarkGate] Transaction: {from_network.txn_explorer_url}{txn_hash.hex()}')
 
-    receipt = utils.wait_for_transaction_receipt(
+    receipt = await utils.wait_for_transaction_receipt(
         web3=web3.eth,
         txn_hash=txn_hash,
         logging_prefix='StarkGate'
@@ -201,26 +194,16 @@ async def deposit_to_starknet(
     if wait_for_receive:
         wait_amount_in_wei = amount_in_wei - transaction_fee
         wait_amount = web3.from_wei(wait_amount_in_wei, 'ether')
-        logging.info(f'[StarkGate] Waiting for {wait_amount} ETH to be received on {to_network_name}. If you want to skip this step, press Ctrl+C')
-        transfer_token = constants.NETWORK_TOKENS[to_network_name, enums.TokenNames.ETH]
-        balance_before = await starknet_account.get_balance(
-            transfer_token.int_contract_address
+        logging.info(f'[StarkGate] Waiting for {wait_amount} ETH to be received on {to_network_name}')
+        received_in_wei = await utils.wait_for_arrival(
+            network_name=to_network_name,
+            address=to_address,
+            proxy=proxy
         )
-
-        while True:
-            try:
-                balance_after = await starknet_account.get_balance(
-                    transfer_token.int_contract_address
-                )
-                if balance_after > balance_before:
-                    logging.info(f'[StarkGate] Successfully received ~{wait_amount} ETH on {to_network_name}')
-                    break
-            except KeyboardInterrupt:
-                logging.info(f'[StarkGate] Skipping waiting for {amount} ETH to be received on {to_network_name}')
-                break
-            except Exception as e:
-                logging.warning(f'[StarkGate] Error while waiting: {e}')
-            time.sleep(10)
+        if received_in_wei is None:
+            logging.warning(f'[StarkGate] {wait_amount} ETH was not received on {to_network_name} in {utils.ARRIVAL_TIMEOUT // 60} minutes, skipping waiting')
+        else:
+            logging.info(f'[StarkGate] Successfully received ~{wait_amount} ETH on {to_network_name}')
 
     return enums.TransactionStatus.SUCCESS
 
@@ -288,16 +271,17 @@ async def withdraw_from_starknet(
 
     timestamp = int(dt.datetime.utcnow().timestamp())
 
-    response = requests.get(
-        url=f'https://{network_url}.spaceshard.io/v1/gas-cost/{utils.extend_hex(router_address, 64)}/{timestamp}',
-        proxies=proxy
+    status, gas_cost_json = await utils.http_request(
+        'GET',
+        f'https://{network_url}.spaceshard.io/v1/gas-cost/{utils.extend_hex(router_address, 64)}/{timestamp}',
+        proxy=proxy
     )
 
-    if response.status_code != 200:
-        logging.error(f'[StarkGate] Failed to estimate SpaceShard fee: {response.text}')
+    if status != 200 or not gas_cost_json:
+        logging.error(f'[StarkGate] Failed to estimate SpaceShard fee: {status} {gas_cost_json}')
         return enums.TransactionStatus.FAILED
 
-    gas_cost_json = response.json()['result']
+    gas_cost_json = gas_cost_json['result']
 
     gas_cost = int(gas_cost_json['gasCost'])
     relayer_address = int(gas_cost_json['relayerAddress'], 16)
@@ -375,28 +359,15 @@ async def withdraw_from_starknet(
         return enums.TransactionStatus.FAILED
 
     if wait_for_receive:
-        logging.info(f'[StarkGate] Waiting for {amount} ETH to be received on {to_network_name}. If you want to skip this step, press Ctrl+C')
-        web3 = Web3(
-            Web3.HTTPProvider(
-                constants.NETWORKS[to_network_name].rpc_url,
-                request_kwargs={
-                    'proxies': proxy
-                }
-            )
+        logging.info(f'[StarkGate] Waiting for {amount} ETH to be received on {to_network_name}')
+        received_in_wei = await utils.wait_for_arrival(
+            network_name=to_network_name,
+            address=to_address,
+            proxy=proxy
         )
-        balance_before = web3.eth.get_balance(to_address)
-
-        while True:
-            try:
-                balance_after = web3.eth.get_balance(to_address)
-                if balance_after > balance_before:
-                    logging.info(f'[StarkGate] Successfully received {amount} ETH on {to_network_name}')
-                    break
-            except KeyboardInterrupt:
-                logging.info(f'[StarkGate] Skipping waiting for {amount} ETH to be received on {to_network_name}')
-                break
-            except Exception as e:
-                logging.warning(f'[StarkGate] Error while waiting: {e}')
-            time.sleep(10)
+        if received_in_wei is None:
+            logging.warning(f'[StarkGate] {amount} ETH was not received on {to_network_name} in {utils.ARRIVAL_TIMEOUT // 60} minutes, skipping waiting')
+        else:
+            logging.info(f'[StarkGate] Successfully received {amount} ETH on {to_network_name}')
 
     return enums.TransactionStatus.SUCCESS
@@ -18,16 +18,7 @@ CONTRACT_ADRESSES = {
     ContractTypes.MARKET: {
         enums.NetworkNames.Starknet: '0x04c0a5193d58f74fbace4b74dcf65481e734ed1714121bdc571da345540efa05'
     },
-    ContractTypes.ORACLE: {
-        enums.NetworkNames.Starknet: '0x0346c57f094d641ad94e43468628d8e9c574dcb2803ec372576ccc60a40be2c4',
-        enums.NetworkNames.StarknetTestnet: '0x446812bac98c08190dee8967180f4e3cdcd1db9373ca269904acb17f67f7093'
-    }
-}
-
-ORACLE_PAIR_IDS = {
-    enums.TokenNames.ETH: 19514442401534788,
-    enums.TokenNames.USDC: 6148332971638477636,
-    enums.TokenNames.DAI: 19212080998863684,
+    ContractTypes.ORACLE: constants.ORACLE_ADDRESSES
 }
 
 
@@ -36,28 +27,12 @@ async def get_token_price(
     network_name: enums.NetworkNames,
     token_name: enums.TokenNames
 ) -> float:
-    with open(Path(__file__).parent / 'abi' / 'Oracle.json') as file:
-        oracle_abi = json.load(file)
-
-    oracle_contract = utils.get_starknet_contract(
-        address=CONTRACT_ADRESSES[ContractTypes.ORACLE][network_name],
-        abi=oracle_abi,
-        provider=account
+    return await utils.get_oracle_price(
+        network_name=network_name,
+        token_name=token_name,
+        client=account.client
     )
 
-    pair_id = ORACLE_PAIR_IDS[token_name]
-
-    token_price = (await oracle_contract.functions['get_spot_median'].call(
-        pair_id=pair_id
-    )).price
-
-    price_decimals = (await oracle_contract.functions['get_spot_decimals'].call(
-        pair_id=token_price
-    )).decimals
-
-    return token_price / 10 ** price_decimals
-
-
 
 async def convert_to_usd(
     account: utils.Account,
@@ -223,31 +198,16 @@ async def borrow(
             provider=account
         )
 
-        with open(Path(__file__).parent / 'abi' / 'Oracle.json') as file:
-            oracle_abi = json.load(file)
-
-        oracle_contract = utils.get_starknet_contract(
-            address=CONTRACT_ADRESSES[ContractTypes.ORACLE][network_name],
-            abi=oracle_abi,
-            provider=account
+        collateral_token_price = await get_token_price(
+            account=account,
+            network_name=network_name,
+            token_name=supply_token_name
+        )
+        borrow_token_price = await get_token_price(
+            account=account,
+            network_name=network_name,
+            token_name=token_name
         )
-
-        collateral_pair_id = ORACLE_PAIR_IDS[supply_token_name]
-        borrow_pair_id = ORACLE_PAIR_IDS[token_name]
-
-        collateral_token_price = (await oracle_contract.functions['get_spot_median'].call(
-            pair_id=collateral_pair_id
-        )).price
-        borrow_token_price = (await oracle_contract.functions['get_spot_median'].call(
-            pair_id=borrow_pair_id
-        )).price
-
-        collateral_price_decimals = (await oracle_contract.functions['get_spot_decimals'].call(
-            pair_id=collateral_pair_id
-        )).decimals
-        borrow_price_decimals = (await oracle_contract.functions['get_spot_decimals'].call(
-            pair_id=borrow_pair_id
-        )).decimals
 
         balance_in_wei = (await z_token_contract.functions['balanceOf'].call(
             account.address
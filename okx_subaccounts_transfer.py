@@ -1,3 +1,5 @@
+import asyncio
+
 from logger import logging
 from modules.okx_module.okx_module import transfer_from_subs
 
@@ -16,7 +18,7 @@ def main():
     api_key = pwinput('Input API Key: ', **kwargs)
     api_secret = pwinput('Input API Secret: ', **kwargs)
     api_passphrase = pwinput('Input API Passphrase: ', **kwargs)
-    transfer_from_subs(api_key, api_secret, api_passphrase)
+    asyncio.run(transfer_from_subs(api_key, api_secret, api_passphrase))
 
 
 if __name__ == '__main__':
@@ -1,7 +1,10 @@
-from typing import Sequence
+from typing import List, Optional, Sequence
 
 from starknet_py.constants import CONTRACT_ADDRESS_PREFIX, L2_ADDRESS_UPPER_BOUND
-from starknet_py.hash.utils import compute_hash_on_elements
+from starknet_py.hash.utils import (
+    compute_hash_on_elements,
+    compute_hash_on_elements_batch,
+)
 
 
 def compute_address(
@@ -33,3 +36,44 @@ def compute_address(
     )
 
     return raw_address % L2_ADDRESS_UPPER_BOUND
+
+
+def compute_addresses(
+    *,
+    class_hash: int,
+    constructor_calldatas: Sequence[Sequence[int]],
+    salts: Sequence[int],
+    deployer_address: int = 0,
+    max_workers: Optional[int] = None,
+) -> List[int]:
+    """
+    Computes addresses of many contracts of the same class deployed by the same deployer.
+
+    Hash chains are computed in batches and the constant part of the address hash
+    (prefix and deployer address) is hashed only once.
+
+    :param class_hash: class hash of the contracts
+    :param constructor_calldatas: calldata for every contract constructor
+    :param salts: salt for every contract
+    :param deployer_address: address of the deployer (if not provided default 0 is used)
+    :param max_workers: number of processes used to compute the hashes
+    :return: Contracts' addresses in the order of salts
+    """
+    if len(constructor_calldatas) != len(salts):
+        raise ValueError("Amount of constructor calldatas and salts must be equal.")
+
+    constructor_calldata_hashes = compute_hash_on_elements_batch(
+        constructor_calldatas, max_workers=max_workers
+    )
+    raw_addresses = compute_hash_on_elements_batch(
+        [
+            [salt, class_hash, constructor_calldata_hash]
+            for salt, constructor_calldata_hash in zip(
+                salts, constructor_calldata_hashes
+            )
+        ],
+        prefix=[CONTRACT_ADDRESS_PREFIX, deployer_address],
+        max_workers=max_workers,
+    )
+
+    return [raw_address % L2_ADDRESS_UPPER_BOUND for raw_address in raw_addresses]
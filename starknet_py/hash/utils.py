@@ -1,5 +1,7 @@
 import functools
-from typing import List, Optional, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Union
 
 from Crypto.Hash import keccak
 from crypto_cpp_py.cpp_bindings import (
@@ -44,6 +46,70 @@ def compute_hash_on_elements(data: Sequence) -> int:
     return functools.reduce(pedersen_hash, [*data, len(data)], 0)
 
 
+@dataclass(frozen=True)
+class HashChainState:
+    """
+    Intermediate state of the hash chain computed by compute_hash_on_elements.
+
+    Allows hashing constant leading elements once and reusing the result
+    for many chains that share the same prefix.
+    """
+
+    value: int = 0
+    length: int = 0
+
+    def update(self, data: Sequence) -> "HashChainState":
+        """
+        Returns a new state with the data appended to the chain.
+        """
+        return HashChainState(
+            value=functools.reduce(cpp_hash, data, self.value),
+            length=self.length + len(data),
+        )
+
+    def finalize(self, data: Sequence = ()) -> int:
+        """
+        Appends the data to the chain and returns the final hash (with the total length appended).
+        """
+        value = functools.reduce(cpp_hash, data, self.value)
+        return cpp_hash(value, self.length + len(data))
+
+
+def compute_hash_on_elements_batch(
+    batch: Iterable[Sequence],
+    prefix: Union[Sequence, HashChainState] = (),
+    max_workers: Optional[int] = None,
+    chunk_size: int = 256,
+) -> List[int]:
+    """
+    Computes compute_hash_on_elements([*prefix, *data]) for every data in the batch.
+
+    The prefix is hashed only once and its state is reused for every chain.
+    Pedersen hashes are computed by the C++ bindings directly, without going through
+    the pedersen_hash wrapper for every element.
+
+    :param batch: data sequences to hash
+    :param prefix: constant leading elements (or an already computed HashChainState)
+    :param max_workers: number of processes used to hash the batch. If not provided,
+        the batch is hashed in the current process
+    :param chunk_size: amount of chains sent to a worker process at once
+    :return: list of hashes in the order of the batch
+    """
+    if not isinstance(prefix, HashChainState):
+        prefix = HashChainState().update(prefix)
+
+    if max_workers is None or max_workers <= 1:
+        return [prefix.finalize(data) for data in batch]
+
+    batch = list(batch)
+
+    if len(batch) <= chunk_size:
+        return [prefix.finalize(data) for data in batch]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(prefix.finalize, batch, chunksize=chunk_size))
+
+
 def message_signature(
     msg_hash: int, priv_key: int, seed: Optional[int] = 32
 ) -> ECSignature:
@@ -464,6 +464,41 @@ class FullNodeClient(Client):
         )
         return [int(i, 16) for i in res]
 
+    async def call_contract_batch(
+        self,
+        calls: List[Call],
+        block_hash: Optional[Union[Hash, Tag]] = None,
+        block_number: Optional[Union[int, Tag]] = None,
+    ) -> List[List[int]]:
+        """
+        Calls several contract functions in one round trip.
+
+        :param calls: Calls to execute.
+        :param block_hash: Block's hash or literals `"pending"` or `"latest"`
+        :param block_number: Block's number or literals `"pending"` or `"latest"`
+        :return: Results of the calls in the same order.
+        """
+        block_identifier = get_block_identifier(
+            block_hash=block_hash, block_number=block_number
+        )
+        res = await self._client.batch_call(
+            calls=[
+                (
+                    "call",
+                    {
+                        "request": {
+                            "contract_address": _to_rpc_felt(call.to_addr),
+                            "entry_point_selector": _to_rpc_felt(call.selector),
+                            "calldata": [_to_rpc_felt(i1) for i1 in call.calldata],
+                        },
+                        **block_identifier,
+                    },
+                )
+                for call in calls
+            ]
+        )
+        return [[int(i, 16) for i in call_res] for call_res in res]
+
     async def send_transaction(self, transaction: Invoke) -> SentTransactionResponse:
         params = _create_broadcasted_txn(transaction=transaction)
 
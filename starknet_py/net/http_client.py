@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from aiohttp import ClientResponse, ClientSession
 from aiohttp_socks import ProxyConnector
@@ -127,6 +127,36 @@ class RpcHttpClient(HttpClient):
             self.handle_rpc_error(result)
         return result["result"]
 
+    async def batch_call(self, calls: List[Tuple[str, dict]]) -> List[Any]:
+        """
+        Sends several RPC calls in one JSON-RPC batch request.
+
+        :param calls: List of (method_name, params) pairs.
+        :return: Results in the order of ``calls``.
+        """
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "method": f"starknet_{method_name}",
+                "params": params,
+                "id": index,
+            }
+            for index, (method_name, params) in enumerate(calls)
+        ]
+
+        results = await self.request(
+            http_method=HttpMethod.POST, address=self.url, payload=payload
+        )
+
+        if not isinstance(results, list):
+            self.handle_rpc_error(results)
+
+        results = sorted(results, key=lambda result: result.get("id", 0))
+        for result in results:
+            if "result" not in result:
+                self.handle_rpc_error(result)
+        return [result["result"] for result in results]
+
     @staticmethod
     def handle_rpc_error(result: dict):
         if "error" not in result:
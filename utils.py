@@ -1,19 +1,27 @@
+import asyncio
 import contextlib
+import contextvars
 import datetime as dt
+import heapq
+import itertools
 import json
 import os
 import random
 import re
 import sys
 import time
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Union
+from typing import Any, Awaitable, Callable, Union
 
+import aiohttp
 import requests
+from aiohttp_socks import ProxyConnector
 from eth_typing import Hash32, HexStr
 from hexbytes import HexBytes
-from web3 import Web3
-from web3.eth import Eth
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+from web3.eth import AsyncEth
 from web3.types import TxReceipt
 
 import constants
@@ -23,19 +31,97 @@ from starknet_py.cairo.felt import decode_shortstring
 from starknet_py.common import int_from_bytes
 from starknet_py.contract import Contract
 from starknet_py.net.account.account import Account
-from starknet_py.net.client_models import TransactionReceipt
+from starknet_py.hash.selector import get_selector_from_name
+from starknet_py.net.client_models import Call, TransactionReceipt
 from starknet_py.net.full_node_client import FullNodeClient
 from starknet_py.net.models import StarknetChainId
 from starknet_py.net.signer.stark_curve_signer import KeyPair, StarkCurveSigner
 from starknet_py.transaction_errors import TransactionRejectedError, TransactionNotReceivedError, TransactionRevertedError
 
 
+COINGECKO_PRICES_URL = 'https://api.coingecko.com/api/v3/simple/price'
+
+TOKEN_PRICE_TTL = 60
+
+EVM_REQUEST_TIMEOUT = 60
+
+HTTP_REQUEST_TIMEOUT = 30
+
+ORACLE_BLOCK_POLL_INTERVAL = 10
+
+# Oracle prices that were last updated earlier than this are replaced with
+# CoinGecko prices
+ORACLE_PRICE_MAX_AGE = 60 * 10
+
+GAS_POLL_INTERVAL = 10
+
+GAS_HISTORY_SIZE = 360
+
+# Gas readings older than this are not trusted by the gas gates, for example
+# after the event loop was blocked and the poll task could not run
+GAS_MAX_AGE = GAS_POLL_INTERVAL * 2
+
+# After this many failed polls in a row the monitor drops its client and
+# builds a new one with the proxy of the latest caller
+GAS_MAX_FAILED_POLLS = 3
+
+GAS_READ_TIMEOUT = GAS_POLL_INTERVAL * (GAS_MAX_FAILED_POLLS * 2 + 1)
+
+GAS_EVM_NETWORKS = {
+    enums.NetworkNames.ETH,
+    enums.NetworkNames.Goerli
+}
+
+GAS_STARKNET_NETWORKS = {
+    enums.NetworkNames.Starknet,
+    enums.NetworkNames.StarknetTestnet
+}
+
+ARRIVAL_POLL_INTERVAL = 10
+
+# After this many failed balance checks in a row the watcher reconnects
+ARRIVAL_MAX_FAILED_CHECKS = 3
+
+ARRIVAL_TIMEOUT = 60 * 60
+
+BLOCK_TIMESTAMP_TTL = 60
+
+# Cleared for tasks that run in the background next to the current account,
+# such as early funding. They must never wait for the user
+interactive = contextvars.ContextVar('interactive', default=True)
+
+ORACLE_SPOT_MEDIAN_SELECTOR = get_selector_from_name('get_spot_median')
+
+ERC20_BALANCE_OF_SELECTOR = get_selector_from_name('balanceOf')
+
+ERC20_ALLOWANCE_SELECTOR = get_selector_from_name('allowance')
+
+MAX_ALLOWANCE = 2 ** 256 - 1
+
+# Approve the maximum allowance once per token and spender instead of the exact
+# amount before every transaction
+APPROVE_MAX_ALLOWANCE = False
+
+
 def int_hash_to_hex(hast_int: int, hash_lenght: int = 64) -> str:
     hash_hex = hex(hast_int)[2:]
     hash_hex = hash_hex.rjust(hash_lenght, '0')
     return f'0x{hash_hex}'
 
 
+def get_starknet_client(
+    network_name: enums.NetworkNames,
+    proxy: dict[str, str] = None
+) -> FullNodeClient:
+    network = constants.NETWORKS[network_name]
+
+    return FullNodeClient(
+        network.rpc_url,
+        proxy=proxy if proxy is None else proxy['http'],
+        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36'
+    )
+
+
 def get_account(
     network_name: enums.NetworkNames,
     private_key: str,
@@ -45,10 +131,9 @@ def get_account(
 ) -> Account:
     network = constants.NETWORKS[network_name]
 
-    client = FullNodeClient(
-        network.rpc_url,
-        proxy=proxy if proxy is None else proxy['http'],
-        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36'
+    client = get_starknet_client(
+        network_name=network_name,
+        proxy=proxy
     )
 
     key_pair = KeyPair.from_private_key(
@@ -100,6 +185,137 @@ def get_starknet_erc20_contract(
     )
 
 
+class PooledAsyncHTTPProvider(AsyncHTTPProvider):
+    """
+    Async HTTP provider that keeps one aiohttp session per provider instead of
+    the session cache shared by endpoint URL, so different proxies don't mix.
+    """
+
+    def __init__(
+        self,
+        endpoint_uri: str,
+        proxy: dict[str, str] = None
+    ):
+        super().__init__(endpoint_uri)
+        self.proxy_url = None if proxy is None else proxy['http']
+        self.session = None
+        self.session_loop = None
+        self.chain_id_response = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if (
+            self.session is None
+            or self.session.closed
+            or self.session_loop is not asyncio.get_running_loop()
+        ):
+            connector = None
+            if self.proxy_url and self.proxy_url.startswith('socks5://'):
+                connector = ProxyConnector.from_url(url=self.proxy_url, rdns=True)
+
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=EVM_REQUEST_TIMEOUT)
+            )
+            self.session_loop = asyncio.get_running_loop()
+
+        return self.session
+
+    async def reset_session(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def post(self, request_data: bytes) -> bytes:
+        async with self.get_session().post(
+            self.endpoint_uri,
+            data=request_data,
+            headers=self.get_request_headers(),
+            proxy=None if self.proxy_url and self.proxy_url.startswith('socks5://') else self.proxy_url
+        ) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    async def make_request(self, method, params):
+        if method == 'eth_chainId' and self.chain_id_response is not None:
+            return self.chain_id_response
+
+        response = self.decode_rpc_response(
+            await self.post(self.encode_rpc_request(method, params))
+        )
+
+        if method == 'eth_chainId' and 'result' in response:
+            self.chain_id_response = response
+
+        return response
+
+    async def make_batch_request(self, requests_params: list[tuple[str, list]]) -> list:
+        request_data = json.dumps([
+            {
+                'jsonrpc': '2.0',
+                'method': method,
+                'params': params,
+                'id': index
+            }
+            for index, (method, params) in enumerate(requests_params)
+        ]).encode()
+
+        responses = json.loads(await self.post(request_data))
+
+        if not isinstance(responses, list):
+            raise ValueError(f'Batch request failed: {responses}')
+
+        results = []
+
+        for response in sorted(responses, key=lambda response: response['id']):
+            if 'error' in response:
+                raise ValueError(response['error'])
+            results.append(response['result'])
+
+        return results
+
+
+def get_async_web3(
+    network_name: enums.NetworkNames,
+    proxy: dict[str, str] = None
+) -> AsyncWeb3:
+    pool = getattr(get_async_web3, 'pool', {})
+
+    key = (network_name, None if proxy is None else proxy['http'])
+
+    if key not in pool:
+        pool[key] = AsyncWeb3(
+            PooledAsyncHTTPProvider(
+                constants.NETWORKS[network_name].rpc_url,
+                proxy=proxy
+            )
+        )
+        get_async_web3.pool = pool
+
+    return pool[key]
+
+
+async def get_evm_balances(
+    network_name: enums.NetworkNames,
+    addresses: list[str],
+    block_identifier: int | str = 'latest',
+    proxy: dict[str, str] = None
+) -> list[int]:
+    if not addresses:
+        return []
+
+    if isinstance(block_identifier, int):
+        block_identifier = hex(block_identifier)
+
+    web3 = get_async_web3(network_name, proxy)
+
+    results = await web3.provider.make_batch_request([
+        ('eth_getBalance', [address, block_identifier])
+        for address in addresses
+    ])
+
+    return [int(result, 16) for result in results]
+
+
 def sleep(sleep_time: float):
     logging.info(f'[Sleep] Sleeping for {round(sleep_time, 2)} seconds. If you want to skip this, press Ctrl+C')
     try:
@@ -115,7 +331,44 @@ def random_sleep():
     sleep(sleep_time)
 
 
-def estimate_message_fee(
+async def async_sleep(sleep_time: float):
+    logging.info(f'[Sleep] Sleeping for {round(sleep_time, 2)} seconds')
+    await asyncio.sleep(sleep_time)
+
+
+async def async_random_sleep(
+    min_sleep_time: float = None,
+    max_sleep_time: float = None
+):
+    if min_sleep_time is None:
+        min_sleep_time = getattr(random_sleep, 'min_sleep_time', 1)
+    if max_sleep_time is None:
+        max_sleep_time = getattr(random_sleep, 'max_sleep_time', 10)
+    sleep_time = round(random.uniform(min_sleep_time, max_sleep_time), 2)
+    await async_sleep(sleep_time)
+
+
+async def async_input(message: str) -> str:
+    """
+    input() in a worker thread, so background tasks keep running while the
+    user answers.
+    """
+    return await asyncio.to_thread(input, message)
+
+
+async def confirm(message: str) -> bool:
+    """
+    Waits for the user to press Enter. In background runs nobody is there to
+    answer, so False is returned right away.
+    """
+    if not interactive.get():
+        return False
+
+    await async_input(message)
+    return True
+
+
+async def estimate_message_fee(
     client: FullNodeClient,
     from_address: str,
     to_address: str,
@@ -123,72 +376,77 @@ def estimate_message_fee(
     payload: list[str],
     proxy: dict[str, str] = None
 ) -> dict[str, Union[int, str]]:
-    response = requests.post(
-        url=f'{client._client.url}/estimate_message_fee?blockNumber=pending',
+    status, fee_json = await http_request(
+        'POST',
+        f'{client._client.url}/estimate_message_fee?blockNumber=pending',
+        proxy=proxy,
         json={
             'entry_point_selector': entry_point_selector,
             'from_address': from_address,
             'payload': payload,
             'to_address': to_address
-        },
-        proxies=proxy
+        }
     )
 
-    if response.status_code != 200:
-        logging.error(f'[Estimate Message Fee] Failed to estimate message fee: {response.text}')
+    if status != 200:
+        logging.error(f'[Estimate Message Fee] Failed to estimate message fee: {status} {fee_json}')
         return
 
-    return response.json()
+    return fee_json
 
 
-def suggest_gas_fees(
+async def suggest_gas_fees(
     network_name: enums.NetworkNames,
     proxy: dict[str, str] = None
 ):
-    last_update = getattr(suggest_gas_fees, 'last_update', dt.datetime.fromtimestamp(0))
-    last_network = getattr(suggest_gas_fees, 'network_name', None)
-    if dt.datetime.now() - last_update > dt.timedelta(seconds=10) or last_network != network_name:
+    last_updates = getattr(suggest_gas_fees, 'last_updates', {})
+    gas_prices = getattr(suggest_gas_fees, 'gas_prices', {})
+    last_update = last_updates.get(network_name, dt.datetime.fromtimestamp(0))
+    if dt.datetime.now() - last_update > dt.timedelta(seconds=10):
         try:
-            response = requests.get(
-                url=f'https://gas-api.metaswap.codefi.network/networks/{network_name.value}/suggestedGasFees',
-                proxies=proxy
+            status, gas_json = await http_request(
+                'GET',
+                f'https://gas-api.metaswap.codefi.network/networks/{network_name.value}/suggestedGasFees',
+                proxy=proxy
             )
         except Exception:
             logging.error(f'[Gas] Failed to get gas price for {network_name.value}')
             return None
         else:
-            if response.status_code != 200:
-                logging.error(f'[Gas] Failed to get gas price for {network_name.value}: {response.text}')
+            if status != 200 or not gas_json:
+                logging.error(f'[Gas] Failed to get gas price for {network_name.value}: {status} {gas_json}')
                 return None
-            gas_json = response.json()
             medium_gas = gas_json['medium']
             gas_price = {
                 'maxFeePerGas': Web3.to_wei(medium_gas['suggestedMaxFeePerGas'], 'gwei'),
                 'maxPriorityFeePerGas': Web3.to_wei(medium_gas['suggestedMaxPriorityFeePerGas'], 'gwei')
             }
-            suggest_gas_fees.gas_price = gas_price
-            suggest_gas_fees.last_update = dt.datetime.now()
-            suggest_gas_fees.network_name = network_name
+            gas_prices[network_name] = gas_price
+            last_updates[network_name] = dt.datetime.now()
+            suggest_gas_fees.gas_prices = gas_prices
+            suggest_gas_fees.last_updates = last_updates
             return gas_price
     else:
-        return getattr(suggest_gas_fees, 'gas_price', None)
+        return gas_prices.get(network_name)
 
 
-def wait_for_transaction_receipt(
-    web3: Eth,
+async def wait_for_transaction_receipt(
+    web3: AsyncEth,
     txn_hash: Hash32 | HexBytes | HexStr,
     timeout: int = 300,
     logging_prefix: str = 'Receipt'
 ) -> TxReceipt:
     try:
-        receipt = web3.wait_for_transaction_receipt(
+        receipt = await web3.wait_for_transaction_receipt(
             transaction_hash=txn_hash,
             timeout=timeout
         )
     except Exception as e:
-        answer = input(f'[{logging_prefix}] Failed to get transaction receipt. Press Enter when transaction will be processed')
+        if not await confirm(f'[{logging_prefix}] Failed to get transaction receipt. Press Enter when transaction will be processed'):
+            logging.error(f'[{logging_prefix}] Failed to get transaction receipt: {e}')
+            return None
         try:
-            receipt = web3.wait_for_transaction_receipt(
+            receipt = await web3.wait_for_transaction_receipt(
                 transaction_hash=txn_hash,
                 timeout=5
             )
@@ -242,87 +500,687 @@ def test_proxy(proxy: dict[str, str]) -> str | bool:
             return True
 
 
+class GasMonitor:
+    def __init__(
+        self,
+        network_name: enums.NetworkNames,
+        poll_interval: float = GAS_POLL_INTERVAL,
+        history_size: int = GAS_HISTORY_SIZE,
+        max_age: float = GAS_MAX_AGE
+    ):
+        self.network_name = network_name
+        self.poll_interval = poll_interval
+        self.max_age = max_age
+        self.history = deque(maxlen=history_size)
+        self.client = None
+        self.proxy = None
+        self.failed_polls = 0
+        self.poll_task = None
+        self.condition = None
+
+    def build_client(self):
+        if self.network_name in GAS_EVM_NETWORKS:
+            return Web3(
+                Web3.HTTPProvider(
+                    constants.NETWORKS[self.network_name].rpc_url,
+                    request_kwargs={
+                        'proxies': self.proxy
+                    }
+                )
+            )
+
+        return get_starknet_client(self.network_name, self.proxy)
+
+    async def fetch_gas_price(self) -> float:
+        if self.client is None:
+            self.client = self.build_client()
+
+        if self.network_name in GAS_EVM_NETWORKS:
+            gas_wei = await asyncio.to_thread(lambda: int(self.client.eth.gas_price))
+            return float(Web3.from_wei(gas_wei, 'gwei'))
+
+        last_block = await self.client.get_block('latest')
+
+        return float(Web3.from_wei(last_block.gas_price, 'gwei'))
+
+    async def poll(self):
+        while True:
+            try:
+                gas_price = await self.fetch_gas_price()
+            except Exception as e:
+                logging.error(f'[Gas] Failed to get gas price for {self.network_name} network: {type(e)} - {e}')
+
+                self.failed_polls += 1
+                if self.failed_polls >= GAS_MAX_FAILED_POLLS:
+                    logging.warning(f'[Gas] Reconnecting gas monitor for {self.network_name} network')
+                    self.client = None
+                    self.failed_polls = 0
+            else:
+                self.failed_polls = 0
+                self.history.append((time.time(), gas_price))
+                async with self.condition:
+                    self.condition.notify_all()
+
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self, proxy: dict[str, str] = None):
+        # The client keeps its proxy until it fails, then it is rebuilt with
+        # the proxy of the account that used the monitor last
+        if proxy is not None:
+            self.proxy = proxy
+
+        if (
+            self.poll_task is not None
+            and not self.poll_task.done()
+            and self.poll_task.get_loop() is asyncio.get_running_loop()
+        ):
+            return
+
+        self.condition = asyncio.Condition()
+        self.poll_task = asyncio.create_task(self.poll())
+
+    @property
+    def current(self) -> float | None:
+        if not self.history:
+            return None
+        return self.history[-1][1]
+
+    @property
+    def recent(self) -> float | None:
+        """
+        Latest gas price if it was read less than max_age seconds ago.
+        """
+        if not self.history:
+            return None
+        polled_at, gas_price = self.history[-1]
+        if time.time() - polled_at > self.max_age:
+            return None
+        return gas_price
+
+    @property
+    def min(self) -> float | None:
+        if not self.history:
+            return None
+        return min(gas_price for _, gas_price in self.history)
+
+    def percentile(self, percent: float) -> float | None:
+        if not self.history:
+            return None
+        gas_prices = sorted(gas_price for _, gas_price in self.history)
+        return gas_prices[min(int(len(gas_prices) * percent / 100), len(gas_prices) - 1)]
+
+    async def wait_for_gas(
+        self,
+        max_gas_price: float = float('inf'),
+        proxy: dict[str, str] = None,
+        timeout: float = None
+    ) -> float:
+        self.start(proxy)
+
+        async with self.condition:
+            await asyncio.wait_for(
+                self.condition.wait_for(
+                    lambda: self.recent is not None and self.recent <= max_gas_price
+                ),
+                timeout=timeout
+            )
+
+        return self.current
+
+
+def get_gas_monitor(network_name: enums.NetworkNames) -> GasMonitor | None:
+    if network_name not in GAS_EVM_NETWORKS | GAS_STARKNET_NETWORKS:
+        return None
+
+    monitors = getattr(get_gas_monitor, 'monitors', {})
+
+    if network_name not in monitors:
+        monitors[network_name] = GasMonitor(network_name)
+        get_gas_monitor.monitors = monitors
+
+    return monitors[network_name]
+
+
+class GasParkingQueue:
+    """
+    Accounts waiting for gas, kept in one max-heap per network keyed by
+    the account's gas ceiling, so the accounts that can run first are on top.
+    Accounts that are ready together are handed out with the most tasks left
+    first, so most tasks run while the gas is low. Among equal ones the lowest
+    ceilings go first, as they are the first to be priced out again.
+    """
+
+    def __init__(self):
+        self.parked = {}
+        self.counter = itertools.count()
+
+    def __len__(self) -> int:
+        return sum(len(heap) for heap in self.parked.values())
+
+    def park(
+        self,
+        network_name: enums.NetworkNames,
+        max_gas_price: float,
+        item,
+        tasks_left: int = 1
+    ):
+        heapq.heappush(
+            self.parked.setdefault(network_name, []),
+            (-max_gas_price, next(self.counter), tasks_left, item)
+        )
+
+    def pop_ready(self) -> list:
+        ready = []
+
+        for network_name, heap in self.parked.items():
+            current_gas_price = get_gas_monitor(network_name).recent
+            while heap and current_gas_price is not None and -heap[0][0] >= current_gas_price:
+                max_gas_price, _, tasks_left, item = heapq.heappop(heap)
+                ready.append((-tasks_left, -max_gas_price, item))
+
+        ready.sort(key=lambda ready_item: ready_item[:2])
+
+        return [item for *_, item in ready]
+
+    async def wait_ready(self):
+        waiters = [
+            asyncio.create_task(get_gas_monitor(network_name).wait_for_gas(-heap[0][0]))
+            for network_name, heap in self.parked.items()
+            if heap
+        ]
+
+        if not waiters:
+            return
+
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+
 async def get_gas_price(
     network_name: enums.NetworkNames,
     proxy: dict[str, str] = None
 ) -> float:
-    if network_name in {None, enums.NetworkNames.Exchange}:
-        return 0
+    gas_monitor = get_gas_monitor(network_name)
 
-    network = constants.NETWORKS[network_name]
+    if gas_monitor is None:
+        return 0
 
-    if network_name in {
-        enums.NetworkNames.ETH,
-        enums.NetworkNames.Goerli
-    }:
-        web3 = Web3(
-            Web3.HTTPProvider(
-                network.rpc_url,
-                request_kwargs={
-                    'proxies': proxy
-                }
+    try:
+        return await gas_monitor.wait_for_gas(
+            proxy=proxy,
+            timeout=GAS_READ_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        raise TimeoutError(f'No gas price for {network_name} network in {GAS_READ_TIMEOUT} seconds') from None
+
+
+class ArrivalWatcher:
+    """
+    Pending inbound transfers on one network behind one proxy. Every new block
+    the balances of all watched addresses are read in a single batched request
+    and the futures of the transfers that have arrived are resolved.
+    """
+
+    def __init__(
+        self,
+        network_name: enums.NetworkNames,
+        proxy: dict[str, str] = None,
+        poll_interval: float = ARRIVAL_POLL_INTERVAL
+    ):
+        self.network_name = network_name
+        self.proxy = proxy
+        self.poll_interval = poll_interval
+        self.pending = {}
+        self.block_number = None
+        self.failed_checks = 0
+        self.poll_task = None
+        self.wakeup = None
+
+    async def fetch_block_number(self) -> int:
+        if self.network_name in GAS_STARKNET_NETWORKS:
+            return await get_starknet_client(self.network_name, self.proxy).get_block_number()
+
+        return await get_async_web3(self.network_name, self.proxy).eth.block_number
+
+    async def fetch_balances(
+        self,
+        keys: list[tuple[str, int | None]],
+        block_number: int
+    ) -> list[int]:
+        if self.network_name not in GAS_STARKNET_NETWORKS:
+            return await get_evm_balances(
+                network_name=self.network_name,
+                addresses=[address for address, _ in keys],
+                block_identifier=block_number,
+                proxy=self.proxy
             )
+
+        results = await get_starknet_client(self.network_name, self.proxy).call_contract_batch(
+            calls=[
+                Call(
+                    to_addr=token_address,
+                    selector=ERC20_BALANCE_OF_SELECTOR,
+                    calldata=[int(address, 16)]
+                )
+                for address, token_address in keys
+            ],
+            block_number=block_number
         )
-        gas_wei = int(web3.eth.gas_price)
-
-        return float(Web3.from_wei(gas_wei, 'gwei'))
-    elif network_name in {
-        enums.NetworkNames.Starknet,
-        enums.NetworkNames.StarknetTestnet
-    }:
-        client = FullNodeClient(
-            network.rpc_url,
-            proxy=proxy if proxy is None else proxy['http'],
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36'
+
+        return [low + (high << 128) for low, high, *_ in results]
+
+    async def check(self):
+        for key in list(self.pending):
+            self.pending[key] = [entry for entry in self.pending[key] if not entry['future'].done()]
+            if not self.pending[key]:
+                del self.pending[key]
+
+        if not self.pending:
+            return
+
+        has_new_entries = any(
+            entry['balance_before'] is None
+            for entries in self.pending.values()
+            for entry in entries
         )
 
-        last_block = await client.get_block('latest')
+        block_number = await self.fetch_block_number()
+
+        if block_number == self.block_number and not has_new_entries:
+            return
+
+        keys = list(self.pending)
+        balances = await self.fetch_balances(keys, block_number)
+
+        for key, balance in zip(keys, balances):
+            for entry in self.pending[key]:
+                if entry['future'].done():
+                    continue
+                if entry['balance_before'] is None:
+                    entry['balance_before'] = balance
+                    entry['started'].set()
+                elif balance - entry['balance_before'] >= entry['min_amount']:
+                    entry['future'].set_result(balance - entry['balance_before'])
+
+        self.block_number = block_number
+
+    async def reconnect(self):
+        logging.warning(f'[Arrival] Reconnecting arrival watcher for {self.network_name} network')
+
+        # Starknet clients are created for every request, only the pooled
+        # EVM session has to be replaced
+        if self.network_name not in GAS_STARKNET_NETWORKS:
+            await get_async_web3(self.network_name, self.proxy).provider.reset_session()
+
+    async def poll(self):
+        while self.pending:
+            try:
+                await self.check()
+            except Exception as e:
+                logging.warning(f'[Arrival] Failed to check balances on {self.network_name}: {type(e)} - {e}')
+
+                self.failed_checks += 1
+                if self.failed_checks >= ARRIVAL_MAX_FAILED_CHECKS:
+                    self.failed_checks = 0
+                    with contextlib.suppress(Exception):
+                        await self.reconnect()
+            else:
+                self.failed_checks = 0
+
+            self.wakeup.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.poll_interval)
+
+    def start(self):
+        if (
+            self.poll_task is not None
+            and not self.poll_task.done()
+            and self.poll_task.get_loop() is asyncio.get_running_loop()
+        ):
+            self.wakeup.set()
+            return
+
+        self.wakeup = asyncio.Event()
+        self.poll_task = asyncio.create_task(self.poll())
+
+    async def expect(
+        self,
+        address: str,
+        token_address: int = None,
+        min_amount: int = 1
+    ) -> asyncio.Future:
+        if self.network_name in GAS_STARKNET_NETWORKS:
+            address = extend_hex(address, 64)
+            if token_address is None:
+                token_address = constants.NETWORK_TOKENS[self.network_name, enums.TokenNames.ETH].int_contract_address
+        else:
+            address = Web3.to_checksum_address(address)
 
-        return float(Web3.from_wei(last_block.gas_price, 'gwei'))
+        entry = {
+            'balance_before': None,
+            'min_amount': min_amount,
+            'started': asyncio.Event(),
+            'future': asyncio.get_running_loop().create_future()
+        }
+        self.pending.setdefault((address, token_address), []).append(entry)
 
-    return 0
+        self.start()
 
+        try:
+            await entry['started'].wait()
+        except asyncio.CancelledError:
+            entry['future'].cancel()
+            raise
 
-def get_token_price(token_name: enums.TokenNames, proxy: dict[str, str]) -> float:
-    if token_name in constants.STABLECOINS:
-        return 1
+        return entry['future']
 
-    last_update = getattr(get_token_price, 'last_update', {})
 
-    last_price = None
+def get_arrival_watcher(
+    network_name: enums.NetworkNames,
+    proxy: dict[str, str] = None
+) -> ArrivalWatcher:
+    """
+    One watcher per network and proxy, so the addresses of an account are only
+    read through its own proxy and a failing proxy only delays its own accounts.
+    """
+    watchers = getattr(get_arrival_watcher, 'watchers', {})
 
-    if token_name in last_update:
-        last_price = last_update[token_name]['price']
-        if dt.datetime.now() - last_update[token_name]['time'] < dt.timedelta(minutes=1):
-            return last_price
+    # Watchers of finished accounts are dropped
+    for key, watcher in list(watchers.items()):
+        if not watcher.pending and (watcher.poll_task is None or watcher.poll_task.done()):
+            del watchers[key]
+
+    key = (network_name, None if proxy is None else proxy['http'])
+
+    if key not in watchers:
+        watchers[key] = ArrivalWatcher(network_name, proxy)
+        get_arrival_watcher.watchers = watchers
+
+    return watchers[key]
+
+
+async def expect_arrival(
+    network_name: enums.NetworkNames,
+    address: str,
+    token_address: int = None,
+    min_amount: int = 1,
+    proxy: dict[str, str] = None
+) -> asyncio.Future:
+    """
+    Records the current balance of the address and returns a future that is
+    resolved with the received amount once the balance has grown by min_amount.
+    """
+    return await get_arrival_watcher(network_name, proxy).expect(
+        address=address,
+        token_address=token_address,
+        min_amount=min_amount
+    )
+
+
+async def wait_for_arrival(
+    network_name: enums.NetworkNames,
+    address: str,
+    token_address: int = None,
+    min_amount: int = 1,
+    timeout: float = ARRIVAL_TIMEOUT,
+    proxy: dict[str, str] = None
+) -> int | None:
+    async def wait() -> int:
+        arrival = await expect_arrival(
+            network_name=network_name,
+            address=address,
+            token_address=token_address,
+            min_amount=min_amount,
+            proxy=proxy
+        )
+        return await arrival
 
-    last_token = getattr(get_token_price, 'token_price', None)
-    coingecko_name = constants.COINGECKO_NAMES[token_name]
+    # The timeout also covers reading the starting balance, which never
+    # finishes while the RPC is unreachable
     try:
-        response = requests.get(
-            f'https://api.coingecko.com/api/v3/simple/price?ids={coingecko_name}&vs_currencies=usd',
-            proxies=proxy
+        return await asyncio.wait_for(wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        return None
+
+
+class OraclePriceProvider:
+    def __init__(
+        self,
+        network_name: enums.NetworkNames = enums.NetworkNames.Starknet,
+        block_poll_interval: float = ORACLE_BLOCK_POLL_INTERVAL
+    ):
+        self.network_name = network_name
+        self.block_poll_interval = block_poll_interval
+        self.block_number = None
+        self.prices = {}
+        self.updated_at = {}
+        self.last_block_check = 0
+        self.update_task = None
+
+    async def update(self, client: FullNodeClient):
+        self.last_block_check = time.time()
+
+        block_number = await client.get_block_number()
+
+        if block_number == self.block_number:
+            return
+
+        tokens = list(constants.ORACLE_PAIR_IDS)
+
+        results = await client.call_contract_batch(
+            calls=[
+                Call(
+                    to_addr=int(constants.ORACLE_ADDRESSES[self.network_name], 16),
+                    selector=ORACLE_SPOT_MEDIAN_SELECTOR,
+                    calldata=[constants.ORACLE_PAIR_IDS[token_name]]
+                )
+                for token_name in tokens
+            ],
+            block_number=block_number
         )
-        price = response.json()[coingecko_name]['usd']
-    except Exception as e:
-        logging.warning(f'[Token Price] Failed to get {token_name} price: {e}')
+
+        prices = {}
+        updated_at = {}
+
+        for token_name, (price, decimals, last_updated_timestamp, *_) in zip(tokens, results):
+            if price:
+                prices[token_name] = price / 10 ** decimals
+                updated_at[token_name] = last_updated_timestamp
+
+        self.prices = prices
+        self.updated_at = updated_at
+        self.block_number = block_number
+
+    async def get_prices(
+        self,
+        client: FullNodeClient = None,
+        proxy: dict[str, str] = None
+    ) -> dict[enums.TokenNames, float]:
+        if time.time() - self.last_block_check > self.block_poll_interval:
+            if (
+                self.update_task is None
+                or self.update_task.done()
+                or self.update_task.get_loop() is not asyncio.get_running_loop()
+            ):
+                if client is None:
+                    client = get_starknet_client(self.network_name, proxy)
+                self.update_task = asyncio.create_task(self.update(client))
+
+        if (
+            self.update_task is not None
+            and not self.update_task.done()
+            and self.update_task.get_loop() is asyncio.get_running_loop()
+        ):
+            await asyncio.shield(self.update_task)
+
+        return self.prices
+
+
+def get_oracle_price_provider(network_name: enums.NetworkNames) -> OraclePriceProvider:
+    providers = getattr(get_oracle_price_provider, 'providers', {})
+
+    if network_name not in providers:
+        providers[network_name] = OraclePriceProvider(network_name)
+        get_oracle_price_provider.providers = providers
+
+    return providers[network_name]
+
+
+async def get_oracle_price(
+    network_name: enums.NetworkNames,
+    token_name: enums.TokenNames,
+    client: FullNodeClient = None,
+    proxy: dict[str, str] = None
+) -> float:
+    prices = await get_oracle_price_provider(network_name).get_prices(
+        client=client,
+        proxy=proxy
+    )
+
+    return prices[token_name]
+
+
+async def http_request(
+    method: str,
+    url: str,
+    proxy: dict[str, str] = None,
+    timeout: float = HTTP_REQUEST_TIMEOUT,
+    **kwargs
+) -> tuple[int, dict | list | None]:
+    proxy_url = None if proxy is None else proxy['http']
+
+    connector = None
+    if proxy_url and proxy_url.startswith('socks5://'):
+        connector = ProxyConnector.from_url(url=proxy_url, rdns=True)
+        proxy_url = None
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async with session.request(
+            method,
+            url,
+            proxy=proxy_url,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            **kwargs
+        ) as response:
+            try:
+                response_json = await response.json(content_type=None)
+            except ValueError:
+                response_json = None
+            return response.status, response_json
+
+
+class TokenPriceService:
+    def __init__(
+        self,
+        network_name: enums.NetworkNames = enums.NetworkNames.Starknet,
+        ttl: float = TOKEN_PRICE_TTL,
+        oracle_max_age: float = ORACLE_PRICE_MAX_AGE
+    ):
+        self.network_name = network_name
+        self.ttl = ttl
+        self.oracle_max_age = oracle_max_age
+        self.prices = {}
+        self.last_update = 0
+        self.refresh_task = None
+
+    async def fetch_prices(self, proxy: dict[str, str] = None) -> dict[enums.TokenNames, float]:
+        proxy_url = None if proxy is None else proxy['http']
+
+        connector = None
+        if proxy_url and proxy_url.startswith('socks5://'):
+            connector = ProxyConnector.from_url(url=proxy_url, rdns=True)
+            proxy_url = None
+
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async with session.get(
+                COINGECKO_PRICES_URL,
+                params={
+                    'ids': ','.join(sorted(set(constants.COINGECKO_NAMES.values()))),
+                    'vs_currencies': 'usd'
+                },
+                proxy=proxy_url,
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                prices_json = await response.json(content_type=None)
+
+        return {
+            token_name: prices_json[coingecko_name]['usd']
+            for token_name, coingecko_name in constants.COINGECKO_NAMES.items()
+            if coingecko_name in prices_json
+        }
+
+    async def refresh(self, proxy: dict[str, str] = None):
+        try:
+            prices = await self.fetch_prices(proxy)
+        except Exception as e:
+            logging.warning(f'[Token Price] Failed to get token prices: {e}')
+            prices = {}
+
+        missing_tokens = set(constants.COINGECKO_NAMES) - set(prices)
+        if missing_tokens and self.prices:
+            logging.warning(f'[Token Price] Using last known prices for {", ".join(map(str, missing_tokens))}')
+
+        self.prices.update(prices)
+        self.last_update = time.time()
+
+    def schedule_refresh(self, proxy: dict[str, str] = None) -> asyncio.Task:
+        if (
+            self.refresh_task is None
+            or self.refresh_task.done()
+            or self.refresh_task.get_loop() is not asyncio.get_running_loop()
+        ):
+            self.refresh_task = asyncio.create_task(self.refresh(proxy))
+
+        return self.refresh_task
+
+    async def get_price(
+        self,
+        token_name: enums.TokenNames,
+        proxy: dict[str, str] = None
+    ) -> float:
+        if token_name in constants.STABLECOINS:
+            return 1
+
+        if token_name in constants.ORACLE_PAIR_IDS:
+            oracle_price_provider = get_oracle_price_provider(self.network_name)
+
+            try:
+                prices = await oracle_price_provider.get_prices(proxy=proxy)
+            except Exception as e:
+                logging.warning(f'[Token Price] Failed to get {token_name} price from oracle: {e}')
+            else:
+                if token_name in prices:
+                    price_age = time.time() - oracle_price_provider.updated_at[token_name]
+                    if price_age <= self.oracle_max_age:
+                        return prices[token_name]
+                    logging.warning(f'[Token Price] Oracle {token_name} price was updated {int(price_age)} seconds ago, using CoinGecko price')
+
+        if time.time() - self.last_update > self.ttl:
+            refresh_task = self.schedule_refresh(proxy)
+            if token_name not in self.prices:
+                await asyncio.shield(refresh_task)
+
+        if token_name in self.prices:
+            return self.prices[token_name]
+
         default_price = constants.DEFAULT_PRICES[token_name]
-        if last_price is not None:
-            price = last_price
-            logging.warning(f'[Token Price] Setting {token_name} price to last known price: {last_price}')
-        else:
-            price = default_price
-            logging.warning(f'[Token Price] Setting {token_name} price to default price: {default_price}')
-    last_update[token_name] = {
-        'price': price,
-        'time': dt.datetime.now()
-    }
-    get_token_price.last_update = last_update
-    return price
-
-
-def usd_to_token(token_name: enums.TokenNames, usd: float, proxy: dict[str, str]) -> float:
-    token_price = get_token_price(token_name, proxy)
+        logging.warning(f'[Token Price] Setting {token_name} price to default price: {default_price}')
+
+        return default_price
+
+
+token_prices = TokenPriceService()
+
+
+async def get_token_price(token_name: enums.TokenNames, proxy: dict[str, str] = None) -> float:
+    return await token_prices.get_price(token_name, proxy)
+
+
+async def usd_to_token(token_name: enums.TokenNames, usd: float, proxy: dict[str, str]) -> float:
+    token_price = await get_token_price(token_name, proxy)
     return usd / token_price
 
 
@@ -394,7 +1252,9 @@ async def wait_for_starknet_receipt(
             raise
         except BaseException as e:
             if time.time() - start_time > wait_seconds:
-                input(f'[{logging_prefix}] Failed to get transaction receipt. Press Enter when transaction will be processed')
+                if not await confirm(f'[{logging_prefix}] Failed to get transaction receipt. Press Enter when transaction will be processed'):
+                    logging.error(f'[{logging_prefix}] Failed to get transaction receipt: {e}')
+                    raise
                 try:
                     return await client.wait_for_tx(transaction_hash)
                 except BaseException as new_e:
@@ -432,7 +1292,7 @@ async def get_tokens_with_balance(
 
         if min_amount_usd is not None:
             min_amount = max(
-                usd_to_token(token_name, min_amount_usd, proxy),
+                await usd_to_token(token_name, min_amount_usd, proxy),
                 min_amount
             )
 
@@ -440,3 +1300,208 @@ async def get_tokens_with_balance(
             tokens_with_balance.append(token_name)
 
     return tokens_with_balance
+
+
+async def get_block_timestamp(
+    network_name: enums.NetworkNames,
+    client: FullNodeClient = None,
+    proxy: dict[str, str] = None
+) -> int:
+    """
+    Timestamp of the pending block. The block is requested at most once per
+    BLOCK_TIMESTAMP_TTL seconds per network, in between the cached timestamp
+    is advanced by the local clock.
+    """
+    timestamps = getattr(get_block_timestamp, 'timestamps', {})
+
+    if network_name in timestamps:
+        block_timestamp, fetched_at = timestamps[network_name]
+        if time.time() - fetched_at < BLOCK_TIMESTAMP_TTL:
+            return int(block_timestamp + time.time() - fetched_at)
+
+    if client is None:
+        client = get_starknet_client(network_name, proxy)
+
+    block_timestamp = (await client.get_block()).timestamp
+
+    timestamps[network_name] = (block_timestamp, time.time())
+    get_block_timestamp.timestamps = timestamps
+
+    return block_timestamp
+
+
+async def resolve_token_amount(
+    account: Account,
+    token: constants.NetworkToken,
+    amount: float = None,
+    percentage: float = None
+) -> tuple[int, float]:
+    if amount is not None:
+        return int(amount * 10 ** token.decimals), amount
+
+    amount_in_wei = await account.get_balance(token.contract_address)
+
+    if percentage != 100:
+        amount_in_wei = int(amount_in_wei * percentage / 100)
+
+    return amount_in_wei, amount_in_wei / 10 ** token.decimals
+
+
+@dataclass
+class SwapInputs:
+    amount_in_wei: int
+    amount: float
+    quote: Any
+    deadline: int | None
+    nonce: int
+
+
+async def prepare_swap(
+    account: Account,
+    network_name: enums.NetworkNames,
+    token: constants.NetworkToken,
+    get_quote: Callable[[int], Awaitable],
+    *,
+    amount: float = None,
+    percentage: float = None,
+    deadline: int = None
+) -> SwapInputs:
+    """
+    Collects everything a swap needs before its calls can be built. The
+    balance and the quote depend on each other, but not on the block
+    timestamp or on the account nonce, so the three are requested concurrently.
+    deadline is the number of seconds added to the block timestamp.
+    """
+    async def fetch_quote():
+        amount_in_wei, resolved_amount = await resolve_token_amount(
+            account=account,
+            token=token,
+            amount=amount,
+            percentage=percentage
+        )
+        return amount_in_wei, resolved_amount, await get_quote(amount_in_wei)
+
+    async def fetch_deadline():
+        if deadline is None:
+            return None
+        return await get_block_timestamp(network_name, account.client) + deadline
+
+    (amount_in_wei, amount, quote), deadline_timestamp, nonce = await asyncio.gather(
+        fetch_quote(),
+        fetch_deadline(),
+        account.get_nonce()
+    )
+
+    return SwapInputs(
+        amount_in_wei=amount_in_wei,
+        amount=amount,
+        quote=quote,
+        deadline=deadline_timestamp,
+        nonce=nonce
+    )
+
+
+@dataclass
+class Approval:
+    token_address: str | int
+    spender: int
+    amount: int
+
+    def get_key(self, account: Account) -> tuple[int, int, int]:
+        token_address = self.token_address
+        if isinstance(token_address, str):
+            token_address = int(token_address, 16)
+        return account.address, token_address, self.spender
+
+
+async def get_allowances(
+    account: Account,
+    approvals: list[Approval]
+) -> list[int]:
+    """
+    Allowances cached per (owner, token, spender). The ones that are not cached
+    yet are read in one batch request.
+    """
+    allowances = getattr(get_allowances, 'allowances', {})
+    get_allowances.allowances = allowances
+
+    keys = [approval.get_key(account) for approval in approvals]
+    missing_keys = list(dict.fromkeys(key for key in keys if key not in allowances))
+
+    if missing_keys:
+        try:
+            results = await account.client.call_contract_batch(
+                calls=[
+                    Call(
+                        to_addr=token_address,
+                        selector=ERC20_ALLOWANCE_SELECTOR,
+                        calldata=[owner, spender]
+                    )
+                    for owner, token_address, spender in missing_keys
+                ]
+            )
+        except Exception as e:
+            logging.warning(f'[Allowance] Failed to read allowances, approving anyway: {e}')
+            return [0] * len(keys)
+
+        for key, (low, high, *_) in zip(missing_keys, results):
+            allowances[key] = low + (high << 128)
+
+    return [allowances[key] for key in keys]
+
+
+async def get_approve_calls(
+    account: Account,
+    approvals: list[Approval]
+) -> list[Call]:
+    calls = []
+
+    for approval, allowance in zip(approvals, await get_allowances(account, approvals)):
+        if allowance >= approval.amount:
+            continue
+
+        token_contract = get_starknet_erc20_contract(
+            token_address=approval.token_address,
+            provider=account
+        )
+
+        calls.append(token_contract.functions['approve'].prepare(
+            spender=approval.spender,
+            amount=MAX_ALLOWANCE if APPROVE_MAX_ALLOWANCE else approval.amount
+        ))
+
+    return calls
+
+
+def update_allowances(
+    account: Account,
+    approvals: list[Approval],
+    succeeded: bool
+):
+    """
+    Accounts for the approvals and spendings of a finished transaction. The
+    spent amount is assumed to be the full approved amount, so the cached
+    allowance can only be lower than the real one. Allowances touched by a
+    failed transaction are read again next time.
+    """
+    allowances = getattr(get_allowances, 'allowances', {})
+
+    for approval in approvals:
+        key = approval.get_key(account)
+
+        if key not in allowances:
+            continue
+
+        if not succeeded:
+            del allowances[key]
+            continue
+
+        allowance = allowances[key]
+
+        if allowance < approval.amount:
+            allowance = MAX_ALLOWANCE if APPROVE_MAX_ALLOWANCE else approval.amount
+
+        if allowance != MAX_ALLOWANCE:
+            allowance -= approval.amount
+
+        allowances[key] = allowance